@@ -0,0 +1,111 @@
+"""
+Cold Start Benchmark
+Measures worker import time and RSS for an empty poll cycle, and fails if
+the heavy media/document stacks get loaded or the budgets are exceeded.
+
+Usage:
+    python benchmarks/cold_start.py [--max-import-ms 400] [--max-rss-mb 80] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Modules an empty poll must never import
+HEAVY_MODULES = ['yt_dlp', 'openai', 'assemblyai', 'PyPDF2', 'docx', 'markdown', 'bs4']
+
+# Runs inside a fresh interpreter: import the worker and do one empty poll
+CHILD_SCRIPT = f"""
+import json, resource, sys, time
+sys.path.insert(0, {str(SRC_DIR)!r})
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+service = main.PokerVideoService()
+for client in service.airtables.values():
+    client.get_pending_videos = lambda: []
+service.run_once()
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "empty_poll_ms": (done - start) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr: str, top: int = 10):
+    """
+    Parse `-X importtime` output into the slowest top-level imports.
+
+    Returns:
+        List of (module, cumulative_ms) sorted slowest first
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if name.startswith("   "):
+            continue  # Nested import, already counted by its parent
+        entries.append((name.strip(), int(cumulative_us) / 1000))
+    return sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+
+
+def run_once() -> dict:
+    """Run one cold start in a fresh interpreter."""
+    env = dict(os.environ)
+    env.setdefault("AIRTABLE_API_KEY", "bench")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+        capture_output=True, text=True, cwd=SRC_DIR, env=env, timeout=120
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Benchmark child failed:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["slowest_imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold start benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=400)
+    parser.add_argument("--max-rss-mb", type=float, default=80)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    best = min(runs, key=lambda r: r["empty_poll_ms"])
+
+    print(f"Import time:     {best['import_ms']:.0f}ms")
+    print(f"Empty poll:      {best['empty_poll_ms']:.0f}ms")
+    print(f"Max RSS:         {best['max_rss_mb']:.1f}MB")
+    print("Slowest imports:")
+    for name, ms in best["slowest_imports"]:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    failures = []
+    if best["heavy_loaded"]:
+        failures.append(f"heavy modules loaded on empty poll: {', '.join(best['heavy_loaded'])}")
+    if best["empty_poll_ms"] > args.max_import_ms:
+        failures.append(f"cold start {best['empty_poll_ms']:.0f}ms > {args.max_import_ms:.0f}ms")
+    if best["max_rss_mb"] > args.max_rss_mb:
+        failures.append(f"RSS {best['max_rss_mb']:.1f}MB > {args.max_rss_mb:.0f}MB")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+
+    print("✅ Cold start within budget")
+
+
+if __name__ == "__main__":
+    main()
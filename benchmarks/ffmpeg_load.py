@@ -0,0 +1,84 @@
+"""
+FFmpeg Load Benchmark
+Runs many ffmpeg encodes at once, the way several concurrent records do,
+first unbounded (every job starts immediately with ffmpeg's default
+threads) and then through the CPU-aware executor. Prints wall time, audio
+throughput and CPU-seconds per audio-minute for each.
+
+Usage:
+    python benchmarks/ffmpeg_load.py [--jobs 12] [--minutes 5] [--cpus 2]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from ffmpeg_executor import FfmpegExecutor, available_cpus  # noqa: E402
+from subprocess_runner import observe_commands, run_command  # noqa: E402
+
+
+def make_source(path: Path, minutes: float):
+    """Noisy stereo WAV - costlier to encode than silence, like real speech."""
+    run_command([
+        'ffmpeg', '-v', 'error',
+        '-f', 'lavfi', '-i', f'anoisesrc=d={minutes * 60}:c=pink:r=44100',
+        '-ac', '2', '-y', str(path)
+    ], check=True)
+
+
+def encode_cmd(source: Path, output: Path) -> list:
+    return ['ffmpeg', '-v', 'error', '-i', str(source), '-vn', '-acodec', 'libmp3lame', '-q:a', '2', '-y', str(output)]
+
+
+def run_batch(label: str, jobs: int, minutes: float, source: Path, work_dir: Path, executor=None):
+    usage = []
+
+    def one(i: int):
+        output = work_dir / f"{label}_{i}.mp3"
+        with observe_commands(usage.append):
+            if executor is None:
+                run_command(encode_cmd(source, output), check=True)
+            else:
+                executor.run("extract_audio", encode_cmd(source, output), media_seconds=minutes * 60, check=True)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(one, range(jobs)))
+    wall = time.monotonic() - start
+
+    cpu = sum(u["user_cpu_seconds"] + u["system_cpu_seconds"] for u in usage)
+    audio_minutes = jobs * minutes
+    print(f"{label:>10} {wall:>8.1f} {audio_minutes / wall * 60:>14.1f} {cpu / audio_minutes:>16.2f}")
+    return wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of concurrent ffmpeg jobs, unbounded vs. executor")
+    parser.add_argument("--jobs", type=int, default=12, help="Concurrent encodes")
+    parser.add_argument("--minutes", type=float, default=5, help="Audio length per encode")
+    parser.add_argument("--cpus", type=float, default=None, help="CPUs to plan for (default: detected)")
+    args = parser.parse_args()
+
+    executor = FfmpegExecutor(cpus=args.cpus)
+    print(f"Detected {available_cpus():g} CPUs; executor runs {executor.max_jobs} jobs x {executor.threads} threads")
+
+    with tempfile.TemporaryDirectory(prefix="ffmpeg_load_") as tmp:
+        work_dir = Path(tmp)
+        source = work_dir / "source.wav"
+        make_source(source, args.minutes)
+
+        print(f"\n{'Mode':>10} {'Wall s':>8} {'Audio min/min':>14} {'CPU-s/audio-min':>16}")
+        unbounded = run_batch("unbounded", args.jobs, args.minutes, source, work_dir)
+        bounded = run_batch("executor", args.jobs, args.minutes, source, work_dir, executor)
+
+    print(f"\nExecutor wall time: {bounded / unbounded:.0%} of unbounded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Insight Pre-selection Benchmark
+Compares the insight prompt built from the first 15k characters of a
+transcript (the old behaviour) with the one built from pre-selected salient
+spans: prompt tokens, how much of the recording the prompt covers, and -
+with --call - the real chat completion latency and billed prompt tokens.
+
+Reads archived transcripts (state/transcripts.db) or plain text files.
+
+Usage:
+    python benchmarks/insight_preselect.py --archive [--limit 20] [--call]
+    python benchmarks/insight_preselect.py transcript1.txt transcript2.txt
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from salient_selector import CHARS_PER_TOKEN, SalientSelector  # noqa: E402
+
+TRUNCATE_CHARS = 15000
+
+
+def coverage(text: str, prompt_text: str, selector: SalientSelector) -> float:
+    """Share of the recording's eighths that contribute at least one span to the prompt."""
+    spans = selector.split_spans(text)
+    eighths = {i * 8 // len(spans) for i, span in enumerate(spans) if span in prompt_text}
+    return len(eighths) / 8
+
+
+def load_texts(args):
+    if args.archive:
+        from transcript_archive import TranscriptArchive
+
+        archive = TranscriptArchive(str(ROOT_DIR / "state" / "transcripts.db"))
+        for record_id in archive.record_ids()[-args.limit:]:
+            yield record_id, archive.get(record_id)["text"]
+    for path in args.files:
+        yield path.name, path.read_text(encoding="utf-8")
+
+
+def timed_call(client, text: str):
+    start = time.monotonic()
+    response = client.chat.completions.create(
+        model="gpt-4.1-mini",
+        messages=[{"role": "user", "content": f"Extract 5 key poker quotes from:\n{text}"}],
+        max_tokens=300,
+    )
+    return time.monotonic() - start, response.usage.prompt_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt size and coverage with salient pre-selection")
+    parser.add_argument("files", nargs="*", type=Path, help="Transcript text files")
+    parser.add_argument("--archive", action="store_true", help="Use archived transcripts")
+    parser.add_argument("--limit", type=int, default=20, help="Most recent archived transcripts to use")
+    parser.add_argument("--call", action="store_true", help="Also time real chat completions (costs tokens)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    selector = SalientSelector()
+    client = None
+    if args.call:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    print(f"{'Source':<24} {'Chars':>8} {'Trunc tok':>10} {'Select tok':>11} {'Trunc cov':>10} "
+          f"{'Select cov':>11} {'Select ms':>10}")
+    for name, text in load_texts(args):
+        start = time.perf_counter()
+        selected = selector.select(text)
+        select_ms = (time.perf_counter() - start) * 1000
+        truncated = text[:TRUNCATE_CHARS]
+
+        print(f"{name[:24]:<24} {len(text):>8,} {len(truncated) // CHARS_PER_TOKEN:>10,} "
+              f"{len(selected) // CHARS_PER_TOKEN:>11,} {coverage(text, truncated, selector):>10.0%} "
+              f"{coverage(text, selected, selector):>11.0%} {select_ms:>10.0f}")
+
+        if client:
+            trunc_s, trunc_tokens = timed_call(client, truncated)
+            select_s, select_tokens = timed_call(client, selected)
+            print(f"{'':<24} API: truncated {trunc_s:.1f}s / {trunc_tokens} tokens, "
+                  f"selected {select_s:.1f}s / {select_tokens} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Tempo WER Benchmark
+Transcribes sample files at normal speed and at several tempo factors, and
+reports the word error rate of each factor against the normal-speed
+transcript along with the billed minutes and upload size it saves. Use it
+to pick the largest TRANSCRIBE_TEMPO that keeps quality.
+
+Calls the real Whisper API (OPENAI_API_KEY), so it costs about as much as
+transcribing the samples once per factor.
+
+Usage:
+    python benchmarks/tempo_wer.py sample1.mp3 sample2.mp4 [--factors 1.2,1.3,1.4,1.5]
+                                   [--seconds 300] [--max-wer 0.05]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from dotenv import load_dotenv  # noqa: E402
+
+from audio_chunker import AudioChunker  # noqa: E402
+from stage_deadlines import deadlines  # noqa: E402
+from tempo_compressor import TempoCompressor  # noqa: E402
+from video_processor import VideoProcessor  # noqa: E402
+
+
+def normalize(text: str) -> list:
+    """Lowercase words without punctuation, so WER counts only real word changes."""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,                            # deletion
+                current[j - 1] + 1,                         # insertion
+                previous[j - 1] + (ref_word != hyp_word),   # substitution
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def prepare_sample(source: Path, seconds: int, work_dir: Path) -> Path:
+    """First `seconds` of a file as MP3 at the chunker's bitrate (fits the upload limit)."""
+    sample = work_dir / f"{source.stem}_baseline.mp3"
+    cmd = [
+        'ffmpeg', '-v', 'error',
+        '-t', str(seconds),
+        '-i', str(source),
+        '-vn', '-map_metadata', '-1',
+        '-acodec', 'libmp3lame', '-b:a', f'{AudioChunker.ENCODE_KBPS}k',
+        '-y', str(sample)
+    ]
+    deadlines.run("extract_audio", cmd, media_seconds=seconds, outputs=[sample], check=True, capture_output=True)
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word error rate of tempo-compressed transcription")
+    parser.add_argument("files", nargs="+", type=Path, help="Sample audio/video files")
+    parser.add_argument("--factors", default="1.2,1.3,1.4,1.5", help="Comma-separated tempo factors")
+    parser.add_argument("--seconds", type=int, default=300, help="Length of each sample to transcribe")
+    parser.add_argument("--max-wer", type=float, default=0.05, help="Highest acceptable WER vs. normal speed")
+    args = parser.parse_args()
+
+    load_dotenv()
+    factors = [float(f) for f in args.factors.split(",")]
+    processor = VideoProcessor(download_dir=tempfile.gettempdir())
+    chunker = AudioChunker()
+
+    # factor -> per-file (wer, seconds transcribed, bytes uploaded, wall seconds)
+    rows = {1.0: [], **{f: [] for f in factors}}
+
+    with tempfile.TemporaryDirectory(prefix="tempo_wer_") as tmp:
+        work_dir = Path(tmp)
+        for source in args.files:
+            baseline_path = prepare_sample(source, args.seconds, work_dir)
+            duration = chunker.get_duration(baseline_path)
+
+            start = time.monotonic()
+            baseline = processor._transcribe_audio(baseline_path)
+            rows[1.0].append((0.0, duration, baseline_path.stat().st_size, time.monotonic() - start))
+            print(f"{source.name}: {duration:.0f}s, {len(normalize(baseline))} words at 1.0x")
+
+            for factor in factors:
+                compressed = TempoCompressor(chunker, factor).compress(baseline_path, work_dir)
+                start = time.monotonic()
+                text = processor._transcribe_audio(compressed)
+                wall = time.monotonic() - start
+                wer = word_error_rate(baseline, text)
+                rows[factor].append((wer, duration / factor, compressed.stat().st_size, wall))
+                print(f"  {factor:g}x: WER {wer:.1%}")
+
+    print()
+    print(f"{'Tempo':>6} {'WER':>7} {'Billed min':>11} {'Upload MB':>10} {'API s':>7}")
+    best = 1.0
+    for factor, results in rows.items():
+        mean_wer = sum(r[0] for r in results) / len(results)
+        minutes = sum(r[1] for r in results) / 60
+        megabytes = sum(r[2] for r in results) / (1024 * 1024)
+        api_seconds = sum(r[3] for r in results)
+        print(f"{factor:>5g}x {mean_wer:>7.1%} {minutes:>11.1f} {megabytes:>10.1f} {api_seconds:>7.1f}")
+        if mean_wer <= args.max_wer:
+            best = max(best, factor)
+
+    if best > 1.0:
+        print(f"\n✅ Largest factor within {args.max_wer:.0%} WER: TRANSCRIBE_TEMPO={best:g}")
+    else:
+        print(f"\n❌ No factor stays within {args.max_wer:.0%} WER - leave TRANSCRIBE_TEMPO=1.0")
+
+
+if __name__ == "__main__":
+    main()
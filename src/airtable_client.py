@@ -6,7 +6,13 @@ Handles polling for new records and updating with results.
 import logging
 import os
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+from circuit_breaker import CircuitOpen, breakers, is_outage
+from credential_pool import CredentialPool
+from http_clients import registry
+from salient_selector import CHAPTERS_MARKER
+from tracing import KIND_CLIENT, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +20,44 @@ logger = logging.getLogger(__name__)
 class AirtableClient:
     """Manages Airtable operations for poker content using REST API."""
     
-    def __init__(self, api_key: str, base_id: str, table_id: str):
+    # Transcription is truncated to this many characters for Airtable
+    MAX_TRANSCRIPTION_CHARS = 10000
+    
+    # Airtable accepts at most 10 records per bulk update
+    BATCH_SIZE = 10
+    
+    # Airtable asks clients to wait 30 seconds after a 429
+    RATE_LIMIT_COOLDOWN = 30
+    
+    # Map our result keys to Airtable field names
+    FIELD_MAPPING = {
+        "transcription": "Core Philosophy",  # Store full transcription here
+        "key_quotes": "Key Quotes",
+        "core_philosophy": "Core Philosophy",
+        "status": "Status"
+    }
+    
+    # Fields we read from or write to outside of results
+    INPUT_FIELDS = {
+        "source": "Source File/Link",
+        "title": "Content Title",
+        "error": "Core Philosophy"
+    }
+    
+    def __init__(self, api_key: str, base_id: str, table_id: str,
+                 fields: Optional[Dict[str, Optional[str]]] = None,
+                 api_keys: Optional[List[str]] = None):
+        """
+        Initialize client.
+        
+        Args:
+            api_key: Airtable token
+            base_id: Base ID (app...)
+            table_id: Table ID or name
+            fields: Per-table overrides of FIELD_MAPPING / INPUT_FIELDS
+                    (our key -> Airtable field name; None = don't write it)
+            api_keys: Token pool for this table (default AIRTABLE_API_KEYS, or api_key)
+        """
         self.api_key = api_key
         self.base_id = base_id
         self.table_id = table_id
@@ -23,8 +66,24 @@ class AirtableClient:
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.fields = {**self.FIELD_MAPPING, **self.INPUT_FIELDS, **(fields or {})}
+        
+        # Extra tokens (AIRTABLE_API_KEYS) spread the per-token rate limit;
+        # Airtable's 5 requests/second per base still applies
+        if not api_keys:
+            api_keys = [k for k in os.getenv("AIRTABLE_API_KEYS", "").split(",") if k.strip()] or [api_key]
+        self.keys = CredentialPool("airtable", api_keys, cooldown=self.RATE_LIMIT_COOLDOWN)
         logger.info("✅ Airtable client initialized")
         
+    def source_of(self, record: Dict) -> Optional[str]:
+        """Source URL or path of a fetched record."""
+        return record['fields'].get(self.fields["source"])
+    
+    def title_of(self, record: Dict) -> str:
+        """Title of a fetched record."""
+        return record['fields'].get(self.fields["title"], 'Untitled')
+    
+    
     def get_pending_videos(self) -> List[Dict]:
         """
         Get all videos with Status = 'Raw' that need processing.
@@ -34,17 +93,16 @@ class AirtableClient:
         """
         try:
             # Use filterByFormula to get records with Status = 'Raw'
-            formula = "{Status}='Raw'"
+            formula = f"{{{self.fields['status']}}}='Raw'"
             params = {
                 "filterByFormula": formula,
                 "maxRecords": 100
             }
             
-            response = requests.get(
+            response = self._request(
+                "GET",
                 self.base_url,
-                headers=self.headers,
-                params=params,
-                timeout=30
+                params=params
             )
             response.raise_for_status()
             
@@ -54,7 +112,7 @@ class AirtableClient:
             # Filter to only those with a video URL
             pending = [
                 r for r in records 
-                if r['fields'].get('Source File/Link')
+                if self.source_of(r)
             ]
             
             logger.info(f"Found {len(pending)} pending videos")
@@ -76,27 +134,15 @@ class AirtableClient:
             True if successful, False otherwise
         """
         try:
-            # Map our field names to Airtable field names
-            field_mapping = {
-                "transcription": "Core Philosophy",  # Store full transcription here
-                "key_quotes": "Key Quotes",
-                "core_philosophy": "Core Philosophy",
-                "status": "Status"
-            }
-            
-            airtable_updates = {}
-            for key, value in updates.items():
-                if key in field_mapping and value:
-                    airtable_updates[field_mapping[key]] = value
+            airtable_updates = self._map_fields(updates)
             
             url = f"{self.base_url}/{record_id}"
             payload = {"fields": airtable_updates}
             
-            response = requests.patch(
+            response = self._request(
+                "PATCH",
                 url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             response.raise_for_status()
             
@@ -107,17 +153,141 @@ class AirtableClient:
             logger.error(f"❌ Error updating record {record_id}: {e}")
             return False
     
+    def update_records(self, updates: List[Tuple[str, Dict]]) -> int:
+        """
+        Update many records, 10 per request.
+        
+        Args:
+            updates: List of (record_id, fields) pairs, fields as in update_record
+            
+        Returns:
+            Number of records successfully updated
+        """
+        updated = 0
+        
+        for i in range(0, len(updates), self.BATCH_SIZE):
+            batch = updates[i:i + self.BATCH_SIZE]
+            payload = {"records": [
+                {"id": record_id, "fields": self._map_fields(fields)}
+                for record_id, fields in batch
+            ]}
+            
+            try:
+                response = self._request(
+                    "PATCH",
+                    self.base_url,
+                    json=payload
+                )
+                response.raise_for_status()
+                updated += len(batch)
+                
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ Error updating records {batch[0][0]}..{batch[-1][0]}: {e}")
+        
+        logger.info(f"✅ Updated {updated}/{len(updates)} records")
+        return updated
+    
+    def create_records(self, records: List[Dict]) -> List[Optional[str]]:
+        """
+        Create new rows, 10 per request.
+        
+        Args:
+            records: Dicts with title, source and result fields as in update_record
+        
+        Returns:
+            New Airtable record IDs in input order (None where a request failed)
+        """
+        created: List[Optional[str]] = []
+        
+        for i in range(0, len(records), self.BATCH_SIZE):
+            batch = records[i:i + self.BATCH_SIZE]
+            payload = {"records": [
+                {"fields": {
+                    self.fields["title"]: r.get("title", ""),
+                    self.fields["source"]: r.get("source", ""),
+                    **self._map_fields(r)
+                }}
+                for r in batch
+            ]}
+            
+            try:
+                response = self._request(
+                    "POST",
+                    self.base_url,
+                    json=payload
+                )
+                response.raise_for_status()
+                created.extend(r["id"] for r in response.json().get("records", []))
+            
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ Error creating records: {e}")
+                created.extend([None] * len(batch))
+        
+        logger.info(f"✅ Created {sum(1 for c in created if c)}/{len(records)} records")
+        return created
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request with a pooled token; a 429 takes that token out of rotation."""
+        # While Airtable is down, fail fast as a RequestException so every
+        # caller's existing error handling applies
+        breaker = breakers.get(f"airtable.{self.base_id}")
+        if not breaker.allow():
+            raise requests.exceptions.ConnectionError(str(CircuitOpen(breaker.name, breaker.retry_in())))
+        
+        with tracer.span(f"airtable.{method.lower()}", kind=KIND_CLIENT) as span, \
+                self.keys.acquire() as credential:
+            headers = self.headers
+            if credential:
+                headers = {**headers, "Authorization": f"Bearer {credential.key}"}
+            try:
+                response = registry.session("airtable").request(method, url, headers=headers, timeout=30, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if is_outage(e):
+                    breaker.record_failure()
+                raise
+            span.set(http_status=response.status_code)
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        self.keys.observe(credential, response.status_code, response.headers)
+        return response
+    
+    def _map_fields(self, updates: Dict) -> Dict:
+        """Convert our result keys into Airtable fields."""
+        airtable_updates = {}
+        # The transcription may share a column with other results (by default
+        # "Core Philosophy") - write it first so they win whatever the key order
+        ordered = sorted(updates.items(), key=lambda item: item[0] != "transcription")
+        for key, value in ordered:
+            if key in self.FIELD_MAPPING and self.fields[key] and value:
+                if key == "transcription":
+                    # Full text lives in the local transcript archive
+                    value = self._truncate_transcription(value)
+                airtable_updates[self.fields[key]] = value
+        return airtable_updates
+    
+    def _truncate_transcription(self, text: str) -> str:
+        """Cut text to MAX_TRANSCRIPTION_CHARS, keeping chapter summaries at the end."""
+        if len(text) <= self.MAX_TRANSCRIPTION_CHARS:
+            return text
+        body, marker, chapters = text.partition(CHAPTERS_MARKER)
+        if not chapters:
+            return text[:self.MAX_TRANSCRIPTION_CHARS]
+        chapters = chapters[:self.MAX_TRANSCRIPTION_CHARS // 2]
+        return body[:self.MAX_TRANSCRIPTION_CHARS - len(marker) - len(chapters)] + marker + chapters
+    
     def mark_as_processing(self, record_id: str) -> bool:
         """Mark a record as being processed to avoid duplicate processing."""
         try:
             url = f"{self.base_url}/{record_id}"
-            payload = {"fields": {"Status": "Processing"}}
+            payload = {"fields": {self.fields["status"]: "Processing"}}
             
-            response = requests.patch(
+            response = self._request(
+                "PATCH",
                 url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             response.raise_for_status()
             return True
@@ -130,16 +300,15 @@ class AirtableClient:
         """Mark a record as having an error."""
         try:
             url = f"{self.base_url}/{record_id}"
-            payload = {"fields": {
-                "Status": "Raw",
-                "Core Philosophy": f"ERROR: {error_msg}"
-            }}
+            fields = {self.fields["status"]: "Raw"}
+            if self.fields["error"]:
+                fields[self.fields["error"]] = f"ERROR: {error_msg}"
+            payload = {"fields": fields}
             
-            response = requests.patch(
+            response = self._request(
+                "PATCH",
                 url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             response.raise_for_status()
             return True
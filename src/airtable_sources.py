@@ -0,0 +1,92 @@
+"""
+Airtable Sources
+Loads the Airtable tables one worker serves. With AIRTABLE_SOURCES_FILE
+set, tables come from a JSON file:
+
+    {
+      "workers": 4,
+      "sources": [
+        {"name": "cash", "base_id": "app...", "table_id": "tbl...",
+         "weight": 2, "max_concurrency": 3},
+        {"name": "mtt", "base_id": "app...", "table_id": "Videos",
+         "api_key_env": "AIRTABLE_API_KEY_MTT", "max_concurrency": 2,
+         "fields": {"source": "Video URL", "key_quotes": "Quotes"}}
+      ]
+    }
+
+Tokens never go in the file: api_key_env names the environment variable
+holding the table's token (comma-separated for a pool; default
+AIRTABLE_API_KEY). Without the file, the single table from
+AIRTABLE_BASE_ID / AIRTABLE_TABLE_ID is served, as before.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from airtable_client import AirtableClient
+
+logger = logging.getLogger(__name__)
+
+
+def load_sources(path: Optional[str] = None) -> Tuple[List[Dict], int]:
+    """
+    Build a client per configured table.
+
+    Args:
+        path: JSON config file (default AIRTABLE_SOURCES_FILE)
+
+    Returns:
+        Tuple of (sources as dicts with name, client, weight and
+        max_concurrency, worker slots - WORKER_CONCURRENCY overrides the file)
+
+    Raises:
+        ValueError: If the file lists no sources, or names one without base_id/table_id or a token
+    """
+    path = path or os.getenv("AIRTABLE_SOURCES_FILE")
+    workers_override = int(os.getenv("WORKER_CONCURRENCY", "0"))
+
+    if not path:
+        client = AirtableClient(
+            api_key=os.getenv("AIRTABLE_API_KEY"),
+            base_id=os.getenv("AIRTABLE_BASE_ID"),
+            table_id=os.getenv("AIRTABLE_TABLE_ID")
+        )
+        source = {"name": "default", "client": client, "weight": 1.0, "max_concurrency": None}
+        return [source], workers_override or 1
+
+    config = json.loads(Path(path).read_text())
+    sources = []
+    for i, entry in enumerate(config.get("sources", [])):
+        name = entry.get("name") or f"source{i + 1}"
+        if not entry.get("base_id") or not entry.get("table_id"):
+            raise ValueError(f"Source '{name}' in {path} needs base_id and table_id")
+
+        key_env = entry.get("api_key_env", "AIRTABLE_API_KEY")
+        keys = [k.strip() for k in os.getenv(key_env, "").split(",") if k.strip()]
+        if not keys:
+            raise ValueError(f"Source '{name}': environment variable {key_env} is not set")
+
+        client = AirtableClient(
+            api_key=keys[0],
+            base_id=entry["base_id"],
+            table_id=entry["table_id"],
+            fields=entry.get("fields"),
+            # The default token also picks up AIRTABLE_API_KEYS, like a single-table worker
+            api_keys=keys if key_env != "AIRTABLE_API_KEY" else None
+        )
+        sources.append({
+            "name": name,
+            "client": client,
+            "weight": float(entry.get("weight", 1)),
+            "max_concurrency": entry.get("max_concurrency"),
+        })
+
+    if not sources:
+        raise ValueError(f"{path} lists no sources - add at least one table under \"sources\"")
+
+    workers = workers_override or int(config.get("workers", len(sources)))
+    logger.info(f"📋 Serving {len(sources)} Airtable tables with {workers} workers from {path}")
+    return sources, workers
@@ -0,0 +1,161 @@
+"""
+AssemblyAI Job Tracking
+Persists submitted transcript IDs across restarts and polls all in-flight
+jobs from a single background thread.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+from atomic_file import atomic_write_json
+from assemblyai_service import AssemblyAIService, AssemblyAIJobFailed
+
+logger = logging.getLogger(__name__)
+
+
+class AssemblyAIJobStore:
+    """JSON-file record of submitted jobs, keyed by Airtable record ID."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict] = self._load()
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        """Get the job submitted for a record, if any."""
+        with self._lock:
+            return self._jobs.get(record_id)
+
+    def put(self, record_id: str, transcript_id: str, source: str):
+        """Record a newly submitted job."""
+        with self._lock:
+            self._jobs[record_id] = {
+                "transcript_id": transcript_id,
+                "source": source,
+                "submitted_at": time.time()
+            }
+            self._save()
+
+    def remove(self, record_id: str):
+        """Forget a job once its result is used (or it failed)."""
+        with self._lock:
+            if self._jobs.pop(record_id, None) is not None:
+                self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not read job store {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        atomic_write_json(self.path, self._jobs)
+
+
+class TranscriptPoller:
+    """Tracks all in-flight transcript IDs from one polling thread."""
+
+    # Consecutive network errors before a job is given up on
+    MAX_POLL_ERRORS = 5
+
+    def __init__(self, service: AssemblyAIService, interval: Optional[float] = None):
+        """
+        Initialize poller.
+
+        Args:
+            service: AssemblyAI service used to fetch job status
+            interval: Seconds between polling rounds (or ASSEMBLYAI_POLL_INTERVAL_SECONDS)
+        """
+        self.service = service
+        self.interval = interval or float(os.getenv("ASSEMBLYAI_POLL_INTERVAL_SECONDS", "5"))
+
+        self._pending: Dict[str, Future] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, transcript_id: str) -> Future:
+        """
+        Start tracking a job.
+
+        Returns:
+            Future that resolves to the result dict from AssemblyAIService.fetch()
+        """
+        with self._lock:
+            future = self._pending.get(transcript_id)
+            if future is None:
+                future = Future()
+                self._pending[transcript_id] = future
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="assemblyai-poller", daemon=True)
+                self._thread.start()
+
+        return future
+
+    def untrack(self, transcript_id: str):
+        """Stop polling a job nobody waits for any more (e.g. after a timeout)."""
+        with self._lock:
+            future = self._pending.pop(transcript_id, None)
+        self._errors.pop(transcript_id, None)
+        if future is not None:
+            future.cancel()
+
+    def in_flight(self) -> int:
+        """Number of jobs still being polled."""
+        with self._lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                transcript_ids = list(self._pending)
+                if not transcript_ids:
+                    self._thread = None
+                    return
+
+            for transcript_id in transcript_ids:
+                self._poll(transcript_id)
+
+            time.sleep(self.interval)
+
+    def _poll(self, transcript_id: str):
+        try:
+            result = self.service.fetch(transcript_id)
+        except AssemblyAIJobFailed as e:
+            self._resolve(transcript_id, error=e)
+            return
+        except Exception as e:
+            errors = self._errors.get(transcript_id, 0) + 1
+            self._errors[transcript_id] = errors
+            logger.warning(f"Polling {transcript_id} failed ({errors}/{self.MAX_POLL_ERRORS}): {e}")
+            if errors >= self.MAX_POLL_ERRORS:
+                self._resolve(transcript_id, error=e)
+            return
+
+        self._errors.pop(transcript_id, None)
+        if result is not None:
+            self._resolve(transcript_id, result=result)
+
+    def _resolve(self, transcript_id: str, result: Optional[Dict] = None,
+                 error: Optional[Exception] = None):
+        with self._lock:
+            future = self._pending.pop(transcript_id, None)
+        self._errors.pop(transcript_id, None)
+
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -4,28 +4,50 @@ Premium transcription with chapters and speaker detection.
 """
 
 import logging
-import os
 from pathlib import Path
-from typing import Dict, Optional
-import assemblyai as aai
+from typing import Dict, List, Optional
+
+from circuit_breaker import breakers, is_outage
+from credential_pool import Credential, CredentialPool
 
 logger = logging.getLogger(__name__)
 
 
+class AssemblyAIJobFailed(Exception):
+    """Raised when AssemblyAI reports a submitted job as failed."""
+
+
+def _is_outage(error: Exception) -> bool:
+    """The SDK reports failed HTTP calls (uploads, submits) as TranscriptError."""
+    return is_outage(error) or type(error).__name__ in ("TranscriptError", "ConnectError")
+
+
 class AssemblyAIService:
     """Handles transcription using AssemblyAI for long-form content."""
     
+    # Timestamped segments are sentences, split up when they run longer than this
+    MAX_SEGMENT_WORDS = 40
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         Initialize AssemblyAI service.
         
         Args:
-            api_key: AssemblyAI API key (or from environment)
+            api_key: AssemblyAI API key (or ASSEMBLYAI_API_KEYS / ASSEMBLYAI_API_KEY)
         """
-        self.api_key = api_key or os.getenv('ASSEMBLYAI_API_KEY')
+        self.keys = CredentialPool("assemblyai", [api_key]) if api_key else CredentialPool.from_env("ASSEMBLYAI")
+        self.api_key = self.keys.primary.key if self.keys.primary else None
         
+        # SDK clients per key, and which key owns each submitted transcript
+        # (transcripts can only be fetched with the key that created them)
+        self._clients = {}
+        self._owners: Dict[str, str] = {}
+        
+        # Opens while AssemblyAI is down, so records fail over to Whisper
+        self.breaker = breakers.get("assemblyai", is_failure=_is_outage)
+        
+        # The assemblyai SDK is imported on first transcription, not here
         if self.api_key:
-            aai.settings.api_key = self.api_key
             self.enabled = True
             logger.info("AssemblyAI service initialized")
         else:
@@ -48,6 +70,8 @@ class AssemblyAIService:
         if not self.enabled:
             raise ValueError("AssemblyAI service not enabled - missing API key")
         
+        aai = self._sdk()
+        
         try:
             logger.info(f"Transcribing with AssemblyAI: {audio_path.name}")
             
@@ -57,51 +81,16 @@ class AssemblyAIService:
                 speaker_labels=detect_speakers
             )
             
-            # Create transcriber
-            transcriber = aai.Transcriber()
-            
-            # Transcribe
-            transcript = transcriber.transcribe(str(audio_path), config=config)
+            # Create transcriber on the least-loaded key and transcribe
+            with self.keys.acquire() as credential:
+                transcriber = aai.Transcriber(client=self._client_for(credential))
+                transcript = self.breaker.call(transcriber.transcribe, str(audio_path), config=config)
             
             # Check for errors
             if transcript.status == aai.TranscriptStatus.error:
                 raise Exception(f"Transcription failed: {transcript.error}")
             
-            # Build result
-            result = {
-                'text': transcript.text,
-                'duration': transcript.audio_duration,
-                'word_count': len(transcript.text.split()),
-                'chapters': [],
-                'speakers': []
-            }
-            
-            # Add chapters if available
-            if detect_chapters and transcript.chapters:
-                result['chapters'] = [
-                    {
-                        'start': ch.start / 1000,  # Convert ms to seconds
-                        'end': ch.end / 1000,
-                        'headline': ch.headline,
-                        'summary': ch.summary,
-                        'gist': ch.gist
-                    }
-                    for ch in transcript.chapters
-                ]
-                logger.info(f"Detected {len(result['chapters'])} chapters")
-            
-            # Add speaker info if available
-            if detect_speakers and transcript.utterances:
-                result['speakers'] = [
-                    {
-                        'speaker': utt.speaker,
-                        'start': utt.start / 1000,
-                        'end': utt.end / 1000,
-                        'text': utt.text
-                    }
-                    for utt in transcript.utterances
-                ]
-                logger.info(f"Detected {len(set(s['speaker'] for s in result['speakers']))} speakers")
+            result = self._build_result(transcript, detect_chapters, detect_speakers)
             
             logger.info(f"✅ AssemblyAI transcription complete: {len(result['text'])} characters")
             return result
@@ -110,6 +99,158 @@ class AssemblyAIService:
             logger.error(f"AssemblyAI transcription error: {e}")
             raise
     
+    def submit(self, source: str, detect_chapters: bool = True,
+               detect_speakers: bool = False) -> str:
+        """
+        Submit a transcription job without waiting for it to finish.
+        
+        Args:
+            source: Public media URL (passed through, nothing is downloaded)
+                    or local file path (uploaded first)
+            detect_chapters: Enable auto-chapter detection
+            detect_speakers: Enable speaker diarization
+            
+        Returns:
+            AssemblyAI transcript ID
+        """
+        if not self.enabled:
+            raise ValueError("AssemblyAI service not enabled - missing API key")
+        
+        aai = self._sdk()
+        
+        config = aai.TranscriptionConfig(
+            auto_chapters=detect_chapters,
+            speaker_labels=detect_speakers
+        )
+        with self.keys.acquire() as credential:
+            transcriber = aai.Transcriber(client=self._client_for(credential))
+            transcript = self.breaker.call(transcriber.submit, source, config=config)
+        self._owners[transcript.id] = credential.id
+        
+        logger.info(f"Submitted AssemblyAI job {transcript.id} ({credential.label})")
+        return transcript.id
+    
+    def fetch(self, transcript_id: str) -> Optional[Dict[str, any]]:
+        """
+        Check a submitted job once, without blocking.
+        
+        Args:
+            transcript_id: ID returned by submit()
+            
+        Returns:
+            Result dict (same shape as transcribe()) or None if still running
+            
+        Raises:
+            AssemblyAIJobFailed: If AssemblyAI reports the job as failed
+        """
+        aai = self._sdk()
+        
+        transcript = self._get_transcript(transcript_id)
+        
+        if transcript.status == aai.TranscriptStatus.error:
+            self._owners.pop(transcript_id, None)
+            raise AssemblyAIJobFailed(f"Transcription failed: {transcript.error}")
+        if transcript.status != aai.TranscriptStatus.completed:
+            return None
+        self._owners.pop(transcript_id, None)
+        
+        result = self._build_result(
+            transcript,
+            detect_chapters=bool(transcript.chapters),
+            detect_speakers=bool(transcript.utterances)
+        )
+        logger.info(f"✅ AssemblyAI job {transcript_id} complete: {len(result['text'])} characters")
+        return result
+    
+    def _get_transcript(self, transcript_id: str):
+        """Fetch a transcript with the key that owns it."""
+        aai = self._sdk()
+        from assemblyai import api
+        
+        # After a restart the owner is unknown - the first key that can see it is
+        owner = self.keys.get(self._owners.get(transcript_id, ""))
+        error = None
+        for credential in [owner] if owner else self.keys.credentials:
+            try:
+                transcript = api.get_transcript(self._client_for(credential).http_client, transcript_id)
+            except aai.types.TranscriptError as e:
+                error = e
+                continue
+            self._owners[transcript_id] = credential.id
+            return transcript
+        raise error
+    
+    def _client_for(self, credential: Credential):
+        """SDK client for a pooled key; responses report rate limits to the pool."""
+        if credential.id not in self._clients:
+            aai = self._sdk()
+            client = aai.Client(settings=aai.Settings(api_key=credential.key))
+            client.http_client.event_hooks = {"response": [self.keys.httpx_hook(credential)]}
+            self._clients[credential.id] = client
+        return self._clients[credential.id]
+    
+    def _build_result(self, transcript, detect_chapters: bool, detect_speakers: bool) -> Dict[str, any]:
+        """Convert an SDK transcript into our result dict."""
+        result = {
+            'text': transcript.text,
+            'duration': transcript.audio_duration,
+            'word_count': len(transcript.text.split()),
+            'chapters': [],
+            'speakers': [],
+            'segments': self._sentence_segments(transcript.words or [])
+        }
+        
+        # Add chapters if available
+        if detect_chapters and transcript.chapters:
+            result['chapters'] = [
+                {
+                    'start': ch.start / 1000,  # Convert ms to seconds
+                    'end': ch.end / 1000,
+                    'headline': ch.headline,
+                    'summary': ch.summary,
+                    'gist': ch.gist
+                }
+                for ch in transcript.chapters
+            ]
+            logger.info(f"Detected {len(result['chapters'])} chapters")
+        
+        # Add speaker info if available
+        if detect_speakers and transcript.utterances:
+            result['speakers'] = [
+                {
+                    'speaker': utt.speaker,
+                    'start': utt.start / 1000,
+                    'end': utt.end / 1000,
+                    'text': utt.text
+                }
+                for utt in transcript.utterances
+            ]
+            logger.info(f"Detected {len(set(s['speaker'] for s in result['speakers']))} speakers")
+        
+        return result
+    
+    def _sentence_segments(self, words: list) -> List[Dict]:
+        """Group timed words into sentence segments (start/end in seconds)."""
+        segments = []
+        start = 0
+        for i, word in enumerate(words):
+            at_end = word.text.endswith(('.', '?', '!')) or i == len(words) - 1
+            if at_end or i + 1 - start >= self.MAX_SEGMENT_WORDS:
+                sentence = words[start:i + 1]
+                segments.append({
+                    'start': sentence[0].start / 1000,
+                    'end': sentence[-1].end / 1000,
+                    'text': " ".join(w.text for w in sentence)
+                })
+                start = i + 1
+        return segments
+    
+    def _sdk(self):
+        """Import and configure the assemblyai SDK on first use."""
+        import assemblyai as aai
+        aai.settings.api_key = self.api_key
+        return aai
+    
     def format_chapters_for_airtable(self, chapters: list) -> str:
         """Format chapters as readable text for Airtable."""
         if not chapters:
@@ -0,0 +1,25 @@
+"""
+Atomic File Writes
+State files are written to a temporary file and renamed over the original,
+so a crash mid-write never leaves a half-written file for the next run or
+for a reader polling it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+def atomic_write_json(path: Path, data: Any):
+    """
+    Replace a JSON file in one step.
+
+    Args:
+        path: File to write (its directory must exist)
+        data: JSON-serializable value
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
@@ -3,87 +3,185 @@ Audio Chunker
 Splits large audio files into manageable chunks for transcription.
 """
 
+import json
 import logging
-import subprocess
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import math
 
+from segment_index import SegmentIndex
+from stage_deadlines import deadlines
+
 logger = logging.getLogger(__name__)
 
 
 class AudioChunker:
     """Handles splitting and stitching of large audio files."""
     
-    def __init__(self, chunk_duration: int = 1200):
+    # Whisper upload limit (same as ContentRouter.SMALL_FILE_LIMIT)
+    DEFAULT_MAX_CHUNK_BYTES = 25 * 1024 * 1024
+    
+    # Plan chunks to this fraction of the limit - leaves room for VBR swings
+    # and container overhead so re-splits stay rare
+    SIZE_SAFETY = 0.95
+    
+    # Re-encode settings for sources that aren't already MP3 (CBR, so the
+    # planned size is exact). Speech transcribes fine at this bitrate.
+    ENCODE_KBPS = 128
+    
+    def __init__(self, chunk_duration: Optional[int] = None,
+                 max_chunk_bytes: int = DEFAULT_MAX_CHUNK_BYTES):
         """
         Initialize chunker.
         
         Args:
-            chunk_duration: Duration of each chunk in seconds (default 20 minutes)
+            chunk_duration: Optional cap on chunk length in seconds; by default
+                            chunks are sized purely by bytes
+            max_chunk_bytes: Hard upper limit for each chunk file
         """
         self.chunk_duration = chunk_duration
+        self.max_chunk_bytes = max_chunk_bytes
     
     def get_duration(self, audio_path: Path) -> float:
         """Get duration of audio file in seconds."""
+        return self.probe(audio_path)['duration']
+    
+    def probe(self, audio_path: Path) -> Dict:
+        """
+        Get duration, bitrate and codec of an audio file.
+        
+        Returns:
+            Dict with duration (s), bit_rate (bits/s) and codec
+        """
         cmd = [
             'ffprobe',
             '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
+            '-select_streams', 'a:0',
+            '-show_entries', 'format=duration,bit_rate:stream=codec_name,bit_rate',
+            '-of', 'json',
             str(audio_path)
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        result = deadlines.run("probe", cmd, capture_output=True, text=True, check=True)
+        info = json.loads(result.stdout)
+        fmt = info.get('format', {})
+        stream = (info.get('streams') or [{}])[0]
+        
+        duration = float(fmt['duration'])
+        bit_rate = float(stream.get('bit_rate') or fmt.get('bit_rate') or 0)
+        if not bit_rate:
+            # Fall back to the file's average bitrate
+            bit_rate = audio_path.stat().st_size * 8 / duration
+        
+        return {'duration': duration, 'bit_rate': bit_rate, 'codec': stream.get('codec_name')}
+    
+    def plan_chunks(self, duration: float, bit_rate: float) -> List[Tuple[float, float]]:
+        """
+        Plan the fewest equal-length chunks that each fit under the size limit.
+        
+        Args:
+            duration: Total duration in seconds
+            bit_rate: Bitrate of the chunk files in bits/s
+            
+        Returns:
+            List of (start, length) in seconds
+        """
+        target_bytes = self.max_chunk_bytes * self.SIZE_SAFETY
+        max_seconds = target_bytes * 8 / bit_rate
+        if self.chunk_duration:
+            max_seconds = min(max_seconds, self.chunk_duration)
+        
+        num_chunks = max(1, math.ceil(duration / max_seconds))
+        length = duration / num_chunks  # Balanced, so the last chunk isn't a sliver
+        
+        return [(i * length, length) for i in range(num_chunks)]
     
     def split_audio(self, audio_path: Path, output_dir: Path) -> List[Path]:
         """
-        Split audio file into chunks.
+        Split audio file into chunks that each fit the upload limit.
+        
+        Chunk sizes come from the probed bitrate; any chunk that still comes
+        out over the limit (VBR peaks) is re-split.
         
         Args:
             audio_path: Path to audio file
             output_dir: Directory to save chunks
             
         Returns:
-            List of chunk file paths
+            List of chunk file paths, in order
         """
         try:
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Get total duration
-            duration = self.get_duration(audio_path)
-            num_chunks = math.ceil(duration / self.chunk_duration)
+            info = self.probe(audio_path)
+            
+            # MP3 sources are cut without re-encoding - faster and lossless
+            copy = info['codec'] == 'mp3'
+            chunk_bit_rate = info['bit_rate'] if copy else self.ENCODE_KBPS * 1000
+            plan = self.plan_chunks(info['duration'], chunk_bit_rate)
             
-            logger.info(f"Splitting {audio_path.name} into {num_chunks} chunks ({duration:.1f}s total)")
+            logger.info(
+                f"Splitting {audio_path.name} into {len(plan)} chunks "
+                f"({info['duration']:.1f}s total, {chunk_bit_rate/1000:.0f}kbps, "
+                f"{'stream copy' if copy else 're-encode'})"
+            )
             
             chunks = []
+            for start, length in plan:
+                chunks.extend(self._write_chunk(audio_path, output_dir, start, length, copy, len(chunks)))
             
-            for i in range(num_chunks):
-                start_time = i * self.chunk_duration
-                chunk_path = output_dir / f"{audio_path.stem}_chunk_{i:03d}.mp3"
-                
-                cmd = [
-                    'ffmpeg',
-                    '-i', str(audio_path),
-                    '-ss', str(start_time),
-                    '-t', str(self.chunk_duration),
-                    '-acodec', 'libmp3lame',
-                    '-q:a', '2',
-                    '-y',
-                    str(chunk_path)
-                ]
-                
-                subprocess.run(cmd, check=True, capture_output=True)
-                chunks.append(chunk_path)
-                logger.info(f"Created chunk {i+1}/{num_chunks}: {chunk_path.name}")
+            # Re-number so names follow playback order after any re-splits
+            ordered = []
+            for i, chunk in enumerate(chunks):
+                final = output_dir / f"{audio_path.stem}_chunk_{i:03d}.mp3"
+                chunk.rename(final)
+                ordered.append(final)
+                logger.info(f"Created chunk {i+1}/{len(chunks)}: {final.name} ({final.stat().st_size/(1024*1024):.1f}MB)")
             
-            return chunks
+            return ordered
             
         except Exception as e:
             logger.error(f"Error splitting audio: {e}")
             raise
     
+    def _write_chunk(self, audio_path: Path, output_dir: Path, start: float, length: float,
+                     copy: bool, index: int, depth: int = 0) -> List[Path]:
+        """Write one chunk, re-splitting it if it comes out over the limit."""
+        chunk_path = output_dir / f"{audio_path.stem}_part_{index:03d}_{depth}_{int(start*1000)}.mp3"
+        codec_args = ['-c', 'copy'] if copy else ['-acodec', 'libmp3lame', '-b:a', f'{self.ENCODE_KBPS}k']
+        
+        cmd = [
+            'ffmpeg',
+            '-ss', f'{start:.3f}',  # Input seek - no decoding of skipped audio
+            '-t', f'{length:.3f}',
+            '-i', str(audio_path),
+            '-vn',
+            '-map_metadata', '-1',  # Drop tags/cover art that would eat into the limit
+            *codec_args,
+            '-y',
+            str(chunk_path)
+        ]
+        deadlines.run("split", cmd, media_seconds=length, outputs=[chunk_path], check=True, capture_output=True)
+        
+        size = chunk_path.stat().st_size
+        if size <= self.max_chunk_bytes:
+            return [chunk_path]
+        
+        if depth >= 3:
+            raise ValueError(f"Chunk at {start:.0f}s still {size/(1024*1024):.1f}MB after re-splitting")
+        
+        parts = max(2, math.ceil(size / (self.max_chunk_bytes * self.SIZE_SAFETY)))
+        logger.info(f"Chunk at {start:.0f}s is {size/(1024*1024):.1f}MB - re-splitting into {parts}")
+        chunk_path.unlink()
+        
+        sub_length = length / parts
+        result = []
+        for i in range(parts):
+            result.extend(self._write_chunk(
+                audio_path, output_dir, start + i * sub_length, sub_length, copy, index + len(result), depth + 1
+            ))
+        return result
+    
     def stitch_transcriptions(self, transcriptions: List[str]) -> str:
         """
         Combine multiple transcriptions into one.
@@ -97,6 +195,18 @@ class AudioChunker:
         # Join with double newline for readability
         return '\n\n'.join(transcriptions)
     
+    def stitch_segments(self, parts: List[SegmentIndex]) -> SegmentIndex:
+        """
+        Combine chunk transcriptions, shifting each chunk's timestamps by its offset.
+        
+        Args:
+            parts: Segment index of each chunk, in playback order
+            
+        Returns:
+            One index over the stitched text (same text as stitch_transcriptions)
+        """
+        return SegmentIndex.concat(parts, separator='\n\n')
+    
     def cleanup_chunks(self, chunks: List[Path]):
         """Delete chunk files after processing."""
         for chunk in chunks:
@@ -0,0 +1,363 @@
+"""
+Backlog Estimator
+Estimates how long the queued work will take, as a signal for scaling the
+number of workers. Pending records are probed in the background for
+duration and size (yt-dlp metadata, or ffprobe for local files). Their
+cost is then estimated per stage - download, audio extraction, splitting,
+transcription on the backend the record would use, insights - from
+throughput measured on finished records. Measured rates come from trace
+spans and are kept in state/ across restarts.
+
+The estimate (backlog audio-minutes, drain time at the current worker
+count, recommended workers) is written to state/backlog.json and served as
+JSON on a local HTTP status endpoint (STATUS_PORT, default 8765; 0 = off)
+for an autoscaler or cron job.
+"""
+
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from atomic_file import atomic_write_json
+from tracing import Span
+
+logger = logging.getLogger(__name__)
+
+
+class BacklogEstimator:
+    """Probes pending records and turns measured stage throughput into a drain-time estimate."""
+
+    # Starting rates until real measurements arrive. Keys are stage names
+    # (transcription per backend; whisper-chunked includes splitting);
+    # units are seconds per audio second, except download (seconds per MB)
+    # and the per-record stages.
+    DEFAULT_RATES = {
+        "download": 0.5,
+        "extract_audio": 0.02,
+        "tempo": 0.02,
+        "transcribe.whisper": 0.08,
+        "transcribe.whisper-chunked": 0.1,
+        "transcribe.assemblyai": 0.25,
+        "fingerprint": 3.0,
+        "insights": 10.0,
+        "extract_text": 20.0,
+    }
+    PER_RECORD = {"fingerprint", "insights", "extract_text"}
+
+    # Weight of each new measurement in the moving average
+    SMOOTHING = 0.2
+
+    # Assumed when a probe can't tell: a 30 minute video at ~2 Mbps, whose
+    # extracted MP3 (-q:a 2) is ~190 kbps
+    DEFAULT_AUDIO_SECONDS = 1800
+    VIDEO_BYTES_PER_SECOND = 250_000
+    AUDIO_BYTES_PER_SECOND = 24_000
+
+    def __init__(self, processor, workers: int, state_dir: str):
+        """
+        Initialize estimator.
+
+        Args:
+            processor: UnifiedProcessor (for routing and probing)
+            workers: Records this worker processes at once
+            state_dir: Where backlog.json and learned rates are kept
+        """
+        self.processor = processor
+        self.workers = workers
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.status_path = self.state_dir / "backlog.json"
+        self.rates_path = self.state_dir / "throughput_rates.json"
+
+        # Target for recommended_workers: drain the backlog within this long
+        self.target_drain_seconds = float(os.getenv("BACKLOG_TARGET_DRAIN_MINUTES", "60")) * 60
+
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        learned = self._load_rates()
+        self._rates: Dict[str, float] = {**self.DEFAULT_RATES, **learned}
+        self._learned = set(learned)  # Rates backed by measurements, this run or before
+        self._samples: Dict[str, int] = {}
+        self._pending: Dict[str, Dict] = {}   # record_id -> {source, url}
+        self._probes: Dict[str, Dict] = {}    # record_id -> probe result
+        self._probe_queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self._prober: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Pending records
+    # ------------------------------------------------------------------
+
+    def track(self, source: str, records: List[Tuple[str, str]]):
+        """
+        Replace a source's pending records with a fresh poll result.
+
+        Args:
+            source: Table name
+            records: List of (record_id, url) pairs
+        """
+        with self._lock:
+            for record_id in [r for r, p in self._pending.items() if p["source"] == source]:
+                if record_id not in dict(records):
+                    self._pending.pop(record_id)
+            for record_id, url in records:
+                if record_id not in self._pending:
+                    self._pending[record_id] = {"source": source, "url": url}
+                    if record_id not in self._probes:
+                        self._probe_queue.put((record_id, url))
+        self._ensure_prober()
+        self.publish()
+
+    def finish(self, record_id: str):
+        """Drop a processed record from the backlog."""
+        with self._lock:
+            self._pending.pop(record_id, None)
+            self._probes.pop(record_id, None)
+        self.publish()
+
+    def _ensure_prober(self):
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="backlog-probe", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            try:
+                record_id, url = self._probe_queue.get(timeout=60)
+            except queue.Empty:
+                return  # Started again by the next poll
+            with self._lock:
+                if record_id not in self._pending:
+                    continue
+            try:
+                probe = self.probe(url)
+            except Exception as e:
+                # Stays unprobed (estimated with defaults); the thread keeps going
+                logger.warning(f"Could not probe {record_id} for the backlog estimate: {e}")
+                continue
+            with self._lock:
+                if record_id in self._pending:
+                    self._probes[record_id] = probe
+            self.publish()
+
+    def probe(self, url: str) -> Dict:
+        """
+        Work shape of one source, without downloading it.
+
+        Returns:
+            Dict with kind ('media', 'document', 'collection'), audio_seconds,
+            download_bytes and whether the values were measured
+        """
+        router = self.processor.router
+        content_type, metadata = router.detect_content_type(url)
+        if content_type != 'video':
+            return {"kind": content_type, "audio_seconds": 0, "download_bytes": 0, "measured": True}
+
+        if metadata.get('path'):
+            path = Path(metadata['path'])
+            return {"kind": "media", "audio_seconds": router.get_file_duration(path),
+                    "download_bytes": 0, "measured": True}
+
+        info = self.processor.video_processor.probe_media(url)
+        return {"kind": "media", "audio_seconds": info['duration'], "download_bytes": info['filesize'],
+                "measured": info['duration'] > 0}
+
+    # ------------------------------------------------------------------
+    # Measured throughput
+    # ------------------------------------------------------------------
+
+    def observe_span(self, span: Span):
+        """Tracer observer: fold a finished stage's duration into its rate."""
+        if span.error or span.end_ns is None:
+            return
+        seconds = (span.end_ns - span.start_ns) / 1e9
+        attrs = span.attributes
+
+        if span.name == "download" and attrs.get("bytes"):
+            self._update("download", seconds / (attrs["bytes"] / (1024 * 1024)))
+        elif span.name in ("extract_audio", "tempo") and attrs.get("media_seconds"):
+            self._update(span.name, seconds / attrs["media_seconds"])
+        elif span.name == "transcribe" and attrs.get("audio_seconds") and attrs.get("backend"):
+            # Per second of the original audio, so sped-up audio is counted at its source length
+            original_seconds = attrs["audio_seconds"] * attrs.get("tempo", 1.0)
+            self._update(f"transcribe.{attrs['backend']}", seconds / original_seconds)
+        elif span.name in self.PER_RECORD:
+            self._update(span.name, seconds)
+
+    def _update(self, key: str, value: float):
+        with self._lock:
+            # The first measurement replaces the default outright
+            weight = self.SMOOTHING if key in self._learned else 1.0
+            self._rates[key] = (1 - weight) * self._rates.get(key, value) + weight * value
+            self._samples[key] = self._samples.get(key, 0) + 1
+            self._learned.add(key)
+
+    # ------------------------------------------------------------------
+    # Estimate
+    # ------------------------------------------------------------------
+
+    def estimate(self) -> Dict:
+        """
+        Current backlog estimate.
+
+        Returns:
+            Dict with pending records, backlog audio-minutes, work and drain
+            seconds, recommended workers and the rates used
+        """
+        with self._lock:
+            pending = dict(self._pending)
+            probes = dict(self._probes)
+            rates = dict(self._rates)
+            samples = dict(self._samples)
+            learned = set(self._learned)
+
+        known = [p["audio_seconds"] for p in probes.values() if p["kind"] == "media" and p["measured"]]
+        typical_seconds = sum(known) / len(known) if known else self.DEFAULT_AUDIO_SECONDS
+
+        audio_seconds = work_seconds = 0.0
+        unprobed = 0
+        per_source: Dict[str, Dict[str, float]] = {}
+        for record_id, record in pending.items():
+            probe = probes.get(record_id)
+            if probe is None:
+                unprobed += 1
+                probe = {"kind": "media", "audio_seconds": 0, "download_bytes": 0, "measured": False}
+            seconds = probe["audio_seconds"] if probe["measured"] else typical_seconds
+            if probe["kind"] == "media":
+                work = self._media_work(record["url"], seconds, probe["download_bytes"], rates)
+            else:
+                seconds = 0
+                work = rates["extract_text"] + rates["insights"]
+
+            audio_seconds += seconds
+            work_seconds += work
+            source = per_source.setdefault(record["source"], {"records": 0, "audio_minutes": 0.0})
+            source["records"] += 1
+            source["audio_minutes"] += seconds / 60
+
+        drain_seconds = work_seconds / self.workers
+        return {
+            "updated_at": time.time(),
+            "pending_records": len(pending),
+            "unprobed_records": unprobed,
+            "backlog_audio_minutes": round(audio_seconds / 60, 1),
+            "work_seconds": round(work_seconds),
+            "workers": self.workers,
+            "drain_seconds": round(drain_seconds),
+            "target_drain_seconds": self.target_drain_seconds,
+            "recommended_workers": max(1, math.ceil(work_seconds / self.target_drain_seconds)),
+            "sources": {k: {**v, "audio_minutes": round(v["audio_minutes"], 1)} for k, v in per_source.items()},
+            "rates": {
+                k: {"value": round(v, 4), "samples": samples.get(k, 0), "measured": k in learned}
+                for k, v in rates.items()
+            },
+        }
+
+    def _media_work(self, url: str, seconds: float, download_bytes: int, rates: Dict[str, float]) -> float:
+        """Seconds of worker time one media record should take, stage by stage."""
+        router = self.processor.router
+        work = 0.0
+
+        if url.startswith(('http://', 'https://')):
+            download_bytes = download_bytes or seconds * self.VIDEO_BYTES_PER_SECOND
+            work += rates["download"] * download_bytes / (1024 * 1024)
+            work += rates["extract_audio"] * seconds
+
+        if self.processor.tempo.enabled:
+            work += rates["tempo"] * seconds
+        if self.processor.dedup.enabled:
+            work += rates["fingerprint"]
+
+        # Same backend choice _process_media would make
+        audio_bytes = seconds * self.AUDIO_BYTES_PER_SECOND / self.processor.tempo.factor
+        if self.processor.assemblyai.enabled and router.should_use_assemblyai(audio_bytes, seconds):
+            work += rates["transcribe.assemblyai"] * seconds
+        elif audio_bytes > router.SMALL_FILE_LIMIT:
+            work += rates["transcribe.whisper-chunked"] * seconds
+        else:
+            work += rates["transcribe.whisper"] * seconds
+
+        return work + rates["insights"]
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self) -> Dict:
+        """Write the estimate (and learned rates) to state/."""
+        status = self.estimate()
+        try:
+            with self._publish_lock:
+                atomic_write_json(self.status_path, status)
+                atomic_write_json(self.rates_path, {k: v["value"] for k, v in status["rates"].items()
+                                                   if v["measured"]})
+        except OSError as e:
+            logger.warning(f"Could not write backlog status: {e}")
+        return status
+
+    def serve(self, host: str = None, port: int = None) -> Optional[ThreadingHTTPServer]:
+        """
+        Serve the estimate as JSON on GET / or /status, in a background thread.
+
+        Args:
+            host: Bind address (or STATUS_HOST, default 127.0.0.1)
+            port: Port (or STATUS_PORT, default 8765; 0 = don't serve)
+
+        Returns:
+            The running server, or None when disabled
+        """
+        host = host or os.getenv("STATUS_HOST", "127.0.0.1")
+        port = int(os.getenv("STATUS_PORT", "8765")) if port is None else port
+        if not port:
+            return None
+
+        estimator = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(estimator.estimate(), indent=2).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Polled often - keep it out of the service log
+
+        try:
+            server = ThreadingHTTPServer((host, port), StatusHandler)
+        except OSError as e:
+            # Optional - e.g. the port is taken; the estimate still goes to backlog.json
+            logger.warning(f"Could not serve backlog status on {host}:{port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, name="status-http", daemon=True).start()
+        logger.info(f"📈 Backlog status on http://{host}:{port}/status")
+        return server
+
+    def summary(self) -> str:
+        """One-line summary for the poll log."""
+        s = self.estimate()
+        return (
+            f"{s['pending_records']} records, {s['backlog_audio_minutes']:.0f} audio-min, "
+            f"drains in ~{s['drain_seconds'] / 60:.0f}min on {s['workers']} workers "
+            f"(recommended: {s['recommended_workers']})"
+        )
+
+    def _load_rates(self) -> Dict[str, float]:
+        if not self.rates_path.exists():
+            return {}
+        try:
+            return {k: float(v) for k, v in json.loads(self.rates_path.read_text()).items()}
+        except (ValueError, OSError, AttributeError) as e:
+            logger.warning(f"Could not read throughput rates {self.rates_path}: {e}")
+            return {}
@@ -0,0 +1,310 @@
+"""
+Bulk Ingest
+Processes a local folder, glob or manifest through UnifiedProcessor with a
+parallel worker pool - no Airtable rows or polling needed. Results go to a
+SQLite file (and optionally JSONL); re-running resumes where it stopped.
+
+Usage:
+    python bulk_ingest.py /archive/videos --workers 4
+    python bulk_ingest.py "/archive/**/*.pdf" --jsonl results.jsonl
+    python bulk_ingest.py manifest.csv          # columns: source[,record_id][,title]
+                                                # (playlist/channel URLs expand to their videos)
+    python bulk_ingest.py manifest.jsonl --airtable-sync
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from collection_expander import CollectionExpander
+from content_router import ContentRouter
+from tracing import setup_logging, tracer
+from unified_processor import UnifiedProcessor
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    record_id       TEXT PRIMARY KEY,
+    source          TEXT,
+    title           TEXT,
+    status          TEXT,       -- 'Extracted' or 'Failed'
+    key_quotes      TEXT,
+    core_philosophy TEXT,
+    transcription   TEXT,
+    error           TEXT,
+    input_bytes     INTEGER,
+    elapsed_seconds REAL,
+    finished_at     REAL,
+    airtable_id     TEXT
+);
+"""
+
+
+def load_items(target: str) -> List[Dict]:
+    """
+    Expand a directory, glob or CSV/JSONL manifest into work items.
+
+    Returns:
+        List of dicts with source, record_id and title
+    """
+    path = Path(target)
+    supported = ContentRouter.DOCUMENT_EXTENSIONS | ContentRouter.MEDIA_EXTENSIONS
+
+    if path.is_dir():
+        sources = sorted(str(p) for p in path.rglob("*") if p.is_file() and p.suffix.lower() in supported)
+        rows = [{"source": s} for s in sources]
+    elif path.suffix.lower() == ".csv" and path.exists():
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    elif path.suffix.lower() == ".jsonl" and path.exists():
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        sources = sorted(p for p in glob.glob(target, recursive=True) if Path(p).is_file())
+        rows = [{"source": s} for s in sources]
+
+    items = []
+    for row in rows:
+        source = row.get("source") or row.get("url") or row.get("path")
+        if not source:
+            continue
+        if not source.startswith(("http://", "https://")):
+            source = str(Path(source).resolve())
+        items.append({
+            "source": source,
+            # Stable ID so re-runs and resumes line up with earlier results
+            "record_id": row.get("record_id") or "local-" + hashlib.sha1(source.encode()).hexdigest()[:16],
+            "title": row.get("title") or Path(source).stem,
+        })
+    return items
+
+
+def expand_collections(items: List[Dict]) -> List[Dict]:
+    """
+    Replace playlist, channel and Drive folder items with one item per entry.
+
+    Child record IDs are derived from the entry URL like any other item, so
+    entries finished in an earlier run are skipped on resume.
+    """
+    router, expander = ContentRouter(), CollectionExpander()
+    expanded = []
+    for item in items:
+        if not item["source"].startswith(("http://", "https://")) or not router.is_collection(item["source"]):
+            expanded.append(item)
+            continue
+        try:
+            entries = expander.expand(item["source"])
+        except Exception as e:
+            logger.error(f"❌ Could not expand {item['source']}: {e}")
+            continue
+        expanded.extend(
+            {
+                "source": entry["url"],
+                "record_id": "local-" + hashlib.sha1(entry["url"].encode()).hexdigest()[:16],
+                "title": entry["title"],
+            }
+            for entry in entries
+        )
+    return expanded
+
+
+class IngestResults:
+    """SQLite result store (the resume checkpoint) with optional JSONL mirror."""
+
+    def __init__(self, db_path: str, jsonl_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.jsonl_path = jsonl_path
+
+    def completed_ids(self) -> set:
+        with self._lock:
+            rows = self._conn.execute("SELECT record_id FROM results WHERE status = 'Extracted'").fetchall()
+        return {r[0] for r in rows}
+
+    def save(self, item: Dict, results: Dict, input_bytes: int, elapsed: float):
+        ok = results.get("status") == "Extracted"
+        row = {
+            "record_id": item["record_id"],
+            "source": item["source"],
+            "title": item["title"],
+            "status": "Extracted" if ok else "Failed",
+            "key_quotes": results.get("key_quotes", ""),
+            "core_philosophy": results.get("core_philosophy", ""),
+            "transcription": results.get("transcription", "") if ok else "",
+            "error": "" if ok else results.get("transcription", ""),
+            "input_bytes": input_bytes,
+            "elapsed_seconds": elapsed,
+            "finished_at": time.time(),
+        }
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(record_id, source, title, status, key_quotes, core_philosophy, transcription, "
+                    " error, input_bytes, elapsed_seconds, finished_at) "
+                    "VALUES (:record_id, :source, :title, :status, :key_quotes, :core_philosophy, "
+                    " :transcription, :error, :input_bytes, :elapsed_seconds, :finished_at)",
+                    row
+                )
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+
+    def unsynced(self) -> List[Dict]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT record_id, source, title, key_quotes, core_philosophy, transcription "
+                "FROM results WHERE status = 'Extracted' AND airtable_id IS NULL"
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, r)) for r in cursor.fetchall()]
+
+    def mark_synced(self, record_id: str, airtable_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE results SET airtable_id = ? WHERE record_id = ?", (airtable_id, record_id))
+
+
+class BulkIngest:
+    """Runs UnifiedProcessor over many items with a worker pool."""
+
+    def __init__(self, processor: UnifiedProcessor, results: IngestResults, workers: int = 2):
+        self.processor = processor
+        self.results = results
+        self.workers = workers
+
+        self._lock = threading.Lock()
+        self._done = 0
+        self._failed = 0
+        self._bytes = 0
+        self._started = 0.0
+
+    def run(self, items: List[Dict]) -> Dict[str, int]:
+        """
+        Process every item not already completed.
+
+        Returns:
+            Counts of processed, failed and skipped items
+        """
+        completed = self.results.completed_ids()
+        todo = [i for i in items if i["record_id"] not in completed]
+        skipped = len(items) - len(todo)
+
+        logger.info(f"📦 {len(items)} items: {skipped} already done, {len(todo)} to process with {self.workers} workers")
+        self._started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as pool:
+            futures = [pool.submit(self._process, item) for item in todo]
+            for future in as_completed(futures):
+                item, ok, elapsed = future.result()
+                self._report(item, ok, elapsed, len(todo))
+
+        return {"processed": self._done - self._failed, "failed": self._failed, "skipped": skipped}
+
+    def _process(self, item: Dict):
+        start = time.monotonic()
+        source = item["source"]
+        input_bytes = os.path.getsize(source) if os.path.exists(source) else 0
+
+        with tracer.span("record", root=True, record_id=item["record_id"], source=source, bytes=input_bytes) as span:
+            try:
+                results = self.processor.process_content(source, item["record_id"], title=item["title"])
+            except Exception as e:
+                results = {"transcription": f"ERROR: {e}", "status": "Raw"}
+            if results.get("status") != "Extracted":
+                span.fail(results.get("transcription", "")[:200])
+
+        elapsed = time.monotonic() - start
+        self.results.save(item, results, input_bytes, elapsed)
+
+        with self._lock:
+            self._bytes += input_bytes
+        return item, results.get("status") == "Extracted", elapsed
+
+    def _report(self, item: Dict, ok: bool, elapsed: float, total: int):
+        """Log progress with throughput and ETA."""
+        with self._lock:
+            self._done += 1
+            if not ok:
+                self._failed += 1
+            done, wall = self._done, time.monotonic() - self._started
+            mb = self._bytes / (1024 * 1024)
+
+        rate = done / wall if wall else 0
+        eta = (total - done) / rate if rate else 0
+        icon = "✅" if ok else "❌"
+        logger.info(
+            f"[{done}/{total}] {icon} {item['title']} ({elapsed:.1f}s) | "
+            f"{rate * 60:.1f} items/min, {mb / wall if wall else 0:.2f} MB/s in, ETA {eta / 60:.0f}min"
+        )
+
+
+def sync_to_airtable(results: IngestResults) -> int:
+    """Create Airtable rows for finished items that don't have one yet."""
+    from airtable_client import AirtableClient
+
+    airtable = AirtableClient(
+        api_key=os.getenv("AIRTABLE_API_KEY"),
+        base_id=os.getenv("AIRTABLE_BASE_ID"),
+        table_id=os.getenv("AIRTABLE_TABLE_ID")
+    )
+
+    rows = results.unsynced()
+    created = airtable.create_records([{**r, "status": "Extracted"} for r in rows])
+
+    for row, airtable_id in zip(rows, created):
+        if airtable_id:
+            results.mark_synced(row["record_id"], airtable_id)
+
+    return sum(1 for a in created if a)
+
+
+def main():
+    """Entry point for bulk ingestion."""
+    setup_logging(trace_file=Path(__file__).parent.parent / "logs" / "traces.jsonl")
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Bulk-process local files or a manifest without Airtable")
+    parser.add_argument("target", help="Directory, glob, or .csv/.jsonl manifest")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INGEST_WORKERS", "2")))
+    parser.add_argument("--db", default=str(Path(__file__).parent.parent / "state" / "ingest.db"),
+                        help="SQLite results file (also the resume checkpoint)")
+    parser.add_argument("--jsonl", help="Also append each result to this JSONL file")
+    parser.add_argument("--airtable-sync", action="store_true", help="Create Airtable rows for results at the end")
+    args = parser.parse_args()
+
+    items = expand_collections(load_items(args.target))
+    if not items:
+        logger.error(f"No supported files found for {args.target}")
+        raise SystemExit(1)
+
+    Path(args.db).parent.mkdir(parents=True, exist_ok=True)
+    results = IngestResults(args.db, args.jsonl)
+
+    download_dir = Path(__file__).parent.parent / "downloads"
+    processor = UnifiedProcessor(download_dir=str(download_dir))
+
+    totals = BulkIngest(processor, results, workers=args.workers).run(items)
+    logger.info(f"🏁 Done: {totals['processed']} processed, {totals['failed']} failed, {totals['skipped']} skipped")
+
+    if args.airtable_sync:
+        logger.info(f"📤 Synced {sync_to_airtable(results)} records to Airtable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Circuit Breaker
+Per-backend circuit breakers (OpenAI transcription, OpenAI chat,
+AssemblyAI, Airtable, yt-dlp). When a backend's recent error rate crosses
+a threshold, its breaker opens and calls fail immediately instead of each
+record wasting a download and a full retry budget on it. After a cooldown
+one probe call is let through; success closes the breaker again.
+
+Only outage-like errors count (timeouts, connection errors, 429, 5xx and
+auth failures) - a 400 for one bad file says nothing about the backend.
+
+Tuning (shared by all breakers): CIRCUIT_FAILURE_RATE (0.5),
+CIRCUIT_MIN_CALLS (5), CIRCUIT_WINDOW (20 calls), CIRCUIT_COOLDOWN_SECONDS (60).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a backend whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open (backend unhealthy) - next probe in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def is_outage(error: Exception) -> bool:
+    """True for errors that say the backend is down or refusing us, not that one request was bad."""
+    if isinstance(error, CircuitOpen):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in (401, 403, 408, 429) or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in (
+        "APIConnectionError", "APITimeoutError", "ConnectTimeout", "ReadTimeout", "ConnectionError"
+    )
+
+
+class CircuitBreaker:
+    """Error-rate breaker over a sliding window of recent calls."""
+
+    # Each consecutive failed probe doubles the cooldown, up to this
+    MAX_COOLDOWN = 900.0
+
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 5,
+                 window: int = 20, cooldown: float = 60.0,
+                 is_failure: Callable[[Exception], bool] = is_outage):
+        """
+        Initialize breaker.
+
+        Args:
+            name: Backend name for logs
+            failure_rate: Share of failed calls in the window that opens the breaker
+            min_calls: Calls needed in the window before it can open
+            window: Number of recent calls considered
+            cooldown: Seconds open before a probe call is allowed
+            is_failure: Decides which exceptions count against the backend
+        """
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.is_failure = is_failure
+
+        self.state = CLOSED
+        self.times_opened = 0
+        self._outcomes: deque = deque(maxlen=window)  # True = success
+        self._opened_at = 0.0
+        self._open_for = cooldown
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would be let through, without claiming the probe slot."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at >= self._open_for
+            return self.state == CLOSED or not self._probing
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_at + self._open_for - time.monotonic()) if self.state == OPEN else 0.0
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn through the breaker.
+
+        Raises:
+            CircuitOpen: Without calling fn, when the breaker is open
+        """
+        if not self.allow():
+            raise CircuitOpen(self.name, self.retry_in())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()  # The backend answered; the request was the problem
+            raise
+        self.record_success()
+        return result
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                logger.info(f"🟢 {self.name} recovered - circuit closed")
+                self.state = CLOSED
+                self._outcomes.clear()
+                self._open_for = self.cooldown
+            self._probing = False
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                # Probe failed: stay open, and wait longer next time
+                self._open_for = min(self.MAX_COOLDOWN, self._open_for * 2)
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.times_opened += 1
+        logger.warning(f"🔴 {self.name} circuit open - failing fast for {self._open_for:.0f}s")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self.state,
+                "calls": len(self._outcomes),
+                "failures": self._outcomes.count(False),
+                "times_opened": self.times_opened,
+            }
+
+
+class CircuitBreakers:
+    """Registry with one breaker per backend name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, is_failure: Optional[Callable[[Exception], bool]] = None) -> CircuitBreaker:
+        """Get (creating on first use) the breaker for a backend."""
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(
+                    name,
+                    failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+                    min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "5")),
+                    window=int(os.getenv("CIRCUIT_WINDOW", "20")),
+                    cooldown=float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "60")),
+                    is_failure=is_failure or is_outage,
+                )
+            return self._breakers[name]
+
+    def report(self) -> str:
+        """One-line summary of breakers that have opened or are open."""
+        with self._lock:
+            snapshots: List[Dict] = [b.snapshot() for b in self._breakers.values()]
+        parts = [
+            f"{s['name']} {s['state']} (opened {s['times_opened']}x)"
+            for s in snapshots if s["times_opened"] or s["state"] != CLOSED
+        ]
+        return ", ".join(parts) or "all closed"
+
+
+# The one registry for the whole process
+breakers = CircuitBreakers()
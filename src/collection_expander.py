@@ -0,0 +1,165 @@
+"""
+Collection Expander
+Lists the entries of a playlist, channel or folder (YouTube playlists and
+channels, Google Drive folders, local directories) so each entry can be
+processed as its own child job. Remote collections are listed with
+yt-dlp's flat extraction - one cheap metadata request, nothing downloaded.
+
+Expanded entries are remembered in a JSON store, so re-running a
+collection only picks up entries that are new since the last run.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from atomic_file import atomic_write_json
+from content_router import ContentRouter
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionExpander:
+    """Turns a collection URL or directory into a list of child entries."""
+
+    # YouTube channel URLs list tabs (Videos, Shorts, Live) rather than videos
+    CHANNEL_PREFIXES = ('/channel/', '/c/', '/user/', '/@')
+    CHANNEL_TABS = {'videos', 'shorts', 'streams', 'playlists', 'featured'}
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize expander.
+
+        Args:
+            max_entries: Most entries listed per collection (COLLECTION_MAX_ENTRIES)
+        """
+        self.max_entries = max_entries or int(os.getenv("COLLECTION_MAX_ENTRIES", "500"))
+
+    def expand(self, url: str) -> List[Dict]:
+        """
+        List a collection's entries.
+
+        Args:
+            url: Playlist/channel/folder URL or a local directory
+
+        Returns:
+            List of dicts with key (stable across runs), url and title
+        """
+        path = Path(url)
+        if not url.startswith(('http://', 'https://')) and path.is_dir():
+            entries = self._expand_directory(path)
+        else:
+            entries = self._expand_remote(url)
+
+        logger.info(f"📚 Expanded {url} into {len(entries)} entries")
+        return entries[:self.max_entries]
+
+    def _expand_directory(self, path: Path) -> List[Dict]:
+        supported = ContentRouter.DOCUMENT_EXTENSIONS | ContentRouter.MEDIA_EXTENSIONS
+        files = sorted(p.resolve() for p in path.rglob("*") if p.is_file() and p.suffix.lower() in supported)
+        return [{'key': f"file:{p}", 'url': str(p), 'title': p.stem} for p in files]
+
+    def _expand_remote(self, url: str) -> List[Dict]:
+        import yt_dlp
+
+        ydl_opts = {
+            'extract_flat': 'in_playlist',  # List entries without resolving each one
+            'playlistend': self.max_entries,
+            'quiet': True,
+            'no_warnings': True,
+            'socket_timeout': 30,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(self._normalize(url), download=False)
+
+        entries, seen = [], set()
+        for entry in self._flatten(info):
+            entry_url = entry.get('url') or entry.get('webpage_url')
+            if not entry_url:
+                continue
+            key = f"{entry.get('ie_key') or info.get('extractor_key')}:{entry.get('id') or entry_url}"
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append({'key': key, 'url': entry_url, 'title': entry.get('title') or entry.get('id') or entry_url})
+        return entries
+
+    def _flatten(self, info: Dict) -> Iterator[Dict]:
+        """Yield leaf entries, descending into nested playlists (e.g. channel tabs)."""
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue  # Private/deleted videos come back as None
+            if entry.get('_type') == 'playlist':
+                yield from self._flatten(entry)
+            else:
+                yield entry
+
+    def _normalize(self, url: str) -> str:
+        """Point a bare YouTube channel URL at its Videos tab."""
+        parsed = urlparse(url)
+        if 'youtube.com' not in parsed.netloc or not parsed.path.startswith(self.CHANNEL_PREFIXES):
+            return url
+        parts = [p for p in parsed.path.split('/') if p]
+        if parts[-1] in self.CHANNEL_TABS:
+            return url
+        return parsed._replace(path=parsed.path.rstrip('/') + '/videos').geturl()
+
+
+class CollectionStore:
+    """JSON-file record of expanded entries, keyed by entry key."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = self._load()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Get the child job created for an entry, if any."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, parent_id: str, child_id: str, source: str, table: Optional[str] = None):
+        """Record the child job created for an entry (unfinished until mark_done)."""
+        with self._lock:
+            self._entries[key] = {
+                "parent_id": parent_id,
+                "child_id": child_id,
+                "source": source,
+                "table": table,
+                "done": False,
+                "expanded_at": time.time()
+            }
+            self._save()
+
+    def mark_done(self, child_ids: List[str]):
+        """Mark child jobs as finished (processed, or handed back to the poll)."""
+        wanted = set(child_ids)
+        with self._lock:
+            for entry in self._entries.values():
+                if entry["child_id"] in wanted:
+                    entry["done"] = True
+            self._save()
+
+    def unfinished(self) -> List[Dict]:
+        """Child jobs created but never finished, e.g. by a run that crashed."""
+        with self._lock:
+            # Entries from before "done" was tracked count as finished
+            return [dict(e) for e in self._entries.values() if not e.get("done", True)]
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not read collection store {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        atomic_write_json(self.path, self._entries)
@@ -6,8 +6,10 @@ Detects content type and routes to appropriate processor.
 import logging
 from pathlib import Path
 from typing import Dict, Tuple
-import subprocess
-import requests
+from urllib.parse import parse_qs, urlparse
+
+from stage_deadlines import deadlines
+from http_clients import registry
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,9 @@ class ContentRouter:
     # Audio/Video extensions
     MEDIA_EXTENSIONS = {'.mp3', '.mp4', '.wav', '.m4a', '.mov', '.avi', '.mkv', '.webm'}
     
+    # YouTube paths that list many videos (a watch URL with &list= is one video)
+    YOUTUBE_COLLECTION_PREFIXES = ('/playlist', '/channel/', '/c/', '/user/', '/@')
+    
     def __init__(self):
         pass
     
@@ -37,10 +42,14 @@ class ContentRouter:
             
         Returns:
             Tuple of (content_type, metadata)
-            content_type: 'document', 'audio', 'video', 'url'
+            content_type: 'document', 'audio', 'video', 'url', 'collection'
             metadata: Dict with size, format, processing_method, etc.
         """
         try:
+            # Playlists, channels and folders are expanded into child jobs
+            if self.is_collection(url):
+                return 'collection', {'processing_method': 'expand', 'url': url}
+            
             # Check if it's a web URL
             if url.startswith('http://') or url.startswith('https://'):
                 return self._detect_url_type(url)
@@ -60,7 +69,7 @@ class ContentRouter:
     def _detect_url_type(self, url: str) -> Tuple[str, Dict]:
         """Detect type of content from URL."""
         # Check for common video platforms
-        video_platforms = ['youtube.com', 'youtu.be', 'vimeo.com', 'dailymotion.com']
+        video_platforms = ['youtube.com', 'youtu.be', 'vimeo.com', 'dailymotion.com', 'drive.google.com/file/']
         if any(platform in url.lower() for platform in video_platforms):
             return 'video', {'processing_method': 'yt-dlp', 'url': url}
         
@@ -108,6 +117,43 @@ class ContentRouter:
         
         return 'unknown', {'path': str(path), 'extension': ext}
     
+    def is_collection(self, url: str) -> bool:
+        """Check if a source is a playlist, channel or folder rather than one item."""
+        if not (url.startswith('http://') or url.startswith('https://')):
+            return Path(url).is_dir()
+        
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        if 'youtube.com' in host:
+            if parsed.path == '/watch':
+                return False
+            return parsed.path.startswith(self.YOUTUBE_COLLECTION_PREFIXES) or 'list' in parse_qs(parsed.query)
+        if 'drive.google.com' in host:
+            return '/folders/' in parsed.path
+        return False
+    
+    def is_direct_media_url(self, url: str) -> bool:
+        """Check if URL points straight at a media file (not a video platform page)."""
+        if not (url.startswith('http://') or url.startswith('https://')):
+            return False
+        content_type, metadata = self._detect_url_type(url)
+        return content_type == 'video' and metadata['processing_method'] == 'download_first'
+    
+    def probe_url_size(self, url: str) -> int:
+        """
+        Get size of a remote file from a HEAD request.
+        
+        Returns:
+            Size in bytes, or 0 if the server doesn't report it
+        """
+        try:
+            response = registry.session("web").head(url, allow_redirects=True, timeout=15)
+            response.raise_for_status()
+            return int(response.headers.get('Content-Length', 0))
+        except Exception as e:
+            logger.warning(f"Could not probe URL size: {e}")
+            return 0
+    
     def get_file_duration(self, path: Path) -> float:
         """Get duration of audio/video file in seconds."""
         try:
@@ -119,7 +165,7 @@ class ContentRouter:
                 str(path)
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = deadlines.run("probe", cmd, capture_output=True, text=True)
             return float(result.stdout.strip())
         except Exception as e:
             logger.warning(f"Could not get duration: {e}")
@@ -0,0 +1,224 @@
+"""
+Credential Pool
+Spreads requests for one service across several API keys so throughput
+scales past a single account's rate limit. Each key's rate-limit headers
+are tracked, and a key that gets a 429 sits out until its window resets.
+
+Configure with comma-separated OPENAI_API_KEYS / ASSEMBLYAI_API_KEYS /
+AIRTABLE_API_KEYS; the single-key variables still work on their own.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class NoCredentialAvailable(TimeoutError):
+    """Raised when every key is cooling down for longer than a caller can wait."""
+
+
+class Credential:
+    """One API key and what we've learned about its rate limits."""
+
+    def __init__(self, key: str, label: str):
+        self.key = key
+        # Safe to log and persist - never the key itself
+        self.id = hashlib.sha256(key.encode()).hexdigest()[:12]
+        self.label = label
+
+        self.uses = 0
+        self.in_flight = 0
+        self.times_limited = 0
+        self.consecutive_limits = 0
+        self.last_limited = 0.0      # monotonic time of the last 429 (0 = never)
+        self.cooldown_until = 0.0    # monotonic time it may be used again
+        self.remaining: Optional[int] = None  # requests left in the window, if reported
+
+
+class CredentialPool:
+    """Hands out the best available key for each request."""
+
+    # Cooldown after a 429 without a usable reset header; doubles on repeats
+    DEFAULT_COOLDOWN = 20.0
+    MAX_COOLDOWN = 600.0
+
+    def __init__(self, service: str, keys: List[str], cooldown: Optional[float] = None):
+        """
+        Initialize pool.
+
+        Args:
+            service: Name for logs
+            keys: API keys (duplicates and blanks ignored)
+            cooldown: Base seconds a key sits out after a 429
+        """
+        self.service = service
+        self.cooldown = cooldown or self.DEFAULT_COOLDOWN
+
+        unique = list(dict.fromkeys(k.strip() for k in keys if k and k.strip()))
+        self.credentials = [Credential(key, f"{service} key {i + 1}") for i, key in enumerate(unique)]
+        self._by_id = {c.id: c for c in self.credentials}
+        self._cond = threading.Condition()
+
+        if len(self.credentials) > 1:
+            logger.info(f"🔑 {service}: pooling {len(self.credentials)} API keys")
+
+    @classmethod
+    def from_env(cls, prefix: str, cooldown: Optional[float] = None) -> "CredentialPool":
+        """Build from {prefix}_API_KEYS (comma-separated), falling back to {prefix}_API_KEY."""
+        keys = os.getenv(f"{prefix}_API_KEYS", "").split(",")
+        if not any(k.strip() for k in keys):
+            keys = [os.getenv(f"{prefix}_API_KEY", "")]
+        return cls(prefix.lower(), keys, cooldown=cooldown)
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    @property
+    def primary(self) -> Optional[Credential]:
+        """First configured key, for callers that need a fixed one."""
+        return self.credentials[0] if self.credentials else None
+
+    def get(self, credential_id: str) -> Optional[Credential]:
+        return self._by_id.get(credential_id)
+
+    def available(self) -> int:
+        """Number of keys not currently sitting out."""
+        now = time.monotonic()
+        with self._cond:
+            return sum(1 for c in self.credentials if c.cooldown_until <= now)
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Optional[Credential]]:
+        """
+        Borrow the best key for one request, waiting if every key is cooling down.
+
+        Preference: fewest requests in flight, then least recently rate
+        limited, then least used - so healthy keys share the load and a key
+        that was just limited is the last to be picked again.
+
+        Yields None for an empty pool, so callers fall back to their default.
+
+        Args:
+            timeout: Longest to wait for a key to come out of cooldown (None = no limit)
+
+        Raises:
+            NoCredentialAvailable: When no key frees up within timeout
+        """
+        if not self.credentials:
+            yield None
+            return
+
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [c for c in self.credentials if c.cooldown_until <= now]
+                if ready:
+                    break
+                wait = min(c.cooldown_until for c in self.credentials) - now
+                if give_up is not None and now + wait > give_up:
+                    raise NoCredentialAvailable(f"No {self.service} key frees up within {timeout:.0f}s")
+                logger.info(f"⏳ All {self.service} keys are rate limited - waiting {wait:.0f}s")
+                self._cond.wait(wait)
+
+            credential = min(ready, key=lambda c: (c.in_flight, c.last_limited, c.uses))
+            credential.in_flight += 1
+            credential.uses += 1
+
+        try:
+            yield credential
+        finally:
+            with self._cond:
+                credential.in_flight -= 1
+                self._cond.notify_all()
+
+    def observe(self, credential: Optional[Credential], status: int, headers=None):
+        """
+        Update a key's state from a response.
+
+        Args:
+            credential: Key the request was sent with
+            status: HTTP status code
+            headers: Response headers (OpenAI-style x-ratelimit-* are understood)
+        """
+        if credential is None:
+            return
+        headers = headers or {}
+
+        if status == 429:
+            self.mark_limited(credential, self._retry_after(headers))
+            return
+
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        with self._cond:
+            if status < 400:
+                credential.consecutive_limits = 0
+            if remaining is not None and remaining.isdigit():
+                credential.remaining = int(remaining)
+
+        # Window used up: sit out until it resets instead of collecting a 429
+        if credential.remaining == 0:
+            reset = _parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                with self._cond:
+                    credential.cooldown_until = max(credential.cooldown_until, time.monotonic() + reset)
+
+    def mark_limited(self, credential: Credential, seconds: Optional[float] = None):
+        """Take a key out of rotation for seconds (default: backoff from the base cooldown)."""
+        with self._cond:
+            credential.times_limited += 1
+            credential.consecutive_limits += 1
+            credential.last_limited = time.monotonic()
+            if not seconds:
+                seconds = min(self.MAX_COOLDOWN, self.cooldown * 2 ** (credential.consecutive_limits - 1))
+            credential.cooldown_until = max(credential.cooldown_until, credential.last_limited + seconds)
+
+        logger.warning(f"🚦 {credential.label} rate limited - out of rotation for {seconds:.0f}s")
+
+    def httpx_hook(self, credential: Optional[Credential]):
+        """httpx response event hook that reports every response to the pool."""
+        def hook(response):
+            self.observe(credential, response.status_code, response.headers)
+        return hook
+
+    def snapshot(self) -> List[Dict]:
+        """Per-key usage for logs (no secrets)."""
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "key": c.label,
+                    "id": c.id,
+                    "uses": c.uses,
+                    "in_flight": c.in_flight,
+                    "times_limited": c.times_limited,
+                    "cooling_seconds": max(0.0, c.cooldown_until - now),
+                    "remaining": c.remaining,
+                }
+                for c in self.credentials
+            ]
+
+    def _retry_after(self, headers) -> Optional[float]:
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+        return _parse_duration(headers.get("x-ratelimit-reset-requests"))
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset durations like '20ms', '1s' or '6m0s' into seconds."""
+    if not value:
+        return None
+    total, matched = 0.0, False
+    for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+        matched = True
+    return total if matched else None
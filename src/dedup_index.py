@@ -0,0 +1,332 @@
+"""
+Duplicate Source Detection
+Recognises the same episode arriving from different URLs (re-uploads,
+Drive copies, podcast feeds) so it is only transcribed once.
+
+Two signals, both looked up through SQLite indexes so cost stays
+sub-linear as the library grows:
+  - Audio fingerprint of the first few minutes (Haitsma-Kalker style
+    32-bit sub-fingerprints, matched by offset voting)
+  - MinHash/LSH over transcript word shingles
+"""
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+from stage_deadlines import deadlines
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    record_id   TEXT PRIMARY KEY,
+    insights    TEXT,           -- JSON: key_quotes, core_philosophy
+    fingerprint BLOB,           -- uint32 sub-fingerprints, full sequence
+    minhash     BLOB            -- uint64 MinHash signature
+);
+CREATE TABLE IF NOT EXISTS audio_hashes (
+    hash      INTEGER,
+    record_id TEXT,
+    pos       INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_audio_hash ON audio_hashes (hash);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band      INTEGER,
+    bucket    INTEGER,
+    record_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh_buckets (band, bucket);
+"""
+
+
+class DedupIndex:
+    """Fingerprint and MinHash index over already-processed sources."""
+
+    # Audio fingerprinting
+    SAMPLE_RATE = 5512
+    FRAME_SIZE = 2048           # ~370ms
+    HOP_SIZE = 256              # ~46ms, 87.5% overlap keeps bits stable across encodes
+    NUM_BANDS = 33              # 33 bands -> 32 bits per frame
+    MIN_FREQ, MAX_FREQ = 300, 2000
+    INDEX_EVERY = 8             # Only every 8th frame goes in the inverted index
+    MIN_VOTES = 3               # Agreeing offset votes before a candidate is verified
+    MAX_BIT_ERROR_RATE = 0.35
+    DEGENERATE_HASHES = {0, 0xFFFFFFFF}  # Silence - would match everything
+
+    # Transcript MinHash
+    NUM_PERM = 128
+    LSH_BANDS = 32              # 32 bands x 4 rows -> candidates from ~0.4 Jaccard
+    SHINGLE_WORDS = 5
+    MERSENNE_PRIME = 4294967311  # Smallest prime above 2^32
+
+    def __init__(self, db_path: str):
+        self.enabled = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+        self.fingerprint_seconds = int(os.getenv("DEDUP_FINGERPRINT_SECONDS", "180"))
+        self.text_threshold = float(os.getenv("DEDUP_TRANSCRIPT_THRESHOLD", "0.8"))
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+        self._perms = None
+
+    # ------------------------------------------------------------------
+    # Audio fingerprints
+    # ------------------------------------------------------------------
+
+    def audio_fingerprint(self, audio_path: Path):
+        """
+        Fingerprint the first fingerprint_seconds of an audio file.
+
+        Returns:
+            numpy uint32 array of sub-fingerprints, or None on failure
+        """
+        import numpy as np
+
+        cmd = [
+            'ffmpeg', '-v', 'error',
+            '-t', str(self.fingerprint_seconds),
+            '-i', str(audio_path),
+            '-ac', '1', '-ar', str(self.SAMPLE_RATE),
+            '-f', 's16le', '-'
+        ]
+        try:
+            pcm = deadlines.run("fingerprint", cmd, media_seconds=self.fingerprint_seconds,
+                                capture_output=True, check=True).stdout
+        except Exception as e:
+            logger.warning(f"Could not decode audio for fingerprint: {e}")
+            return None
+
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        if len(samples) < self.FRAME_SIZE * 4:
+            return None
+
+        # Framed power spectrum
+        num_frames = 1 + (len(samples) - self.FRAME_SIZE) // self.HOP_SIZE
+        idx = np.arange(self.FRAME_SIZE)[None, :] + self.HOP_SIZE * np.arange(num_frames)[:, None]
+        frames = samples[idx] * np.hanning(self.FRAME_SIZE)
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+        # Energy in log-spaced bands
+        freqs = np.fft.rfftfreq(self.FRAME_SIZE, 1 / self.SAMPLE_RATE)
+        edges = np.geomspace(self.MIN_FREQ, self.MAX_FREQ, self.NUM_BANDS + 1)
+        band_of_bin = np.digitize(freqs, edges) - 1
+        valid = (band_of_bin >= 0) & (band_of_bin < self.NUM_BANDS)
+        energy = np.zeros((num_frames, self.NUM_BANDS), dtype=np.float64)
+        np.add.at(energy.T, band_of_bin[valid], power[:, valid].T)
+
+        # Bit = sign of the energy difference across bands, differenced over time
+        band_diff = energy[:, :-1] - energy[:, 1:]
+        bits = (band_diff[1:] - band_diff[:-1]) > 0
+        weights = (1 << np.arange(32, dtype=np.uint64))
+        return (bits.astype(np.uint64) @ weights).astype(np.uint32)
+
+    def find_audio_match(self, fingerprint) -> Optional[str]:
+        """
+        Find an already-processed source with matching audio.
+
+        Returns:
+            record_id of the match, or None
+        """
+        import numpy as np
+
+        if fingerprint is None or not len(fingerprint):
+            return None
+
+        # Offset voting: every exact sub-fingerprint hit votes for (record, offset)
+        votes = Counter()
+        query = [(pos, int(h)) for pos, h in enumerate(fingerprint) if int(h) not in self.DEGENERATE_HASHES]
+        with self._lock:
+            for i in range(0, len(query), 500):
+                batch = query[i:i + 500]
+                positions = {}
+                for qpos, h in batch:
+                    positions.setdefault(h, []).append(qpos)
+                rows = self._conn.execute(
+                    f"SELECT hash, record_id, pos FROM audio_hashes "
+                    f"WHERE hash IN ({','.join('?' * len(positions))})",
+                    list(positions)
+                ).fetchall()
+                for h, record_id, pos in rows:
+                    for qpos in positions[h]:
+                        votes[(record_id, pos - qpos)] += 1
+
+        for (record_id, offset), count in votes.most_common(5):
+            if count < self.MIN_VOTES:
+                break
+            stored = self._load_array(record_id, "fingerprint", np.uint32)
+            ber = self._bit_error_rate(fingerprint, stored, offset)
+            if ber <= self.MAX_BIT_ERROR_RATE:
+                logger.info(f"🔁 Audio matches {record_id} (offset {offset}, BER {ber:.2f})")
+                return record_id
+
+        return None
+
+    def _bit_error_rate(self, query, stored, offset: int) -> float:
+        """Fraction of differing bits where the two sequences overlap at offset."""
+        import numpy as np
+
+        q_start = max(0, -offset)
+        s_start = max(0, offset)
+        length = min(len(query) - q_start, len(stored) - s_start)
+        if length <= 0:
+            return 1.0
+
+        diff = np.bitwise_xor(query[q_start:q_start + length], stored[s_start:s_start + length])
+        differing = np.unpackbits(diff.view(np.uint8)).sum()
+        return float(differing) / (length * 32)
+
+    # ------------------------------------------------------------------
+    # Transcript MinHash
+    # ------------------------------------------------------------------
+
+    def minhash(self, text: str):
+        """
+        MinHash signature over word shingles of a transcript.
+
+        Returns:
+            numpy uint64 array of NUM_PERM values, or None for very short text
+        """
+        import numpy as np
+
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        if len(words) < self.SHINGLE_WORDS * 4:
+            return None
+
+        shingles = {
+            zlib.crc32(' '.join(words[i:i + self.SHINGLE_WORDS]).encode())
+            for i in range(len(words) - self.SHINGLE_WORDS + 1)
+        }
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+
+        if self._perms is None:
+            rng = np.random.default_rng(1)  # Fixed seed - signatures must be stable
+            a = rng.integers(1, 2 ** 32, size=self.NUM_PERM, dtype=np.uint64)
+            b = rng.integers(0, 2 ** 32, size=self.NUM_PERM, dtype=np.uint64)
+            self._perms = (a, b)
+        a, b = self._perms
+
+        # a, x < 2^32 and b < 2^32 so a*x + b never overflows uint64
+        hashed = (a[:, None] * x[None, :] + b[:, None]) % np.uint64(self.MERSENNE_PRIME)
+        return hashed.min(axis=1)
+
+    def find_text_match(self, signature) -> Optional[str]:
+        """
+        Find an already-processed source with a near-identical transcript.
+
+        Returns:
+            record_id of the match, or None
+        """
+        import numpy as np
+
+        if signature is None:
+            return None
+
+        candidates = set()
+        with self._lock:
+            for band, bucket in enumerate(self._lsh_buckets(signature)):
+                rows = self._conn.execute(
+                    "SELECT record_id FROM lsh_buckets WHERE band = ? AND bucket = ?",
+                    (band, bucket)
+                ).fetchall()
+                candidates.update(r[0] for r in rows)
+
+        best_id, best_score = None, 0.0
+        for record_id in candidates:
+            stored = self._load_array(record_id, "minhash", np.uint64)
+            if len(stored) != len(signature):
+                continue
+            score = float(np.mean(stored == signature))
+            if score > best_score:
+                best_id, best_score = record_id, score
+
+        if best_score >= self.text_threshold:
+            logger.info(f"🔁 Transcript matches {best_id} (similarity {best_score:.2f})")
+            return best_id
+        return None
+
+    def _lsh_buckets(self, signature):
+        rows = self.NUM_PERM // self.LSH_BANDS
+        for band in range(self.LSH_BANDS):
+            yield zlib.crc32(signature[band * rows:(band + 1) * rows].tobytes())
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def register(self, record_id: str, insights: Dict, fingerprint=None, signature=None):
+        """
+        Add a processed source to the index.
+
+        Args:
+            record_id: Airtable record ID
+            insights: Dict with key_quotes and core_philosophy
+            fingerprint: From audio_fingerprint(), if media
+            signature: From minhash()
+        """
+        with self._lock, self._conn:
+            for table in ("audio_hashes", "lsh_buckets"):
+                self._conn.execute(f"DELETE FROM {table} WHERE record_id = ?", (record_id,))
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                (
+                    record_id,
+                    json.dumps({k: insights.get(k, "") for k in ("key_quotes", "core_philosophy")}),
+                    fingerprint.tobytes() if fingerprint is not None else None,
+                    signature.tobytes() if signature is not None else None
+                )
+            )
+
+            if fingerprint is not None:
+                self._conn.executemany(
+                    "INSERT INTO audio_hashes VALUES (?, ?, ?)",
+                    [(int(fingerprint[pos]), record_id, pos)
+                     for pos in range(0, len(fingerprint), self.INDEX_EVERY)
+                     if int(fingerprint[pos]) not in self.DEGENERATE_HASHES]
+                )
+
+            if signature is not None:
+                self._conn.executemany(
+                    "INSERT INTO lsh_buckets VALUES (?, ?, ?)",
+                    [(band, bucket, record_id) for band, bucket in enumerate(self._lsh_buckets(signature))]
+                )
+
+    def update_insights(self, record_id: str, insights: Dict):
+        """Replace stored insights (after a re-extraction) so duplicates reuse the new ones."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sources SET insights = ? WHERE record_id = ?",
+                (json.dumps({k: insights.get(k, "") for k in ("key_quotes", "core_philosophy")}), record_id)
+            )
+
+    def get_insights(self, record_id: str) -> Optional[Dict]:
+        """Stored insights for a previously processed source."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT insights FROM sources WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _load_array(self, record_id: str, column: str, dtype):
+        import numpy as np
+
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {column} FROM sources WHERE record_id = ?", (record_id,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(row[0], dtype=dtype)
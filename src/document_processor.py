@@ -6,11 +6,11 @@ Extracts text from PDFs, Word docs, Markdown, and web articles.
 import logging
 from pathlib import Path
 from typing import Optional
-import requests
-from PyPDF2 import PdfReader
-from docx import Document
-import markdown
-from bs4 import BeautifulSoup
+
+from http_clients import registry
+
+# PyPDF2, python-docx, markdown and bs4 are imported inside the extractors
+# so that workers which never see a document don't pay for them at startup.
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +63,8 @@ class DocumentProcessor:
     
     def _extract_from_pdf(self, path: Path) -> str:
         """Extract text from PDF."""
+        from PyPDF2 import PdfReader
+        
         reader = PdfReader(path)
         text = []
         
@@ -73,6 +75,8 @@ class DocumentProcessor:
     
     def _extract_from_docx(self, path: Path) -> str:
         """Extract text from Word document."""
+        from docx import Document
+        
         doc = Document(path)
         text = []
         
@@ -84,6 +88,9 @@ class DocumentProcessor:
     
     def _extract_from_markdown(self, path: Path) -> str:
         """Extract text from Markdown file."""
+        import markdown
+        from bs4 import BeautifulSoup
+        
         with open(path, 'r', encoding='utf-8') as f:
             md_text = f.read()
         
@@ -100,7 +107,9 @@ class DocumentProcessor:
     
     def _extract_from_url(self, url: str) -> str:
         """Extract text from web article."""
-        response = requests.get(url, timeout=30)
+        from bs4 import BeautifulSoup
+        
+        response = registry.session("web").get(url, timeout=30)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -0,0 +1,161 @@
+"""
+Fair-Share Scheduler
+Shares one worker's processing slots between several queues (one per
+Airtable table). A free slot goes to the queue with work that is using the
+smallest share of slots relative to its weight, so a table with weight 2
+gets twice the slots of a table with weight 1 while both are busy. When a
+queue has nothing waiting, its share is borrowed by the others, up to each
+queue's own concurrency limit.
+
+Queues that run dry are refilled (re-polled) while others are still busy,
+so a quiet table's new record doesn't wait behind another table's backlog.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SourceQueue:
+    """Pending work and usage counters for one source."""
+
+    def __init__(self, name: str, weight: float = 1.0, max_concurrency: int = 1):
+        self.name = name
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.pending: List[Any] = []
+        self.running = 0
+        self.started = 0
+        self.done = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.last_refill = 0.0
+
+    def can_start(self) -> bool:
+        return bool(self.pending) and self.running < self.max_concurrency
+
+    def share_key(self):
+        # Current slot share first; work done this cycle breaks ties, so
+        # equally loaded queues alternate by weight over time
+        return (self.running / self.weight, self.started / self.weight)
+
+
+class FairShareScheduler:
+    """Weighted fair sharing of a fixed number of worker slots between sources."""
+
+    def __init__(self, workers: int, refill_interval: float = 300.0):
+        """
+        Initialize scheduler.
+
+        Args:
+            workers: Slots (threads) shared by all sources
+            refill_interval: Min seconds between re-polls of an idle source
+        """
+        self.workers = max(1, workers)
+        self.refill_interval = refill_interval
+        self.sources: Dict[str, SourceQueue] = {}
+        self._cond = threading.Condition()
+
+    def add_source(self, name: str, weight: float = 1.0, max_concurrency: Optional[int] = None):
+        """Register a source; max_concurrency defaults to every slot."""
+        self.sources[name] = SourceQueue(name, weight, min(max_concurrency or self.workers, self.workers))
+
+    def run_cycle(self, handler: Callable[[str, Any], bool],
+                  fetch: Callable[[str], List[Any]],
+                  key: Callable[[Any], Any] = lambda item: item) -> Dict[str, int]:
+        """
+        Fetch work for every source and process it until all queues are empty.
+
+        Args:
+            handler: Processes one item of a source; returns True on success
+            fetch: Returns a source's pending items (its poll)
+            key: Identifies an item, so one handled this cycle isn't picked up again
+                 (e.g. a failed record reset to pending)
+
+        Returns:
+            Counts of items done and failed this cycle
+        """
+        seen = set()
+        for source in self.sources.values():
+            source.started = source.done = source.failed = 0
+            source.busy_seconds = 0.0
+            self._refill(source, fetch, key, seen)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="worker") as pool:
+            while True:
+                with self._cond:
+                    source = self._pick()
+                    if source is not None:
+                        item = source.pending.pop(0)
+                        source.running += 1
+                        source.started += 1
+                        pool.submit(self._run, source, item, handler)
+                        continue
+
+                    active = any(s.running or s.pending for s in self.sources.values())
+                    if not active:
+                        break
+                    # Wake up when a slot frees, or to re-poll idle sources
+                    self._cond.wait(timeout=min(self.refill_interval, 30))
+                    idle = [s for s in self.sources.values() if not s.pending and not s.running]
+
+                for source in idle:
+                    if time.monotonic() - source.last_refill >= self.refill_interval:
+                        self._refill(source, fetch, key, seen)
+
+        return {
+            "done": sum(s.done for s in self.sources.values()),
+            "failed": sum(s.failed for s in self.sources.values()),
+        }
+
+    def _pick(self) -> Optional[SourceQueue]:
+        """The startable source furthest below its fair share, if a slot is free."""
+        if sum(s.running for s in self.sources.values()) >= self.workers:
+            return None
+        candidates = [s for s in self.sources.values() if s.can_start()]
+        return min(candidates, key=SourceQueue.share_key) if candidates else None
+
+    def _run(self, source: SourceQueue, item: Any, handler: Callable[[str, Any], bool]):
+        start = time.monotonic()
+        ok = False
+        try:
+            ok = handler(source.name, item)
+        except Exception as e:
+            logger.error(f"❌ Unhandled error in {source.name}: {e}")
+        finally:
+            with self._cond:
+                source.running -= 1
+                source.done += 1
+                if not ok:
+                    source.failed += 1
+                source.busy_seconds += time.monotonic() - start
+                self._cond.notify_all()
+
+    def _refill(self, source: SourceQueue, fetch: Callable[[str], List[Any]],
+                key: Callable[[Any], Any], seen: set):
+        source.last_refill = time.monotonic()
+        try:
+            items = fetch(source.name)
+        except Exception as e:
+            logger.error(f"Could not fetch work for {source.name}: {e}")
+            return
+
+        fresh = [item for item in items if key(item) not in seen]
+        seen.update(key(item) for item in fresh)
+        if fresh:
+            with self._cond:
+                source.pending.extend(fresh)
+                self._cond.notify_all()
+
+    def report(self) -> str:
+        """Per-source items done and share of busy slot time this cycle."""
+        total = sum(s.busy_seconds for s in self.sources.values()) or 1.0
+        return ", ".join(
+            f"{s.name} {s.done} done/{s.failed} failed ({s.busy_seconds / total:.0%} of slot time, "
+            f"weight {s.weight:g}, max {s.max_concurrency})"
+            for s in self.sources.values()
+        )
@@ -0,0 +1,194 @@
+"""
+FFmpeg Executor
+Runs local ffmpeg jobs within the CPU the container actually has. The core
+count and cgroup CPU quota decide how many ffmpeg jobs run at once and how
+many threads each one gets, so concurrent records queue for a slot instead
+of oversubscribing a few vCPUs. Short interactive jobs (fingerprints) go
+ahead of regular ones (audio extraction, tempo), which go ahead of
+background chunk splitting; background jobs also run at a lower CPU
+priority.
+
+CPU time is accounted per stage as CPU-seconds per audio-minute.
+
+Overrides: FFMPEG_MAX_JOBS, FFMPEG_THREADS.
+"""
+
+import heapq
+import itertools
+import logging
+import math
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from subprocess_runner import observe_commands, run_command
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+NORMAL = 1
+BACKGROUND = 2
+
+
+def available_cpus() -> float:
+    """CPUs this process may use: the smaller of its CPU affinity and its cgroup quota."""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+
+    quota = _cgroup_quota()
+    if quota:
+        cpus = min(cpus, quota)
+    return max(cpus, 0.1)
+
+
+def _cgroup_quota() -> Optional[float]:
+    """CPU quota in CPUs from cgroup v2 (cpu.max) or v1 (cfs_quota_us), None if unlimited."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+class FfmpegExecutor:
+    """Bounded, prioritized ffmpeg runner with per-stage CPU accounting."""
+
+    # Stages not listed here run at NORMAL priority
+    STAGE_PRIORITY = {
+        "fingerprint": INTERACTIVE,
+        "extract_audio": NORMAL,
+        "tempo": NORMAL,
+        "split": BACKGROUND,
+    }
+
+    # Added niceness for each priority
+    NICENESS = {INTERACTIVE: 0, NORMAL: 0, BACKGROUND: 10}
+
+    def __init__(self, cpus: Optional[float] = None, max_jobs: Optional[int] = None,
+                 threads: Optional[int] = None):
+        """
+        Initialize executor.
+
+        Args:
+            cpus: CPUs available (default: affinity and cgroup quota)
+            max_jobs: ffmpeg jobs run at once (or FFMPEG_MAX_JOBS, default one per CPU)
+            threads: Threads per ffmpeg job (or FFMPEG_THREADS, default CPUs / jobs)
+        """
+        self.cpus = cpus or available_cpus()
+        self.max_jobs = max_jobs or int(os.getenv("FFMPEG_MAX_JOBS", "0")) or max(1, math.floor(self.cpus))
+        self.threads = threads or int(os.getenv("FFMPEG_THREADS", "0")) or max(1, int(self.cpus // self.max_jobs))
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting: List = []  # Heap of (priority, arrival)
+        self._arrivals = itertools.count()
+
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+        logger.debug(f"ffmpeg executor: {self.cpus:g} CPUs, {self.max_jobs} jobs x {self.threads} threads")
+
+    @contextmanager
+    def slot(self, priority: int = NORMAL) -> Iterator[float]:
+        """
+        Wait for a free ffmpeg slot; higher-priority waiters go first.
+
+        Yields:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            while self._running >= self.max_jobs or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._running += 1
+            # The next waiter may fit too
+            self._cond.notify_all()
+
+        try:
+            yield time.monotonic() - start
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    def with_threads(self, cmd: List[str]) -> List[str]:
+        """Add thread limits to an ffmpeg command (its last argument must be the output)."""
+        if Path(cmd[0]).name != "ffmpeg" or "-threads" in cmd:
+            return cmd
+        threads = str(self.threads)
+        return [cmd[0], "-filter_threads", threads, *cmd[1:-1], "-threads", threads, cmd[-1]]
+
+    def run(self, stage: str, cmd: List[str], media_seconds: float = 0,
+            **kwargs) -> subprocess.CompletedProcess:
+        """
+        Run a command in a slot, with thread limits and the stage's priority.
+
+        Anything other than ffmpeg (e.g. ffprobe, which is light) runs at once.
+
+        Args:
+            stage: Pipeline stage (decides priority and accounting bucket)
+            cmd: Command and arguments
+            media_seconds: Audio length the command processes, for CPU-per-minute stats
+            **kwargs: Passed to run_command (timeout, check, capture_output, ...)
+
+        Returns:
+            subprocess.CompletedProcess
+        """
+        if Path(cmd[0]).name != "ffmpeg":
+            return run_command(cmd, **kwargs)
+
+        priority = self.STAGE_PRIORITY.get(stage, NORMAL)
+        usage = []
+        with self.slot(priority) as waited:
+            with observe_commands(usage.append):
+                try:
+                    return run_command(self.with_threads(cmd), nice=self.NICENESS[priority], **kwargs)
+                finally:
+                    self._account(stage, usage, media_seconds, waited)
+
+    def _account(self, stage: str, usage: List[Dict], media_seconds: float, waited: float):
+        cpu = sum((u["user_cpu_seconds"] or 0) + (u["system_cpu_seconds"] or 0) for u in usage)
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                stage, {"jobs": 0, "cpu_seconds": 0.0, "audio_seconds": 0.0, "wait_seconds": 0.0}
+            )
+            stats["jobs"] += 1
+            stats["cpu_seconds"] += cpu
+            stats["audio_seconds"] += max(media_seconds, 0)
+            stats["wait_seconds"] += waited
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage jobs, CPU seconds, audio seconds and queue wait so far."""
+        with self._stats_lock:
+            return {stage: dict(s) for stage, s in self._stats.items()}
+
+    def report(self) -> str:
+        """One-line summary: CPU-seconds per audio-minute and mean queue wait per stage."""
+        parts = []
+        for stage, s in sorted(self.stats().items()):
+            per_minute = s["cpu_seconds"] / (s["audio_seconds"] / 60) if s["audio_seconds"] else 0.0
+            parts.append(
+                f"{stage} {per_minute:.2f} CPU-s/audio-min "
+                f"({s['jobs']:.0f} jobs, {s['wait_seconds'] / s['jobs']:.1f}s queued)"
+            )
+        summary = ", ".join(parts) or "no jobs yet"
+        return f"{summary} [{self.max_jobs} x {self.threads} threads on {self.cpus:g} CPUs]"
+
+
+# One executor per process, so every record shares the same slots
+executor = FfmpegExecutor()
@@ -0,0 +1,163 @@
+"""
+HTTP Clients
+Process-wide registry of pooled, keep-alive HTTP clients so every component
+reuses TCP/TLS connections instead of opening new ones per request:
+requests Sessions for Airtable and web fetches, and shared httpx
+transports for the OpenAI clients (one per API key, one connection pool).
+
+Pool size (idle connections kept per host) comes from HTTP_POOL_SIZE, or
+HTTP_POOL_SIZE_<NAME> per client (e.g. HTTP_POOL_SIZE_OPENAI=64).
+"""
+
+import logging
+import os
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_size(name: str) -> int:
+    return int(os.getenv(f"HTTP_POOL_SIZE_{name.upper()}", os.getenv("HTTP_POOL_SIZE", "32")))
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests; urllib3 pools count connections."""
+
+    def __init__(self, **kwargs):
+        self.requests_sent = 0
+        self._lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+    def connections_opened(self) -> int:
+        pools = self.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+
+class ClientRegistry:
+    """Creates each named client once and hands out the same instance after."""
+
+    # Distinct hosts each session keeps a pool for
+    HOSTS_PER_SESSION = 10
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._transports: Dict[str, object] = {}
+
+    def session(self, name: str) -> requests.Session:
+        """
+        Shared requests Session for a service.
+
+        Args:
+            name: Service name, e.g. 'airtable' or 'web'
+
+        Returns:
+            Keep-alive session with a connection pool per host
+        """
+        with self._lock:
+            if name not in self._sessions:
+                adapter = _CountingAdapter(
+                    pool_connections=self.HOSTS_PER_SESSION,
+                    pool_maxsize=_pool_size(name)
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[name] = session
+            return self._sessions[name]
+
+    def httpx_transport(self, name: str):
+        """
+        Shared httpx transport (connection pool) for a service.
+
+        Wrap it in as many httpx.Client objects as needed - e.g. one per API
+        key, each with its own event hooks - and they all reuse the same
+        connections.
+        """
+        with self._lock:
+            if name not in self._transports:
+                self._transports[name] = _CountingTransport(_pool_size(name))
+            return self._transports[name]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Requests sent, connections opened and reuse ratio per client."""
+        with self._lock:
+            counters = {
+                **{name: (s.get_adapter("https://").requests_sent, s.get_adapter("https://").connections_opened())
+                   for name, s in self._sessions.items()},
+                **{name: (t.requests_sent, t.connections_opened) for name, t in self._transports.items()},
+            }
+        return {
+            name: {
+                "requests": sent,
+                "connections": opened,
+                "reuse": 1 - opened / sent if sent else 0.0,
+            }
+            for name, (sent, opened) in counters.items()
+        }
+
+    def report(self) -> str:
+        """One-line connection reuse summary for the logs."""
+        parts = [
+            f"{name} {s['requests']} requests/{s['connections']} connections ({s['reuse']:.0%} reused)"
+            for name, s in self.stats().items() if s["requests"]
+        ]
+        return ", ".join(parts) or "no HTTP requests yet"
+
+
+class _CountingTransport:
+    """httpx transport wrapper that counts requests and newly opened connections."""
+
+    def __init__(self, pool_size: int):
+        # httpx is only needed once an OpenAI client is built
+        import httpx
+
+        # Like the requests sessions: never block waiting for a free
+        # connection, but keep at most pool_size idle ones alive
+        self._transport = httpx.HTTPTransport(limits=httpx.Limits(
+            max_connections=None,
+            max_keepalive_connections=pool_size
+        ))
+        self._lock = threading.Lock()
+        self.requests_sent = 0
+        self.connections_opened = 0
+
+    def handle_request(self, request):
+        with self._lock:
+            self.requests_sent += 1
+
+        # httpcore reports a TCP connect only when no pooled connection was free
+        outer_trace = request.extensions.get("trace")
+
+        def trace(event_name, info):
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    self.connections_opened += 1
+            if outer_trace:
+                outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        return self._transport.handle_request(request)
+
+    # Shared by many clients - closing one of them must not close the pool
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+# The one registry for the whole process
+registry = ClientRegistry()
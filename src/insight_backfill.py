@@ -0,0 +1,261 @@
+"""
+Insight Backfill
+Re-runs insight extraction over archived transcripts in bulk through the
+OpenAI Batch API (JSONL upload -> batch -> poll -> download) and writes the
+results back to Airtable 10 records per request. Nothing is downloaded or
+transcribed again.
+
+Usage:
+    python insight_backfill.py --job prompt-v2                 # all archived records
+    python insight_backfill.py --job prompt-v2 --limit 100
+    python insight_backfill.py --job prompt-v2 --record-ids recA,recB
+    python insight_backfill.py --job prompt-v2                 # re-run to resume
+
+Against the local stand-in server:
+    python ../tools/fake_openai_batch_server.py &
+    python insight_backfill.py --job test --base-url http://127.0.0.1:8089/v1 --no-airtable
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from unified_processor import UnifiedProcessor
+from airtable_client import AirtableClient
+from atomic_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class InsightBackfill:
+    """Checkpointed Batch API job that refreshes insights for archived records."""
+
+    ENDPOINT = "/v1/chat/completions"
+    FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, job_name: str, processor: UnifiedProcessor, client,
+                 airtable: Optional[AirtableClient] = None):
+        self.processor = processor
+        self.client = client
+        self.airtable = airtable
+
+        # Batch API allows 50k requests per batch; smaller batches finish sooner
+        self.requests_per_batch = int(os.getenv("BACKFILL_REQUESTS_PER_BATCH", "5000"))
+
+        job_dir = processor.state_dir / "backfill"
+        job_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = job_dir / f"{job_name}.json"
+        self.results_path = job_dir / f"{job_name}.results.jsonl"
+
+        if self.checkpoint_path.exists():
+            self.state = json.loads(self.checkpoint_path.read_text())
+            logger.info(f"Resuming backfill '{job_name}' ({len(self.state['batches'])} batches)")
+        else:
+            self.state = {"job": job_name, "created_at": time.time(), "batches": []}
+
+    def submit(self, record_ids: List[str]) -> int:
+        """
+        Upload and create batches for records not already in this job.
+
+        Returns:
+            Number of requests submitted
+        """
+        already = set()
+        for b in self.state["batches"]:
+            if b["applied"]:
+                # Rows that failed, expired or were cancelled get another try
+                already.update(b.get("succeeded", b["record_ids"]))
+            else:
+                already.update(b["record_ids"])
+        todo = [r for r in record_ids if r not in already]
+
+        submitted = 0
+        for i in range(0, len(todo), self.requests_per_batch):
+            submitted += self._submit_batch(todo[i:i + self.requests_per_batch])
+
+        return submitted
+
+    def _submit_batch(self, record_ids: List[str]) -> int:
+        included = []
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            for record_id in record_ids:
+                archived = self.processor.archive.get(record_id)
+                if not archived or not archived["text"]:
+                    continue
+                f.write(json.dumps({
+                    "custom_id": record_id,
+                    "method": "POST",
+                    "url": self.ENDPOINT,
+                    "body": self.processor.build_insight_request(archived["text"])
+                }) + "\n")
+                included.append(record_id)
+            input_path = Path(f.name)
+
+        try:
+            if not included:
+                return 0
+
+            with open(input_path, "rb") as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=self.ENDPOINT,
+                completion_window="24h",
+                metadata={"job": self.state["job"]}
+            )
+        finally:
+            input_path.unlink()
+
+        self.state["batches"].append({
+            "batch_id": batch.id,
+            "input_file_id": input_file.id,
+            "record_ids": included,
+            "status": batch.status,
+            "succeeded": [],
+            "applied": False
+        })
+        self._save()
+
+        logger.info(f"📤 Submitted batch {batch.id} with {len(included)} requests")
+        return len(included)
+
+    def wait_and_apply(self, poll_interval: float = 60) -> Dict[str, int]:
+        """
+        Poll batches until all are final, applying each one as it finishes.
+
+        Returns:
+            Counts of records updated and failed
+        """
+        totals = {"updated": 0, "failed": 0}
+        # Batches whose results couldn't all be written wait for the next run
+        unwritten = set()
+
+        while True:
+            pending = [b for b in self.state["batches"]
+                       if not b["applied"] and b["batch_id"] not in unwritten]
+            if not pending:
+                if unwritten:
+                    logger.warning(f"⚠️  {len(unwritten)} batches have unwritten results - re-run to apply them")
+                return totals
+
+            for entry in pending:
+                batch = self.client.batches.retrieve(entry["batch_id"])
+                entry["status"] = batch.status
+
+                if batch.status in self.FINAL_STATUSES:
+                    # Expired batches still return whatever finished in time
+                    updated, failed, complete = self._apply(entry, batch.output_file_id)
+                    totals["updated"] += updated
+                    totals["failed"] += failed
+                    entry["applied"] = complete
+                    if not complete:
+                        unwritten.add(entry["batch_id"])
+                    logger.info(f"✅ Batch {entry['batch_id']} {batch.status}: {updated} updated, {failed} failed")
+
+                self._save()
+
+            if any(not b["applied"] and b["batch_id"] not in unwritten for b in self.state["batches"]):
+                logger.info(f"💤 Waiting {poll_interval:g}s for {len(pending)} batches...")
+                time.sleep(poll_interval)
+
+    def _apply(self, entry: Dict, output_file_id: Optional[str]):
+        """
+        Parse a batch's output and write insights back.
+
+        Returns:
+            (records updated, records without insights, whether every result was written)
+        """
+        succeeded = set(entry.setdefault("succeeded", []))
+        results = {}
+        if output_file_id:
+            for line in self.client.files.content(output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200 or item["custom_id"] in succeeded:
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[item["custom_id"]] = self.processor.parse_insights(content)
+
+        with open(self.results_path, "a") as f:
+            for record_id, insights in results.items():
+                f.write(json.dumps({"record_id": record_id, **insights}) + "\n")
+                self.processor.dedup.update_insights(record_id, insights)
+
+        written = list(results)
+        if self.airtable and results:
+            # Airtable fails a request as a whole, so each request's rows succeed or fail together
+            items = list(results.items())
+            size = self.airtable.BATCH_SIZE
+            written = []
+            for i in range(0, len(items), size):
+                chunk = items[i:i + size]
+                if self.airtable.update_records(chunk) == len(chunk):
+                    written.extend(record_id for record_id, _ in chunk)
+
+        entry["succeeded"].extend(written)
+        failed = len(entry["record_ids"]) - len(entry["succeeded"])
+        return len(written), failed, len(written) == len(results)
+
+    def _save(self):
+        atomic_write_json(self.checkpoint_path, self.state)
+
+
+def main():
+    """Entry point for the backfill command."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Re-extract insights for archived transcripts via the Batch API")
+    parser.add_argument("--job", required=True, help="Job name; re-running the same name resumes it")
+    parser.add_argument("--record-ids", help="Comma-separated record IDs (default: every archived record)")
+    parser.add_argument("--since-days", type=float, help="Only records archived in the last N days")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--poll-interval", type=float, default=60)
+    parser.add_argument("--base-url", help="OpenAI-compatible API base URL (e.g. the local stand-in server)")
+    parser.add_argument("--no-airtable", action="store_true", help="Only write results locally")
+    args = parser.parse_args()
+
+    download_dir = Path(__file__).parent.parent / "downloads"
+    processor = UnifiedProcessor(download_dir=str(download_dir))
+
+    if args.base_url:
+        from openai import OpenAI
+        client = OpenAI(base_url=args.base_url)
+    else:
+        client = processor.openai_client
+
+    airtable = None
+    if not args.no_airtable:
+        airtable = AirtableClient(
+            api_key=os.getenv("AIRTABLE_API_KEY"),
+            base_id=os.getenv("AIRTABLE_BASE_ID"),
+            table_id=os.getenv("AIRTABLE_TABLE_ID")
+        )
+
+    if args.record_ids:
+        record_ids = [r.strip() for r in args.record_ids.split(",") if r.strip()]
+    else:
+        since = time.time() - args.since_days * 86400 if args.since_days else 0
+        record_ids = processor.archive.record_ids(since=since)
+    if args.limit:
+        record_ids = record_ids[:args.limit]
+
+    backfill = InsightBackfill(args.job, processor, client, airtable)
+    submitted = backfill.submit(record_ids)
+    logger.info(f"Submitted {submitted} new requests")
+
+    totals = backfill.wait_and_apply(poll_interval=args.poll_interval)
+    logger.info(f"🏁 Backfill '{args.job}' done: {totals['updated']} updated, {totals['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,32 @@
 """
 Poker Video Processor Service
-Main orchestrator that polls Airtable and processes videos.
+Main orchestrator that polls Airtable and processes videos. One worker can
+serve several tables (AIRTABLE_SOURCES_FILE), sharing its slots fairly.
 """
 
 import os
 import time
 import logging
 from pathlib import Path
+from typing import Dict, List
 from dotenv import load_dotenv
 
 from unified_processor import UnifiedProcessor
 from airtable_client import AirtableClient
+from airtable_sources import load_sources
+from backlog_estimator import BacklogEstimator
+from circuit_breaker import breakers
+from fair_scheduler import FairShareScheduler
+from ffmpeg_executor import executor
+from http_clients import registry
+from progress_publisher import ProgressPublisher
+from tracing import setup_logging, tracer
 
-# Setup logging
+# Setup logging (queued - handlers run on a background thread) and tracing
 log_dir = Path(__file__).parent.parent / "logs"
 log_dir.mkdir(exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_dir / "processor.log"),
-        logging.StreamHandler()
-    ]
-)
+setup_logging(log_file=log_dir / "processor.log", trace_file=log_dir / "traces.jsonl")
 
 logger = logging.getLogger(__name__)
 
@@ -36,62 +39,160 @@ class PokerVideoService:
         load_dotenv()
         
         # Initialize components
-        self.airtable = AirtableClient(
-            api_key=os.getenv("AIRTABLE_API_KEY"),
-            base_id=os.getenv("AIRTABLE_BASE_ID"),
-            table_id=os.getenv("AIRTABLE_TABLE_ID")
-        )
+        sources, workers = load_sources()
+        self.airtables: Dict[str, AirtableClient] = {s["name"]: s["client"] for s in sources}
+        
+        # Transcripts are published before insights; writes are coalesced per table
+        self.publishers = {name: ProgressPublisher(client) for name, client in self.airtables.items()}
         
         download_dir = Path(__file__).parent.parent / "downloads"
         self.processor = UnifiedProcessor(download_dir=str(download_dir))
         
         self.poll_interval = int(os.getenv("POLL_INTERVAL_SECONDS", "300"))  # 5 minutes default
         
+        # Busy tables borrow slots from idle ones; idle tables are re-polled every poll interval
+        self.scheduler = FairShareScheduler(workers, refill_interval=self.poll_interval)
+        for source in sources:
+            self.scheduler.add_source(source["name"], source["weight"], source["max_concurrency"])
+        
+        # Drain-time estimate for autoscaling, from probed backlog and measured stage throughput
+        self.backlog = BacklogEstimator(self.processor, workers, state_dir=str(self.processor.state_dir))
+        tracer.add_observer(self.backlog.observe_span)
+        
     def process_pending_videos(self):
         """Process all pending videos in Airtable."""
         logger.info("🔍 Checking for pending videos...")
-        
-        pending = self.airtable.get_pending_videos()
-        
-        if not pending:
+
+        # Reclaim space left behind by crashed or killed runs
+        self.processor.scratch.sweep_orphans()
+        self.processor.scratch.sweep_parked()
+
+        totals = self.scheduler.run_cycle(self.process_record, fetch=self._fetch_pending, key=lambda r: r['id'])
+        if not totals["done"]:
             logger.info("No pending videos found")
             return
+        if len(self.airtables) > 1:
+            logger.info(f"⚖️  Fair share: {self.scheduler.report()}")
         
-        logger.info(f"📹 Found {len(pending)} videos to process")
+        logger.info(f"⏱️  OpenAI latency: {self.processor.openai_calls.report()}")
+        logger.info(f"🔌 HTTP connections: {registry.report()}")
+        logger.info("📝 Airtable writes: " + ", ".join(
+            f"{name} {publisher.report()}" for name, publisher in self.publishers.items()
+        ))
+        logger.info(f"⚡ Circuit breakers: {breakers.report()}")
+        logger.info(f"🎛️  ffmpeg CPU: {executor.report()}")
+        logger.info(f"📈 Backlog: {self.backlog.summary()}")
+    
+    def _fetch_pending(self, source: str) -> List[Dict]:
+        """Poll one table, starting remote transcriptions for the whole batch up front."""
+        airtable = self.airtables[source]
+        pending = airtable.get_pending_videos()
+        self.backlog.track(source, [(r['id'], airtable.source_of(r)) for r in pending])
+        if pending:
+            logger.info(f"📹 Found {len(pending)} videos to process in {source}")
+            self.processor.submit_transcription_jobs([(r['id'], airtable.source_of(r)) for r in pending])
+        return pending
+    
+    def process_record(self, source: str, record: Dict) -> bool:
+        """
+        Process one pending record and write its results back.
         
-        for record in pending:
-            record_id = record['id']
-            video_url = record['fields'].get('Source File/Link')
-            title = record['fields'].get('Content Title', 'Untitled')
-            
-            logger.info(f"\n{'='*60}")
-            logger.info(f"Processing: {title}")
-            logger.info(f"Record ID: {record_id}")
-            logger.info(f"URL: {video_url}")
-            logger.info(f"{'='*60}\n")
+        Args:
+            source: Name of the table the record came from
+            record: Airtable record (id, fields)
             
+        Returns:
+            True if the record was extracted and updated
+        """
+        airtable = self.airtables[source]
+        publisher = self.publishers[source]
+        record_id = record['id']
+        video_url = airtable.source_of(record)
+        title = airtable.title_of(record)
+        
+        logger.info(f"\n{'='*60}")
+        logger.info(f"Processing: {title}")
+        logger.info(f"Record ID: {record_id} ({source})")
+        logger.info(f"URL: {video_url}")
+        logger.info(f"{'='*60}\n")
+        
+        # One trace per record: record -> stage -> chunk -> API call
+        with tracer.span("record", root=True, record_id=record_id, title=title, source=video_url,
+                         table=source) as span:
             # Mark as processing to avoid duplicates
-            self.airtable.mark_as_processing(record_id)
+            airtable.mark_as_processing(record_id)
             
             try:
-                # Process the content (video, audio, or document)
-                results = self.processor.process_content(video_url, record_id)
+                if self.processor.router.is_collection(video_url):
+                    # Playlist/channel/folder: one child record per entry
+                    results = self.processor.process_collection(
+                        video_url, record_id,
+                        create_children=airtable.create_records,
+                        on_child_done=publisher.update,
+                        on_child_transcript=publisher.update,
+                        table=source
+                    )
+                else:
+                    # Process the content (video, audio, or document); the
+                    # transcript is published while insights are extracted
+                    results = self.processor.process_content(
+                        video_url, record_id, title=title,
+                        on_transcript=lambda fields: publisher.update(record_id, fields)
+                    )
+                span.set(status=results.get("status"))
+                if results.get("status") != "Extracted":
+                    span.fail(results.get("transcription", "")[:200])
                 
-                # Update Airtable with results
-                success = self.airtable.update_record(record_id, results)
+                # Update Airtable with results (and anything else still pending)
+                success = publisher.publish(record_id, results)
                 
                 if success:
                     logger.info(f"✅ Successfully processed: {title}\n")
                 else:
                     logger.error(f"❌ Failed to update Airtable for: {title}\n")
-                    
+                return success and results.get("status") == "Extracted"
+                
             except Exception as e:
                 logger.error(f"❌ Error processing {title}: {str(e)}\n")
-                self.airtable.mark_as_error(record_id, str(e))
+                span.fail(str(e))
+                publisher.discard(record_id)
+                airtable.mark_as_error(record_id, str(e))
+                return False
+            finally:
+                self.backlog.finish(record_id)
+    
+    def reset_orphaned_children(self):
+        """
+        Set collection children left in "Processing" by a crashed run back to "Raw".
+        
+        The poll only picks up "Raw" records and re-runs of the collection
+        skip entries that already have a child, so without this they would
+        never be retried. Reset children are handed over to the poll.
+        """
+        orphans = self.processor.collections.unfinished()
+        if not orphans:
+            return
+        
+        by_table: Dict[str, List[str]] = {}
+        for entry in orphans:
+            table = entry.get("table") if entry.get("table") in self.airtables else next(iter(self.airtables))
+            by_table.setdefault(table, []).append(entry["child_id"])
+        
+        for table, child_ids in by_table.items():
+            airtable = self.airtables[table]
+            reset = []
+            for i in range(0, len(child_ids), airtable.BATCH_SIZE):
+                batch = child_ids[i:i + airtable.BATCH_SIZE]
+                if airtable.update_records([(child_id, {"status": "Raw"}) for child_id in batch]) == len(batch):
+                    reset.extend(batch)
+            # Failed batches stay unfinished and are retried at the next start
+            self.processor.collections.mark_done(reset)
+            logger.info(f"♻️  Reset {len(reset)}/{len(child_ids)} unfinished collection children to Raw in {table}")
     
     def run_once(self):
         """Run one processing cycle."""
         try:
+            self.reset_orphaned_children()
             self.process_pending_videos()
         except Exception as e:
             logger.error(f"Error in processing cycle: {e}")
@@ -99,11 +200,19 @@ class PokerVideoService:
     def run_forever(self):
         """Run continuously, polling for new videos."""
         logger.info(f"🚀 Poker Video Processor Service Started")
-        logger.info(f"📊 Base: {os.getenv('AIRTABLE_BASE_ID')}")
-        logger.info(f"📋 Table: {os.getenv('AIRTABLE_TABLE_ID')}")
+        for source in self.scheduler.sources.values():
+            logger.info(f"📋 Table: {source.name} (weight {source.weight:g}, max {source.max_concurrency})")
+        logger.info(f"👷 Workers: {self.scheduler.workers}")
         logger.info(f"⏱️  Poll interval: {self.poll_interval} seconds")
         logger.info(f"{'='*60}\n")
         
+        self.backlog.serve()
+        
+        try:
+            self.reset_orphaned_children()
+        except Exception as e:
+            logger.error(f"Could not reset unfinished collection children: {e}")
+        
         while True:
             try:
                 self.process_pending_videos()
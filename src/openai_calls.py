@@ -0,0 +1,268 @@
+"""
+OpenAI Calls
+Runs OpenAI requests under a per-call deadline with classified retries and
+optional hedging: once a request is slower than the endpoint's observed p95,
+a duplicate is sent and the first response wins. p50/p95/p99 latency is
+tracked per endpoint so the hedge threshold follows real conditions.
+Each attempt borrows a key from the credential pool, so retries and hedges
+go to whichever key is least loaded.
+"""
+
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+from circuit_breaker import breakers
+from credential_pool import Credential, CredentialPool, NoCredentialAvailable
+from tracing import KIND_CLIENT, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call runs out of time across all of its attempts."""
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies per endpoint."""
+
+    WINDOW = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.WINDOW)).append(seconds)
+
+    def count(self, endpoint: str) -> int:
+        with self._lock:
+            return len(self._samples.get(endpoint, ()))
+
+    def percentile(self, endpoint: str, q: float) -> Optional[float]:
+        """Nearest-rank percentile (q in 0-100), or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(q / 100 * len(samples)) - 1)]
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """count, p50, p95 and p99 for every endpoint seen so far."""
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                "count": self.count(endpoint),
+                "p50": self.percentile(endpoint, 50),
+                "p95": self.percentile(endpoint, 95),
+                "p99": self.percentile(endpoint, 99),
+            }
+            for endpoint in endpoints
+        }
+
+
+class OpenAICalls:
+    """Deadline, retry and hedging policy shared by every OpenAI request."""
+
+    # Per-endpoint defaults in seconds: whole call (all attempts) and one attempt
+    POLICIES = {
+        "chat": {"deadline": 180, "attempt_timeout": 60},
+        "transcription": {"deadline": 900, "attempt_timeout": 600},
+    }
+
+    # p95 needs this many samples before it's trusted as a hedge threshold
+    MIN_HEDGE_SAMPLES = 20
+
+    # Full-jitter exponential backoff between attempts
+    BACKOFF_BASE = 1.0
+    BACKOFF_CAP = 20.0
+
+    # HTTP statuses worth retrying besides 5xx
+    RETRY_STATUSES = {408, 409, 429}
+
+    # A key that has run out of credit sits out this long
+    QUOTA_COOLDOWN = 3600.0
+
+    def __init__(self, pool: CredentialPool, client_for: Callable[[Optional[Credential]], Any]):
+        """
+        Initialize call policy.
+
+        Args:
+            pool: OpenAI API keys
+            client_for: Returns the OpenAI client for a key
+        """
+        self.pool = pool
+        self.client_for = client_for
+        self.latency = LatencyTracker()
+        self.hedge_endpoints = {
+            e.strip() for e in os.getenv("OPENAI_HEDGE_ENDPOINTS", "").split(",") if e.strip()
+        }
+        self.policies = {
+            name: {
+                "deadline": float(os.getenv(f"OPENAI_{name.upper()}_DEADLINE_SECONDS", policy["deadline"])),
+                "attempt_timeout": float(os.getenv(f"OPENAI_{name.upper()}_TIMEOUT_SECONDS", policy["attempt_timeout"])),
+            }
+            for name, policy in self.POLICIES.items()
+        }
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._hedge_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openai")
+
+    def call(self, endpoint: str, request: Callable[[Any], Any], units: float = 1.0):
+        """
+        Run a request under the endpoint's deadline, retry and hedge policy.
+
+        Args:
+            endpoint: Policy name ('chat' or 'transcription')
+            request: Sends the request with the client it is given (one per
+                     pooled key, with the attempt's timeout and the SDK's
+                     built-in retries off). It may run twice at once when
+                     hedged, so open files inside it.
+            units: Size of the work (e.g. audio MB). Latency is tracked per
+                   unit so one hedge threshold fits requests of any size.
+
+        Returns:
+            Whatever request returns
+
+        Raises:
+            CircuitOpen: Without sending anything while the endpoint is down
+        """
+        with tracer.span(f"openai.{endpoint}", kind=KIND_CLIENT, units=units) as span:
+            return breakers.get(f"openai.{endpoint}").call(self._call, endpoint, request, units, span)
+
+    def _call(self, endpoint: str, request: Callable[[Any], Any], units: float, span):
+        policy = self.policies[endpoint]
+        deadline = time.monotonic() + policy["deadline"]
+        units = max(units, 1e-3)
+        attempt = 0
+
+        while True:
+            attempt += 1
+            timeout = min(policy["attempt_timeout"], deadline - time.monotonic())
+            if timeout <= 0:
+                raise DeadlineExceeded(f"{endpoint} call exceeded its {policy['deadline']:.0f}s deadline")
+
+            start = time.monotonic()
+            try:
+                result = self._attempt(endpoint, request, timeout, units, deadline, span)
+            except Exception as e:
+                if not self._retryable(e):
+                    raise
+                delay = self._backoff(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    raise DeadlineExceeded(
+                        f"{endpoint} call exceeded its {policy['deadline']:.0f}s deadline after {attempt} attempts"
+                    ) from e
+                logger.warning(f"⚠️  {endpoint} attempt {attempt} failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            self.latency.record(endpoint, (time.monotonic() - start) / units)
+            span.set(attempts=attempt)
+            return result
+
+    def _attempt(self, endpoint: str, request: Callable, timeout: float, units: float, deadline: float, span):
+        """One attempt, hedged once it passes p95 when hedging is on for the endpoint."""
+        hedge_after = self._hedge_delay(endpoint, units)
+        if hedge_after is None:
+            return self._send(request, timeout, deadline)
+
+        primary = self._executor.submit(tracer.wrap(self._send), request, timeout, deadline)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done or deadline - time.monotonic() < hedge_after:
+            return primary.result()
+
+        with self._hedge_lock:
+            self.hedges_sent += 1
+        span.set(hedged=True)
+        logger.info(f"🔀 {endpoint} request slower than p95 ({hedge_after:.1f}s) - sending a hedge")
+        hedge = self._executor.submit(tracer.wrap(self._send), request, timeout, deadline)
+
+        # First success wins; the slower request finishes in the background
+        # (bounded by its attempt timeout) and is discarded
+        pending, error = {primary, hedge}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._hedge_lock:
+                            self.hedges_won += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _send(self, request: Callable, timeout: float, deadline: float):
+        """Send one request with a key borrowed from the pool, waiting for one no later than deadline."""
+        try:
+            with self.pool.acquire(timeout=deadline - time.monotonic()) as credential:
+                timeout = min(timeout, deadline - time.monotonic())
+                client = self.client_for(credential).with_options(timeout=timeout, max_retries=0)
+                try:
+                    return request(client)
+                except Exception as e:
+                    if getattr(e, "code", None) == "insufficient_quota":
+                        self.pool.mark_limited(credential, self.QUOTA_COOLDOWN)
+                    raise
+        except NoCredentialAvailable as e:
+            raise DeadlineExceeded(str(e)) from e
+
+    def _hedge_delay(self, endpoint: str, units: float) -> Optional[float]:
+        if endpoint not in self.hedge_endpoints or self.latency.count(endpoint) < self.MIN_HEDGE_SAMPLES:
+            return None
+        return self.latency.percentile(endpoint, 95) * units
+
+    def _retryable(self, error: Exception) -> bool:
+        """Transient failures are retried; bad requests, auth and quota errors are not."""
+        # Out of credit also comes back as 429 - only another key can help
+        if getattr(error, "code", None) == "insufficient_quota":
+            return self.pool.available() > 0
+
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status in self.RETRY_STATUSES or status >= 500
+
+        # No response at all: connection reset, DNS failure, read timeout
+        import openai
+        return isinstance(error, openai.APIConnectionError)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        # The limited key is cooling down in the pool; go straight to another
+        if getattr(error, "status_code", None) == 429 and self.pool.available():
+            return 0.0
+
+        delay = random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt))
+
+        # Rate limits say when to come back
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            return delay
+
+    def report(self) -> str:
+        """One-line latency summary for the logs."""
+        parts = []
+        for endpoint, stats in self.latency.snapshot().items():
+            unit = "s/MB" if endpoint == "transcription" else "s"
+            parts.append(
+                f"{endpoint} n={stats['count']} p50={stats['p50']:.2f}{unit} "
+                f"p95={stats['p95']:.2f}{unit} p99={stats['p99']:.2f}{unit}"
+            )
+        if self.hedges_sent:
+            parts.append(f"hedges {self.hedges_won}/{self.hedges_sent} won")
+        if len(self.pool) > 1:
+            parts.append(" ".join(
+                f"[{k['key']}: {k['uses']} uses, {k['times_limited']} limited]" for k in self.pool.snapshot()
+            ))
+        return ", ".join(parts) or "no OpenAI calls yet"
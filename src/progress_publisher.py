@@ -0,0 +1,113 @@
+"""
+Progress Publisher
+Writes a record's results to Airtable as they become available - the
+transcript as soon as it exists, insights when they are done - without
+multiplying API calls. Intermediate updates wait a few seconds for others
+to join them: updates to the same record are merged into one write, and
+updates to different records go out together as bulk writes of up to 10
+records. A record's final update is written at once, taking everything
+else that is pending with it.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional, Set
+
+from airtable_client import AirtableClient
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressPublisher:
+    """Coalesced, in-order writes of record updates to one Airtable table."""
+
+    def __init__(self, airtable: AirtableClient, delay: Optional[float] = None):
+        """
+        Initialize publisher.
+
+        Args:
+            airtable: Table the updates are written to
+            delay: Seconds an intermediate update waits for others to join it
+                   (or AIRTABLE_WRITE_DELAY_SECONDS, default 5; 0 = write at once)
+        """
+        if delay is None:
+            delay = float(os.getenv("AIRTABLE_WRITE_DELAY_SECONDS", "5"))
+        self.airtable = airtable
+        self.delay = delay
+        self._pending: Dict[str, Dict] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        # Held for a whole write, so a record's updates land in the order they were made
+        self._write_lock = threading.Lock()
+        self.updates = 0
+        self.requests = 0
+
+    def update(self, record_id: str, fields: Dict):
+        """
+        Queue an intermediate update; it is written within `delay` seconds.
+
+        Args:
+            record_id: The Airtable record ID
+            fields: Result fields, as for AirtableClient.update_record
+                    (later values win over earlier ones for the same field)
+        """
+        with self._lock:
+            self._pending.setdefault(record_id, {}).update(fields)
+            self.updates += 1
+            if self.delay > 0 and self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.delay <= 0:
+            self.flush()
+
+    def publish(self, record_id: str, fields: Dict) -> bool:
+        """
+        Write a record's final update now, along with every pending update.
+
+        Returns:
+            True if the record's update was written
+        """
+        with self._lock:
+            self._pending.setdefault(record_id, {}).update(fields)
+            self.updates += 1
+        return record_id not in self.flush()
+
+    def discard(self, record_id: str):
+        """Drop a record's unwritten updates, e.g. before marking it as failed."""
+        with self._write_lock, self._lock:
+            self._pending.pop(record_id, None)
+
+    def flush(self) -> Set[str]:
+        """
+        Write all pending updates, 10 records per request.
+
+        Returns:
+            IDs of records whose update could not be written
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending = list(self._pending.items())
+                self._pending.clear()
+
+            failed = set()
+            size = self.airtable.BATCH_SIZE
+            for i in range(0, len(pending), size):
+                batch = pending[i:i + size]
+                self.requests += 1
+                if self.airtable.update_records(batch) == len(batch):
+                    continue
+                # One bad record fails its whole batch - retry the batch one by one
+                for record_id, fields in batch:
+                    self.requests += 1
+                    if not self.airtable.update_record(record_id, fields):
+                        failed.add(record_id)
+            return failed
+
+    def report(self) -> str:
+        """Updates made and the requests that carried them."""
+        return f"{self.updates} updates in {self.requests} requests"
@@ -0,0 +1,198 @@
+"""
+Progressive Transcriber
+Streams a download straight into ffmpeg's segment muxer and transcribes each
+audio segment as soon as it is finished, while later parts are still
+downloading. End-to-end time approaches max(download, transcription)
+instead of their sum. Each segment must arrive within the download budget
+for its length, so a stalled stream is killed rather than waited on.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from audio_chunker import AudioChunker
+from ffmpeg_executor import executor
+from segment_index import SegmentIndex
+from stage_deadlines import StageTimeout, deadlines
+from subprocess_runner import kill_group, open_command
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressiveTranscriber:
+    """Transcribes fixed-length segments of a media stream while it downloads."""
+
+    # How often to look for newly finished segments
+    POLL_INTERVAL = 0.5
+
+    # Audio-only streams are smaller and can be piped (no muxing needed)
+    DOWNLOAD_FORMAT = 'bestaudio/best'
+
+    # The segmenter can leave a near-empty tail segment; Whisper rejects
+    # audio under 0.1s, so anything shorter than this is skipped
+    MIN_SEGMENT_SECONDS = 0.5
+
+    def __init__(self, transcribe: Callable[[Path], SegmentIndex], chunker: AudioChunker,
+                 segment_seconds: Optional[int] = None, workers: Optional[int] = None):
+        """
+        Initialize transcriber.
+
+        Args:
+            transcribe: Transcribes one audio file under the upload limit, with timestamps
+            chunker: Supplies the encode bitrate, size limit and stitching
+            segment_seconds: Segment length; shorter segments mean less
+                             transcription left once the download ends
+            workers: Segments transcribed concurrently
+        """
+        self.transcribe = transcribe
+        self.chunker = chunker
+        self.workers = workers or int(os.getenv("PROGRESSIVE_TRANSCRIBE_WORKERS", "3"))
+
+        # Never longer than what fits the upload limit at the encode bitrate
+        max_seconds = int(chunker.max_chunk_bytes * chunker.SIZE_SAFETY * 8 / (chunker.ENCODE_KBPS * 1000))
+        requested = segment_seconds or int(os.getenv("PROGRESSIVE_SEGMENT_SECONDS", "600"))
+        self.segment_seconds = min(requested, max_seconds)
+
+    def scratch_bytes(self) -> int:
+        """Peak scratch usage: segments waiting or in flight plus the one being written."""
+        return (self.workers + 2) * self.segment_seconds * self.chunker.ENCODE_KBPS * 1000 // 8
+
+    def run(self, url: str, work_dir: Path,
+            on_first_segment: Optional[Callable[[Path], bool]] = None) -> Optional[SegmentIndex]:
+        """
+        Download, segment and transcribe a media URL concurrently.
+
+        Args:
+            url: Media URL (anything yt-dlp supports)
+            work_dir: Scratch directory for segments and logs
+            on_first_segment: Called with the first finished segment before it
+                              is transcribed; return True to stop early
+
+        Returns:
+            Stitched transcription with timestamps on the whole recording's
+            timeline, or None if stopped by on_first_segment
+
+        Raises:
+            StageTimeout: When the stream stalls (both processes are killed)
+            Exception: The first segment transcription error (both processes are killed)
+        """
+        download_cmd = [
+            sys.executable, '-m', 'yt_dlp',
+            '-f', self.DOWNLOAD_FORMAT,
+            '--quiet', '--no-warnings',
+            '--no-playlist',
+            '-o', '-',
+            url
+        ]
+        # Runs as long as the download, so it takes no executor slot - only
+        # the same per-job thread limit
+        segment_cmd = executor.with_threads([
+            'ffmpeg', '-v', 'error',
+            '-i', 'pipe:0',
+            '-vn',
+            '-map_metadata', '-1',
+            '-acodec', 'libmp3lame', '-b:a', f'{self.chunker.ENCODE_KBPS}k',
+            '-f', 'segment',
+            '-segment_time', str(self.segment_seconds),
+            '-reset_timestamps', '1',
+            str(work_dir / 'segment_%04d.mp3')
+        ])
+
+        logger.info(f"Streaming {url} in {self.segment_seconds}s segments ({self.workers} transcription workers)")
+        start = time.monotonic()
+
+        with open(work_dir / 'download.log', 'wb') as download_log, \
+                open(work_dir / 'segment.log', 'wb') as segment_log, \
+                open_command(download_cmd, stdout=subprocess.PIPE, stderr=download_log) as downloader, \
+                open_command(segment_cmd, stdin=downloader.stdout, stderr=segment_log) as segmenter:
+            # ffmpeg owns the read end now, so a dead ffmpeg stops yt-dlp with SIGPIPE
+            downloader.stdout.close()
+
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="segment")
+            futures = []
+            try:
+                for segment in self._finished_segments(work_dir, segmenter):
+                    if not futures and on_first_segment and on_first_segment(segment):
+                        kill_group(downloader)
+                        kill_group(segmenter)
+                        return None
+
+                    # A failed segment fails the record - stop downloading the rest
+                    failed = next((f for f in futures if f.done() and f.exception()), None)
+                    if failed is not None:
+                        kill_group(downloader)
+                        kill_group(segmenter)
+                        raise failed.exception()
+
+                    logger.info(
+                        f"Segment {len(futures) + 1} ready at {time.monotonic() - start:.0f}s - transcribing"
+                    )
+                    futures.append(pool.submit(tracer.wrap(self._transcribe_segment), segment, len(futures) + 1))
+
+                downloader.wait()
+                downloaded = time.monotonic() - start
+                self._check_exit(downloader, work_dir / 'download.log', "Download")
+                self._check_exit(segmenter, work_dir / 'segment.log', "Segmenting")
+                if not futures:
+                    raise ValueError("Download produced no audio")
+
+                logger.info(f"✅ Download finished after {downloaded:.0f}s, waiting for {len(futures)} segments")
+                transcriptions = [f.result() for f in futures]
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(
+            f"✅ Progressive transcription done in {time.monotonic() - start:.0f}s "
+            f"(download took {downloaded:.0f}s)"
+        )
+        return self.chunker.stitch_segments(transcriptions)
+
+    def _finished_segments(self, work_dir: Path, segmenter: subprocess.Popen):
+        """Yield segment paths in order once ffmpeg has moved past them."""
+        stall_budget = deadlines.budget("download", self.segment_seconds)
+        last_progress = time.monotonic()
+        index = 0
+        while True:
+            done = segmenter.poll() is not None
+
+            while True:
+                segment = work_dir / f'segment_{index:04d}.mp3'
+                if not segment.exists():
+                    break
+                # A segment is complete once the next one is started or ffmpeg exits
+                if not done and not (work_dir / f'segment_{index + 1:04d}.mp3').exists():
+                    break
+                yield segment
+                index += 1
+                last_progress = time.monotonic()
+
+            if done:
+                return
+            if time.monotonic() - last_progress > stall_budget:
+                raise StageTimeout("download", stall_budget)
+            time.sleep(self.POLL_INTERVAL)
+
+    def _transcribe_segment(self, segment: Path, index: int) -> SegmentIndex:
+        min_bytes = self.MIN_SEGMENT_SECONDS * self.chunker.ENCODE_KBPS * 1000 / 8
+        try:
+            size = segment.stat().st_size
+            if size < min_bytes:
+                return SegmentIndex()
+            with tracer.span("chunk", index=index, bytes=size,
+                             audio_seconds=size * 8 / (self.chunker.ENCODE_KBPS * 1000)):
+                return self.transcribe(segment)
+        finally:
+            # Free scratch space as soon as each segment is done
+            segment.unlink(missing_ok=True)
+
+    def _check_exit(self, proc: subprocess.Popen, log_path: Path, stage: str):
+        if proc.returncode:
+            log_tail = log_path.read_text(errors='replace').strip()[-500:]
+            raise RuntimeError(f"{stage} failed (exit {proc.returncode}): {log_tail}")
@@ -0,0 +1,211 @@
+"""
+Record Profiler
+Opt-in per-record profiling: cProfile, tracemalloc snapshots and
+per-command CPU/RSS accounting for ffmpeg/ffprobe, written as one bundle
+per record for offline analysis.
+
+Enable with PROFILE_RECORD_IDS=rec1,rec2 and/or PROFILE_SAMPLE_RATE=0.05.
+Open a bundle's cpu.pstats with `python -m pstats` or snakeviz.
+
+Work the record hands to pool threads (through tracer.wrap) is profiled in
+those threads and merged into the same bundle; other records running at
+the same time are not.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Set
+
+from subprocess_runner import observe_commands
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class _Session:
+    """Profilers of the threads working on the record being profiled."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.threads: Set[int] = {threading.get_ident()}
+        self.profilers: List[cProfile.Profile] = []
+
+
+# Carried into pool threads by tracer.wrap
+_session: contextvars.ContextVar = contextvars.ContextVar("profile_session", default=None)
+
+
+@contextmanager
+def _profile_worker() -> Iterator[None]:
+    """Profile wrapped work in another thread while its record is being profiled."""
+    session = _session.get()
+    thread = threading.get_ident()
+    if session is not None:
+        with session.lock:
+            if thread in session.threads:
+                # Already profiled (e.g. wrapped work run inline)
+                session = None
+            else:
+                session.threads.add(thread)
+    if session is None:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        with session.lock:
+            session.threads.discard(thread)
+            session.profilers.append(profiler)
+
+
+tracer.add_thread_hook(_profile_worker)
+
+
+class RecordProfiler:
+    """Profiles selected records and writes a bundle for each."""
+
+    TOP_FUNCTIONS = 40
+    TOP_ALLOCATIONS = 25
+    TRACEBACK_FRAMES = 10
+
+    # cProfile and tracemalloc are process-wide, so only one record at a time
+    _active = threading.Lock()
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(os.getenv("PROFILE_DIR", output_dir))
+        self.sample_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.record_ids = {
+            r.strip() for r in os.getenv("PROFILE_RECORD_IDS", "").split(",") if r.strip()
+        }
+
+    def should_profile(self, record_id: str) -> bool:
+        """Check if a record is selected by ID or by sampling."""
+        if record_id in self.record_ids:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, record_id: str) -> Iterator[None]:
+        """
+        Profile the enclosed block if the record is selected, else do nothing.
+
+        Profiling failures are logged and never fail the record.
+        """
+        if not self.should_profile(record_id):
+            yield
+            return
+
+        if not self._active.acquire(blocking=False):
+            logger.info(f"🔬 Skipping profile for {record_id}: another record is being profiled")
+            yield
+            return
+
+        try:
+            with self._profile(record_id):
+                yield
+        finally:
+            self._active.release()
+
+    @contextmanager
+    def _profile(self, record_id: str) -> Iterator[None]:
+        logger.info(f"🔬 Profiling record {record_id}")
+
+        commands = []
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        mem_before = tracemalloc.take_snapshot()
+        usage_before = resource.getrusage(resource.RUSAGE_SELF)
+
+        profiler = cProfile.Profile()
+        session = _Session()
+        token = _session.set(session)
+        start = time.perf_counter()
+        error = None
+
+        with observe_commands(commands.append):
+            profiler.enable()
+            try:
+                yield
+            except BaseException as e:
+                error = repr(e)
+                raise
+            finally:
+                profiler.disable()
+                _session.reset(token)
+                wall = time.perf_counter() - start
+                with session.lock:
+                    # Work still running in the background (e.g. a losing hedge) is left out
+                    profilers = [profiler, *session.profilers]
+                try:
+                    mem_after = tracemalloc.take_snapshot()
+                    _, peak = tracemalloc.get_traced_memory()
+                    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+                    if started_tracing:
+                        tracemalloc.stop()
+
+                    self._write_bundle(
+                        record_id, profilers, mem_before, mem_after, commands, {
+                            "record_id": record_id,
+                            "wall_seconds": wall,
+                            "user_cpu_seconds": usage_after.ru_utime - usage_before.ru_utime,
+                            "system_cpu_seconds": usage_after.ru_stime - usage_before.ru_stime,
+                            "process_max_rss_mb": usage_after.ru_maxrss / 1024,
+                            "traced_peak_mb": peak / (1024 * 1024),
+                            "subprocess_cpu_seconds": sum(
+                                (c["user_cpu_seconds"] or 0) + (c["system_cpu_seconds"] or 0)
+                                for c in commands
+                            ),
+                            "subprocess_count": len(commands),
+                            "profiled_threads": len(profilers),
+                            "error": error,
+                        }
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not write profile for {record_id}: {e}")
+
+    def _write_bundle(self, record_id: str, profilers: List[cProfile.Profile],
+                      mem_before, mem_after, commands: list, summary: dict):
+        """Write cpu.pstats, cpu.txt, memory.txt, subprocesses.json and summary.json."""
+        bundle = self.output_dir / f"{record_id}-{time.strftime('%Y%m%d-%H%M%S')}"
+        bundle.mkdir(parents=True, exist_ok=True)
+
+        # One profile across the record's thread and its pool threads
+        report = io.StringIO()
+        stats = pstats.Stats(profilers[0], stream=report)
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(str(bundle / "cpu.pstats"))
+        stats.sort_stats("cumulative").print_stats(self.TOP_FUNCTIONS)
+        (bundle / "cpu.txt").write_text(report.getvalue())
+
+        lines = [f"Peak traced memory: {summary['traced_peak_mb']:.1f}MB", ""]
+        for stat in mem_after.compare_to(mem_before, "traceback")[:self.TOP_ALLOCATIONS]:
+            lines.append(f"{stat.size_diff / 1024:+10.1f}KB  {stat.count_diff:+7d} blocks")
+            lines.extend(f"    {line}" for line in stat.traceback.format(limit=3))
+        (bundle / "memory.txt").write_text("\n".join(lines))
+
+        (bundle / "subprocesses.json").write_text(json.dumps(commands, indent=2))
+        (bundle / "summary.json").write_text(json.dumps(summary, indent=2))
+
+        logger.info(
+            f"🔬 Profile written to {bundle} "
+            f"({summary['wall_seconds']:.1f}s wall, {len(profilers)} threads, {len(commands)} subprocesses)"
+        )
@@ -0,0 +1,211 @@
+"""
+Salient Selector
+Shrinks a long transcript to its most informative passages before it goes
+into the insight prompt. The transcript is cut into short spans of whole
+sentences, and each span is scored with TextRank over TF-IDF vectors
+(NumPy). Poker vocabulary is weighted up, so strategy talk outranks
+banter and sponsor reads. The top spans that fit a token budget are kept
+in their original order, with at least one span from each part of the
+recording, so long content is covered end to end instead of being cut
+off after its first few minutes.
+
+Text that already fits the budget is passed through unchanged.
+"""
+
+import logging
+import os
+import re
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Words that signal strategy content; their TF-IDF weights are boosted
+POKER_TERMS = frozenset("""
+    ante bb blind blinds bluff bluffs bluffing board button call calls calling cbet
+    check checks equity ev exploit exploitative fold folds folding flop gto hand
+    hands icm implied odds outs overbet pair position pot pots preflop range
+    ranges raise raises raising river shove shoving showdown sizing stack stacks
+    suited tilt turn value variance villain
+""".split())
+
+STOPWORDS = frozenset("""
+    a about after again all also am an and any are as at be because been before
+    being but by can could did do does doing don't down for from had has have
+    having he her here him his how i i'm if in into is it it's its just know
+    like me more most my no not now of off on once only or other our out over
+    really right so some than that that's the their them then there these they
+    this those through to too um uh up very was we well were what when where
+    which while who why will with would yeah you you're your
+""".split())
+
+# Rough English average, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+CHAPTERS_MARKER = "\n\n--- CHAPTERS ---\n"
+
+
+class SalientSelector:
+    """Picks the highest-scoring transcript spans that fit a token budget."""
+
+    # Spans are whole sentences, grouped up to about this many words
+    SPAN_WORDS = 60
+
+    # Every part of the recording contributes its best span first
+    SECTIONS = 8
+
+    POKER_BOOST = 2.5
+    DAMPING = 0.85
+    ITERATIONS = 50
+
+    # Most frequent terms kept as TF-IDF features (bounds the matrix size)
+    MAX_FEATURES = 5000
+
+    def __init__(self, budget_tokens: int = None):
+        """
+        Initialize selector.
+
+        Args:
+            budget_tokens: Transcript tokens allowed in the prompt
+                           (or INSIGHT_TOKEN_BUDGET, default 3000; 0 = off)
+        """
+        if budget_tokens is None:
+            budget_tokens = int(os.getenv("INSIGHT_TOKEN_BUDGET", "3000"))
+        self.budget_chars = budget_tokens * CHARS_PER_TOKEN
+
+    def select(self, text: str) -> str:
+        """
+        Reduce text to its most salient spans.
+
+        Args:
+            text: Transcript or document text (AssemblyAI chapter summaries
+                  after CHAPTERS_MARKER are always kept)
+
+        Returns:
+            Selected spans in original order, gaps marked with "...", or the
+            text itself when it already fits
+        """
+        if not self.budget_chars or len(text) <= self.budget_chars:
+            return text
+
+        body, marker, chapters = text.partition(CHAPTERS_MARKER)
+        # Chapter summaries are dense already - keep them, up to half the budget
+        chapters = chapters[:self.budget_chars // 2]
+        budget = self.budget_chars - len(chapters)
+
+        spans = self.split_spans(body)
+        if len(spans) < 2:
+            return body[:budget] + (marker + chapters if chapters else "")
+
+        scores = self.score(spans)
+        chosen = self._choose(spans, scores, budget)
+
+        pieces, previous = [], -1
+        for i in chosen:
+            if previous >= 0 and i != previous + 1:
+                pieces.append("...")
+            pieces.append(spans[i])
+            previous = i
+        selected = "\n".join(pieces)
+
+        logger.info(
+            f"✂️  Pre-selected {len(chosen)}/{len(spans)} spans: "
+            f"{len(body):,} -> {len(selected):,} chars"
+        )
+        return selected + (marker + chapters if chapters else "")
+
+    def split_spans(self, text: str) -> List[str]:
+        """Group sentences into spans of about SPAN_WORDS words."""
+        sentences = [s for s in re.split(r"(?<=[.!?])\s+|\n+", text) if s.strip()]
+
+        spans, current, words = [], [], 0
+        for sentence in sentences:
+            sentence_words = sentence.split()
+            # Unpunctuated transcripts come as one huge "sentence"
+            for i in range(0, len(sentence_words), self.SPAN_WORDS * 2):
+                piece = sentence_words[i:i + self.SPAN_WORDS * 2]
+                current.append(" ".join(piece))
+                words += len(piece)
+                if words >= self.SPAN_WORDS:
+                    spans.append(" ".join(current))
+                    current, words = [], 0
+        if current:
+            spans.append(" ".join(current))
+        return spans
+
+    def score(self, spans: List[str]):
+        """
+        TextRank centrality of each span, weighted by its poker-term density.
+
+        Returns:
+            numpy float array, one score per span
+        """
+        import numpy as np
+
+        tokenized = [
+            [w for w in re.findall(r"[a-z0-9']+", span.lower()) if w not in STOPWORDS]
+            for span in spans
+        ]
+
+        # Vocabulary: most frequent terms, poker terms always included
+        counts: Dict[str, int] = {}
+        for words in tokenized:
+            for w in words:
+                counts[w] = counts.get(w, 0) + 1
+        ranked = sorted(counts, key=lambda w: (w not in POKER_TERMS, -counts[w]))
+        vocabulary = {w: i for i, w in enumerate(ranked[:self.MAX_FEATURES])}
+
+        rows, cols = [], []
+        for row, words in enumerate(tokenized):
+            for w in words:
+                col = vocabulary.get(w)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        tf = np.zeros((len(spans), len(vocabulary)), dtype=np.float32)
+        np.add.at(tf, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+        # Sublinear TF x smoothed IDF, poker terms boosted, rows L2-normalized
+        df = (tf > 0).sum(axis=0)
+        idf = np.log((1 + len(spans)) / (1 + df)) + 1
+        boost = np.ones(len(vocabulary), dtype=np.float32)
+        boost[[i for w, i in vocabulary.items() if w in POKER_TERMS]] = self.POKER_BOOST
+        vectors = np.log1p(tf) * idf * boost
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1)
+
+        # TextRank: PageRank over the cosine-similarity graph
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, 0)
+        out_weight = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, out_weight, out=np.zeros_like(similarity), where=out_weight > 0)
+        n = len(spans)
+        rank = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(self.ITERATIONS):
+            updated = (1 - self.DAMPING) / n + self.DAMPING * (transition.T @ rank)
+            if np.abs(updated - rank).sum() < 1e-6:
+                rank = updated
+                break
+            rank = updated
+
+        poker_share = np.array(
+            [sum(w in POKER_TERMS for w in words) / max(len(words), 1) for words in tokenized],
+            dtype=np.float32
+        )
+        return rank * n * (1 + self.POKER_BOOST * poker_share)
+
+    def _choose(self, spans: List[str], scores, budget: int) -> List[int]:
+        """Best span per section first, then the best of the rest, within budget."""
+        import numpy as np
+
+        sections = np.array_split(np.arange(len(spans)), min(self.SECTIONS, len(spans)))
+        candidates = [int(section[np.argmax(scores[section])]) for section in sections]
+        candidates += [int(i) for i in np.argsort(-scores)]
+
+        chosen, used = set(), 0
+        for i in candidates:
+            cost = len(spans[i]) + 1
+            if i in chosen or used + cost > budget:
+                continue
+            chosen.add(i)
+            used += cost
+        return sorted(chosen)
@@ -0,0 +1,330 @@
+"""
+Scratch Space Manager
+Per-record working directories under downloads/, guaranteed cleanup,
+orphan sweeping after crashes, disk-budget admission control, and parking
+of downloaded audio while every transcription backend is down.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A restarted container reuses the old worker's PID (often 1), so a PID
+# match alone doesn't prove a directory belongs to this process
+_PROCESS_STARTED = time.time()
+
+
+class DiskBudgetExceeded(Exception):
+    """Raised when a download can never fit inside the configured disk budget."""
+
+
+class ScratchSpace:
+    """Manages temporary download space for records being processed."""
+
+    OWNER_FILE = ".owner"
+
+    # Extracted audio plus chunk copies can roughly double the download size
+    WORKING_SET_FACTOR = 2.0
+
+    def __init__(self, root: str = "./downloads", budget_bytes: Optional[int] = None,
+                 orphan_max_age: Optional[int] = None, parked_dir: Optional[str] = None):
+        """
+        Initialize scratch space.
+
+        Args:
+            root: Directory that holds all per-record scratch directories
+            budget_bytes: Max bytes of scratch data on disk (or DOWNLOAD_DISK_BUDGET_MB)
+            orphan_max_age: Seconds before an unowned leftover is swept
+                            (or SCRATCH_ORPHAN_MAX_AGE_SECONDS, default 1 hour)
+            parked_dir: Where audio waits out backend outages (default
+                        state/parked next to root, so orphan sweeping skips it)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.parked_dir = Path(parked_dir) if parked_dir else self.root.parent / "state" / "parked"
+
+        # Parked audio nobody came back for is dropped after this long
+        self.parked_max_age = int(os.getenv("PARKED_AUDIO_MAX_AGE_SECONDS", str(3 * 24 * 3600)))
+
+        if budget_bytes is None:
+            budget_mb = int(os.getenv("DOWNLOAD_DISK_BUDGET_MB", "0"))
+            budget_bytes = budget_mb * 1024 * 1024
+        self.budget_bytes = budget_bytes  # 0 = unlimited
+
+        if orphan_max_age is None:
+            orphan_max_age = int(os.getenv("SCRATCH_ORPHAN_MAX_AGE_SECONDS", "3600"))
+        self.orphan_max_age = orphan_max_age
+
+        # Active reservations: (record_id or None, bytes)
+        self._reservations: List[Tuple[Optional[str], int]] = []
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Per-record directories
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def record_dir(self, record_id: str) -> Iterator[Path]:
+        """
+        Create a scratch directory for one record and always remove it.
+
+        Args:
+            record_id: Airtable record ID (used as directory name)
+
+        Yields:
+            Path to the record's scratch directory
+        """
+        path = self.root / record_id
+        if path.exists():
+            # Leftover from a previous crashed attempt at this record
+            self._remove(path)
+        path.mkdir(parents=True)
+
+        owner = {"pid": os.getpid(), "started": time.time(), "start_ticks": _process_start_ticks(os.getpid())}
+        (path / self.OWNER_FILE).write_text(json.dumps(owner))
+
+        try:
+            yield path
+        finally:
+            self._remove(path)
+
+    # ------------------------------------------------------------------
+    # Parked audio
+    # ------------------------------------------------------------------
+
+    def park(self, record_id: str, path: Path) -> Path:
+        """
+        Move a record's audio out of its scratch directory so it survives
+        the record failing, and a retry after an outage skips the download.
+
+        Args:
+            record_id: Record the audio belongs to
+            path: Audio file inside the record's scratch directory
+
+        Returns:
+            Path of the parked file
+        """
+        target = self.parked_dir / f"{record_id}{path.suffix}"
+        if path == target:
+            return target
+        self.parked_dir.mkdir(parents=True, exist_ok=True)
+        self.unpark(record_id)
+        shutil.move(str(path), str(target))
+        os.utime(target)  # Age counts from parking, not from the download
+        logger.info(f"🅿️  Parked audio for {record_id} until a backend recovers")
+        return target
+
+    def parked(self, record_id: str) -> Optional[Path]:
+        """Audio parked for a record by an earlier attempt, if any."""
+        if not self.parked_dir.exists():
+            return None
+        return next(self.parked_dir.glob(f"{record_id}.*"), None)
+
+    def unpark(self, record_id: str):
+        """Drop a record's parked audio (once it has been transcribed)."""
+        path = self.parked(record_id)
+        if path is not None:
+            self._remove(path)
+
+    def sweep_parked(self) -> int:
+        """
+        Remove parked audio older than parked_max_age.
+
+        Returns:
+            Number of bytes freed
+        """
+        if not self.parked_dir.exists():
+            return 0
+
+        freed = 0
+        now = time.time()
+        for entry in self.parked_dir.iterdir():
+            try:
+                if now - entry.stat().st_mtime < self.parked_max_age:
+                    continue
+                size = entry.stat().st_size
+                self._remove(entry)
+                freed += size
+                logger.info(f"🧹 Dropped stale parked audio: {entry.name}")
+            except FileNotFoundError:
+                continue
+        return freed
+
+    # ------------------------------------------------------------------
+    # Orphan sweeping
+    # ------------------------------------------------------------------
+
+    def sweep_orphans(self) -> int:
+        """
+        Remove scratch data left behind by crashed or killed workers.
+
+        A record directory is an orphan when its owning process is gone.
+        Loose files (from older code paths) are orphans once they are older
+        than orphan_max_age.
+
+        Returns:
+            Number of bytes freed
+        """
+        freed = 0
+        now = time.time()
+
+        for entry in self.root.iterdir():
+            try:
+                if entry.is_dir() and (entry / self.OWNER_FILE).exists():
+                    if self._owner_alive(entry):
+                        continue
+                elif now - entry.stat().st_mtime < self.orphan_max_age:
+                    continue
+
+                size = self._tree_size(entry)
+                self._remove(entry)
+                freed += size
+                logger.info(f"🧹 Swept orphaned scratch data: {entry.name} ({size/(1024*1024):.1f}MB)")
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"Could not sweep {entry}: {e}")
+
+        return freed
+
+    def _owner_alive(self, path: Path) -> bool:
+        """Check whether the process that created a record directory still runs."""
+        try:
+            owner = json.loads((path / self.OWNER_FILE).read_text())
+            pid = int(owner["pid"])
+        except (ValueError, KeyError, OSError):
+            return False
+
+        # Same PID but a different process start time: an earlier process
+        # (e.g. before a container restart) created it
+        recorded_ticks = owner.get("start_ticks")
+        current_ticks = _process_start_ticks(pid)
+        if recorded_ticks is not None and current_ticks is not None:
+            return recorded_ticks == current_ticks
+
+        if pid == os.getpid():
+            return float(owner.get("started", 0)) >= _PROCESS_STARTED
+
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # Exists but belongs to another user
+        return True
+
+    # ------------------------------------------------------------------
+    # Admission control
+    # ------------------------------------------------------------------
+
+    def usage(self) -> int:
+        """Bytes currently used by scratch data."""
+        return self._tree_size(self.root)
+
+    @contextmanager
+    def reserve(self, expected_bytes: int, timeout: Optional[float] = None,
+                record_id: Optional[str] = None) -> Iterator[None]:
+        """
+        Hold back until a download of expected_bytes fits in the disk budget.
+
+        The reservation is released when the block exits, by which point the
+        record's scratch directory has been removed.
+
+        Args:
+            expected_bytes: Probed download size (0 if unknown)
+            timeout: Max seconds to wait for space (None = wait forever)
+            record_id: Record whose scratch directory fills the reservation, so
+                       what it has written so far isn't counted twice
+
+        Raises:
+            DiskBudgetExceeded: If the download can never fit, or timeout expires
+        """
+        if not self.budget_bytes:
+            yield
+            return
+
+        needed = int(expected_bytes * self.WORKING_SET_FACTOR)
+        if needed > self.budget_bytes:
+            raise DiskBudgetExceeded(
+                f"Download needs ~{needed/(1024*1024):.0f}MB, budget is "
+                f"{self.budget_bytes/(1024*1024):.0f}MB"
+            )
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while self._committed() + needed > self.budget_bytes:
+                # Another worker may have crashed and left data behind
+                if self.sweep_orphans():
+                    continue
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise DiskBudgetExceeded("Timed out waiting for disk budget")
+
+                logger.info(f"⏳ Waiting for disk budget ({needed/(1024*1024):.0f}MB needed)")
+                self._cond.wait(timeout=min(30, remaining) if remaining else 30)
+
+            reservation = (record_id, needed)
+            self._reservations.append(reservation)
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._reservations.remove(reservation)
+                self._cond.notify_all()
+
+    def _committed(self) -> int:
+        """Bytes on disk plus what active reservations have yet to write."""
+        committed = self.usage()
+        for record_id, reserved in self._reservations:
+            written = self._tree_size(self.root / record_id) if record_id else 0
+            committed += max(reserved - written, 0)
+        return committed
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _tree_size(self, path: Path) -> int:
+        """Total size in bytes of a file or directory tree."""
+        if path.is_file():
+            return path.stat().st_size
+
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return total
+
+    def _remove(self, path: Path):
+        """Remove a file or directory tree, logging instead of raising."""
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+        except Exception as e:
+            logger.warning(f"Cleanup warning: {e}")
+
+
+def _process_start_ticks(pid: int) -> Optional[int]:
+    """Start time of a process in clock ticks since boot (Linux /proc), None if unknown."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+        # The command name may contain spaces and parentheses - fields after it don't
+        return int(stat.rsplit(")", 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return None
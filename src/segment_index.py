@@ -0,0 +1,204 @@
+"""
+Segment Index
+Timestamped segments of a transcript in a compact, array-backed form. The
+transcript stays one string; each segment is a start/end time plus a
+character range into that string, kept in parallel typed arrays rather
+than a dict per segment. Lookups by time or by text position are binary
+searches, so a quote can be traced back to a moment in the recording and
+any time range re-sliced without transcribing again.
+"""
+
+import bisect
+import re
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Words as matched when locating quotes (case and punctuation ignored)
+WORD = re.compile(r"\w+(?:'\w+)*")
+
+
+class SegmentIndex:
+    """Transcript text with per-segment times (ms) and character offsets."""
+
+    # A quote the model shortened or reworded is located by its opening words
+    QUOTE_PREFIX_WORDS = 8
+
+    def __init__(self, text: str = "", duration: float = 0.0):
+        """
+        Initialize an empty index.
+
+        Args:
+            text: Transcript the character offsets point into
+            duration: Length of the transcribed audio in seconds
+        """
+        self.text = text
+        self.duration = duration
+        self.start_ms = array('q')
+        self.end_ms = array('q')
+        self.char_start = array('q')
+        self.char_end = array('q')
+
+    def __len__(self) -> int:
+        return len(self.start_ms)
+
+    @classmethod
+    def from_segments(cls, text: str, segments: List[Dict], duration: float = 0.0) -> "SegmentIndex":
+        """
+        Align timed segments with the transcript text they make up.
+
+        Args:
+            text: Full transcript
+            segments: Dicts with start, end (seconds) and text, in order
+            duration: Audio length in seconds (default: end of the last segment)
+
+        Returns:
+            SegmentIndex over text
+        """
+        index = cls(text, duration or (segments[-1]['end'] if segments else 0.0))
+        pos = 0
+        for segment in segments:
+            piece = segment['text'].strip()
+            if not piece:
+                continue
+            found = text.find(piece, pos)
+            if found < 0:
+                # Spacing differs from the joined text - the segment still follows on
+                found = len(text) - len(text[pos:].lstrip())
+            end = min(found + len(piece), len(text))
+            index._append(round(segment['start'] * 1000), round(segment['end'] * 1000), found, end)
+            pos = end
+        return index
+
+    @classmethod
+    def concat(cls, parts: List["SegmentIndex"], separator: str = "\n\n") -> "SegmentIndex":
+        """
+        Join the indexes of consecutive audio chunks into one.
+
+        Each part's times are shifted by the durations of the parts before
+        it; parts without text still advance the clock.
+
+        Args:
+            parts: Chunk indexes in playback order
+            separator: Placed between chunk texts (as in stitching)
+
+        Returns:
+            SegmentIndex over the stitched text
+        """
+        index = cls()
+        pieces: List[str] = []
+        chars = 0
+        offset_ms = 0
+        for part in parts:
+            if part.text:
+                if pieces:
+                    chars += len(separator)
+                for i in range(len(part)):
+                    index._append(part.start_ms[i] + offset_ms, part.end_ms[i] + offset_ms,
+                                  part.char_start[i] + chars, part.char_end[i] + chars)
+                pieces.append(part.text)
+                chars += len(part.text)
+            offset_ms += round(part.duration * 1000)
+        index.text = separator.join(pieces)
+        index.duration = offset_ms / 1000
+        return index
+
+    def scaled(self, factor: float) -> "SegmentIndex":
+        """Copy with every time multiplied by factor (e.g. back from sped-up audio)."""
+        index = SegmentIndex(self.text, self.duration * factor)
+        index.start_ms = array('q', (round(t * factor) for t in self.start_ms))
+        index.end_ms = array('q', (round(t * factor) for t in self.end_ms))
+        index.char_start = array('q', self.char_start)
+        index.char_end = array('q', self.char_end)
+        return index
+
+    def segments(self) -> Iterator[Tuple[float, float, str]]:
+        """Yield (start, end, text) per segment, times in seconds."""
+        for i in range(len(self)):
+            yield self.start_ms[i] / 1000, self.end_ms[i] / 1000, self.text[self.char_start[i]:self.char_end[i]]
+
+    def segment_at(self, seconds: float) -> int:
+        """Position of the segment playing at a time (the last one starting before it), -1 if none."""
+        return bisect.bisect_right(self.start_ms, round(seconds * 1000)) - 1
+
+    def time_at(self, char_offset: int) -> Optional[float]:
+        """Start time of the segment containing a character offset of the text."""
+        i = bisect.bisect_right(self.char_start, char_offset) - 1
+        return self.start_ms[i] / 1000 if i >= 0 else None
+
+    def slice(self, start: float, end: float) -> str:
+        """Text of the segments overlapping a time range in seconds."""
+        if not len(self):
+            return ""
+        first = max(self.segment_at(start), 0)
+        if self.end_ms[first] <= round(start * 1000):
+            # Ended before the range (a pause, or the end of the recording)
+            first += 1
+        last = bisect.bisect_left(self.start_ms, round(end * 1000)) - 1
+        if last < first:
+            return ""
+        return self.text[self.char_start[first]:self.char_end[last]]
+
+    def locate(self, quote: str) -> Optional[Tuple[float, float]]:
+        """
+        Find when a quote was said.
+
+        Matching ignores case and punctuation; a quote that doesn't match
+        whole is located by its first QUOTE_PREFIX_WORDS words.
+
+        Args:
+            quote: Text taken from the transcript (e.g. a key quote)
+
+        Returns:
+            (start, end) in seconds of the segments it spans, or None
+        """
+        span = self._find(quote)
+        if span is None or not len(self):
+            return None
+        first = max(bisect.bisect_right(self.char_start, span[0]) - 1, 0)
+        last = max(bisect.bisect_right(self.char_start, span[1] - 1) - 1, first)
+        return self.start_ms[first] / 1000, self.end_ms[last] / 1000
+
+    def to_json(self) -> Dict:
+        """Arrays as lists of ints, for storage next to the text."""
+        return {
+            "duration": self.duration,
+            "start_ms": self.start_ms.tolist(),
+            "end_ms": self.end_ms.tolist(),
+            "char_start": self.char_start.tolist(),
+            "char_end": self.char_end.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, text: str, data: Dict) -> "SegmentIndex":
+        """Rebuild an index stored with to_json over its text."""
+        index = cls(text, data.get("duration", 0.0))
+        for name in ("start_ms", "end_ms", "char_start", "char_end"):
+            setattr(index, name, array('q', data[name]))
+        return index
+
+    def _append(self, start_ms: int, end_ms: int, char_start: int, char_end: int):
+        self.start_ms.append(start_ms)
+        self.end_ms.append(end_ms)
+        self.char_start.append(char_start)
+        self.char_end.append(char_end)
+
+    def _find(self, quote: str) -> Optional[Tuple[int, int]]:
+        """Character range of a quote in the text."""
+        quote = quote.strip().strip('"“”\'')
+        found = self.text.find(quote) if quote else -1
+        if found >= 0:
+            return found, found + len(quote)
+
+        wanted = [w.lower() for w in WORD.findall(quote)]
+        if not wanted:
+            return None
+        matches = list(WORD.finditer(self.text))
+        words = " ".join(m.group().lower() for m in matches)
+        for probe in (wanted, wanted[:self.QUOTE_PREFIX_WORDS]):
+            needle = " ".join(probe)
+            # Whole words only: anchor on word boundaries in the joined text
+            pos = f" {words} ".find(f" {needle} ")
+            if pos >= 0:
+                first = words.count(" ", 0, pos)
+                return matches[first].start(), matches[first + len(probe) - 1].end()
+        return None
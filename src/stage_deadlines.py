@@ -0,0 +1,148 @@
+"""
+Stage Deadlines
+Time budgets for the media pipeline's external stages (yt-dlp downloads,
+ffmpeg and ffprobe), scaled to the length of the media being processed, so
+a hung or throttled process can't block a worker forever.
+
+Each stage's budget is base + per_media_second * duration. Override either
+part with STAGE_BUDGET_<STAGE>="base,per_media_second", e.g.
+STAGE_BUDGET_DOWNLOAD="300,2".
+"""
+
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ffmpeg_executor import executor
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimeout(TimeoutError):
+    """Raised when a pipeline stage runs past its time budget."""
+
+    def __init__(self, stage: str, budget: float):
+        super().__init__(f"{stage} exceeded its {budget:.0f}s time budget")
+        self.stage = stage
+        self.budget = budget
+
+
+class StageDeadlines:
+    """Per-stage time budgets and a runner that enforces them."""
+
+    # stage: (base seconds, seconds per second of media)
+    DEFAULTS: Dict[str, Tuple[float, float]] = {
+        "probe": (60, 0),
+        "fingerprint": (60, 0.5),
+        "extract_audio": (60, 0.25),
+        "split": (60, 0.25),
+        "tempo": (60, 0.25),
+        # Must keep up with real time - slower than that is a throttled stream
+        "download": (120, 1.0),
+        # Remote AssemblyAI jobs; the media length isn't known up front
+        "transcribe": (3600, 0),
+    }
+
+    # A timed-out stage is retried once with this much more time
+    RETRY_SCALE = 1.5
+
+    # Assumed bitrate when a file's duration can't be probed (128 kbps). Video
+    # has a far higher bitrate, so this over-estimates - the safe direction.
+    FALLBACK_BYTES_PER_SECOND = 16000
+
+    def __init__(self):
+        self.budgets = {}
+        for stage, (base, per_second) in self.DEFAULTS.items():
+            override = os.getenv(f"STAGE_BUDGET_{stage.upper()}")
+            if override:
+                base, _, rate = override.partition(",")
+                base, per_second = float(base), float(rate or per_second)
+            self.budgets[stage] = (float(base), float(per_second))
+
+    def budget(self, stage: str, media_seconds: float = 0) -> float:
+        """
+        Time budget for one run of a stage.
+
+        Args:
+            stage: Stage name (see DEFAULTS)
+            media_seconds: Duration of the media the stage works on (0 = unknown)
+
+        Returns:
+            Seconds the stage may take
+        """
+        base, per_second = self.budgets[stage]
+        return base + per_second * max(media_seconds, 0)
+
+    def run(self, stage: str, cmd: List[str], media_seconds: float = 0,
+            outputs: Iterable[Path] = (), attempts: int = 2, **kwargs) -> subprocess.CompletedProcess:
+        """
+        Run a command under its stage's budget, retrying with more time on timeout.
+
+        The command's process group is killed when the budget runs out, and
+        partial outputs are removed before the next attempt. ffmpeg commands
+        wait for a CPU slot first; the wait doesn't count against the budget.
+
+        Args:
+            stage: Stage name
+            cmd: Command and arguments
+            media_seconds: Duration of the media the command works on
+            outputs: Files the command writes, removed if it times out
+            attempts: Runs before giving up
+            **kwargs: Passed to run_command (check, capture_output, text, ...)
+
+        Returns:
+            subprocess.CompletedProcess
+
+        Raises:
+            StageTimeout: When the last attempt also runs out of time
+        """
+        budget = self.budget(stage, media_seconds)
+        with tracer.span(stage, command=Path(cmd[0]).name, media_seconds=media_seconds) as span:
+            for attempt in range(1, attempts + 1):
+                span.set(attempts=attempt, budget_seconds=budget)
+                try:
+                    result = executor.run(stage, cmd, media_seconds, timeout=budget, **kwargs)
+                    span.set(returncode=result.returncode)
+                    return result
+                except subprocess.TimeoutExpired:
+                    remove_partial(outputs)
+                    if attempt == attempts:
+                        raise StageTimeout(stage, budget)
+                    logger.warning(
+                        f"⏱️  {stage} exceeded its {budget:.0f}s budget - killed, retrying "
+                        f"with {budget * self.RETRY_SCALE:.0f}s"
+                    )
+                    budget *= self.RETRY_SCALE
+
+    def media_seconds(self, path: Path) -> float:
+        """Duration of a media file for budgeting, estimated from its size if ffprobe can't tell."""
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            str(path)
+        ]
+        try:
+            result = self.run("probe", cmd, capture_output=True, text=True, attempts=1)
+            return float(result.stdout.strip())
+        except (StageTimeout, ValueError):
+            return path.stat().st_size / self.FALLBACK_BYTES_PER_SECOND
+
+
+def remove_partial(paths: Iterable[Path]):
+    """Delete files a killed stage may have left half-written."""
+    for path in paths:
+        # yt-dlp keeps in-progress data next to the target (.part, .ytdl)
+        for leftover in [path, *path.parent.glob(f"{path.name}.*")]:
+            try:
+                leftover.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove partial file {leftover}: {e}")
+
+
+# Shared by every component, so overrides are read once
+deadlines = StageDeadlines()
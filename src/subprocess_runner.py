@@ -0,0 +1,161 @@
+"""
+Subprocess Runner
+Drop-in replacement for subprocess.run used for all ffmpeg/ffprobe calls,
+with per-call resource accounting (child CPU time and max RSS). Every
+command runs in its own process group, so a timeout or error kills the
+command and anything it spawned.
+"""
+
+import contextvars
+import logging
+import os
+import signal
+import subprocess
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Callbacks that receive one accounting dict per finished command
+_observers: contextvars.ContextVar = contextvars.ContextVar("command_observers", default=())
+
+
+class _AccountedPopen(subprocess.Popen):
+    """Popen that reaps the child with wait4() to capture its rusage."""
+
+    rusage = None
+
+    def _try_wait(self, wait_flags):
+        try:
+            pid, sts, rusage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            # Already reaped elsewhere - same fallback as Popen._try_wait
+            return (self.pid, 0)
+        if pid == self.pid:
+            self.rusage = rusage
+        return (pid, sts)
+
+
+def run_command(cmd: List[str], check: bool = False, capture_output: bool = False,
+                text: bool = False, timeout: Optional[float] = None,
+                input=None, nice: int = 0, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a command like subprocess.run, reporting resource usage to observers.
+
+    Args:
+        cmd: Command and arguments
+        check: Raise CalledProcessError on non-zero exit
+        capture_output: Capture stdout and stderr
+        text: Decode output as text
+        timeout: Seconds before the command is killed
+        input: Data sent to stdin
+        nice: Niceness added to the command (lower CPU priority)
+
+    Returns:
+        subprocess.CompletedProcess
+    """
+    kwargs.setdefault('start_new_session', True)
+    if capture_output:
+        kwargs['stdout'] = subprocess.PIPE
+        kwargs['stderr'] = subprocess.PIPE
+    if input is not None:
+        kwargs['stdin'] = subprocess.PIPE
+
+    start = time.monotonic()
+    with _AccountedPopen(cmd, text=text, **kwargs) as proc:
+        if nice:
+            _renice(proc, nice, kwargs['start_new_session'])
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_group(proc)
+            proc.communicate()
+            _notify(cmd, proc, start)
+            raise
+        except BaseException:
+            kill_group(proc)
+            raise
+        returncode = proc.poll()
+
+    _notify(cmd, proc, start)
+
+    if check and returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
+
+@contextmanager
+def open_command(cmd: List[str], **kwargs) -> Iterator[subprocess.Popen]:
+    """
+    Start a long-running command like subprocess.Popen (e.g. one end of a pipeline).
+
+    The process is killed if the block raises, always reaped on exit, and
+    reported to observers like run_command.
+    """
+    kwargs.setdefault('start_new_session', True)
+    start = time.monotonic()
+    proc = _AccountedPopen(cmd, **kwargs)
+    try:
+        yield proc
+    except BaseException:
+        kill_group(proc)
+        raise
+    finally:
+        with proc:  # Closes pipes and waits
+            pass
+        _notify(cmd, proc, start)
+
+
+def kill_group(proc: subprocess.Popen):
+    """Kill a command and every process it started (its own process group)."""
+    try:
+        if proc.poll() is None:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        # Not a group leader (start_new_session=False) or already gone
+        proc.kill()
+
+
+def _renice(proc: subprocess.Popen, nice: int, own_group: bool):
+    """Lower a just-started command's CPU priority (its whole group when it leads one)."""
+    try:
+        niceness = os.getpriority(os.PRIO_PROCESS, 0) + nice
+        if own_group:
+            os.setpriority(os.PRIO_PGRP, proc.pid, niceness)
+        else:
+            os.setpriority(os.PRIO_PROCESS, proc.pid, niceness)
+    except OSError as e:
+        logger.debug(f"Could not renice {proc.pid}: {e}")
+
+
+@contextmanager
+def observe_commands(callback: Callable[[Dict], None]) -> Iterator[None]:
+    """Send accounting for every command run in this context to callback."""
+    token = _observers.set(_observers.get() + (callback,))
+    try:
+        yield
+    finally:
+        _observers.reset(token)
+
+
+def _notify(cmd: List[str], proc: _AccountedPopen, start: float):
+    observers = _observers.get()
+    if not observers:
+        return
+
+    usage = proc.rusage
+    record = {
+        "command": os.path.basename(str(cmd[0])),
+        "args": [str(a) for a in cmd[1:]],
+        "returncode": proc.returncode,
+        "wall_seconds": time.monotonic() - start,
+        "user_cpu_seconds": usage.ru_utime if usage else None,
+        "system_cpu_seconds": usage.ru_stime if usage else None,
+        "max_rss_mb": usage.ru_maxrss / 1024 if usage else None,
+    }
+    for callback in observers:
+        try:
+            callback(record)
+        except Exception as e:
+            logger.warning(f"Command observer failed: {e}")
@@ -0,0 +1,119 @@
+"""
+Tempo Compressor
+Optionally speeds speech up with ffmpeg's atempo filter (pitch is kept)
+before transcription. Upload size and billed audio minutes both scale with
+duration, so 1.4x cuts them by about 30%. Timestamps that come back
+(AssemblyAI chapters and utterances) are scaled to the original timeline.
+
+Enable with TRANSCRIBE_TEMPO=1.4 (1.0 = off). Use benchmarks/tempo_wer.py
+to find the largest factor that keeps the word error rate acceptable.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from audio_chunker import AudioChunker
+from stage_deadlines import deadlines
+
+logger = logging.getLogger(__name__)
+
+
+class TempoCompressor:
+    """Speeds audio up before transcription and maps timestamps back."""
+
+    # Speech stops being reliably intelligible to ASR well before this
+    MAX_FACTOR = 3.0
+
+    # Older ffmpeg builds limit one atempo instance to 0.5-2.0, so larger
+    # factors are built from a chain
+    MAX_STEP = 2.0
+
+    # Never encode below this, even for very low bitrate sources
+    MIN_KBPS = 32
+
+    def __init__(self, chunker: AudioChunker, factor: Optional[float] = None):
+        """
+        Initialize compressor.
+
+        Args:
+            chunker: Supplies probing and the encode bitrate
+            factor: Playback speed (1.0 = off); defaults to TRANSCRIBE_TEMPO
+        """
+        self.chunker = chunker
+        self.factor = factor or float(os.getenv("TRANSCRIBE_TEMPO", "1.0"))
+        if not 1.0 <= self.factor <= self.MAX_FACTOR:
+            raise ValueError(f"Tempo factor must be between 1.0 and {self.MAX_FACTOR}, got {self.factor}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.factor > 1.0
+
+    def compress(self, audio_path: Path, output_dir: Path) -> Path:
+        """
+        Write a sped-up copy of an audio file.
+
+        Args:
+            audio_path: Source audio (left untouched)
+            output_dir: Where the compressed copy goes
+
+        Returns:
+            Path of the compressed MP3
+        """
+        info = self.chunker.probe(audio_path)
+        # Same bitrate as the source (capped), so the file shrinks with the duration
+        kbps = max(self.MIN_KBPS, min(self.chunker.ENCODE_KBPS, round(info['bit_rate'] / 1000)))
+        output_path = output_dir / f"{audio_path.stem}_x{self.factor:g}.mp3"
+
+        cmd = [
+            'ffmpeg',
+            '-i', str(audio_path),
+            '-vn',
+            '-map_metadata', '-1',
+            '-filter:a', atempo_chain(self.factor, self.MAX_STEP),
+            '-acodec', 'libmp3lame', '-b:a', f'{kbps}k',
+            '-y',
+            str(output_path)
+        ]
+        deadlines.run("tempo", cmd, media_seconds=info['duration'], outputs=[output_path],
+                      check=True, capture_output=True)
+
+        logger.info(
+            f"⏩ Tempo {self.factor:g}x: {info['duration']/60:.1f}min -> "
+            f"{info['duration']/self.factor/60:.1f}min, "
+            f"{audio_path.stat().st_size/(1024*1024):.1f}MB -> {output_path.stat().st_size/(1024*1024):.1f}MB"
+        )
+        return output_path
+
+    def to_original(self, seconds: float) -> float:
+        """Map a time in the compressed audio to the original timeline."""
+        return seconds * self.factor
+
+    def restore_timestamps(self, result: Dict) -> Dict:
+        """
+        Scale an AssemblyAI result's duration, chapters, utterances and
+        segments back to the original timeline.
+
+        Returns:
+            A new result dict (the input is not modified)
+        """
+        restored = dict(result)
+        if restored.get('duration'):
+            restored['duration'] = self.to_original(restored['duration'])
+        for key in ('chapters', 'speakers', 'segments'):
+            restored[key] = [
+                {**item, 'start': self.to_original(item['start']), 'end': self.to_original(item['end'])}
+                for item in result.get(key) or []
+            ]
+        return restored
+
+
+def atempo_chain(factor: float, max_step: float = TempoCompressor.MAX_STEP) -> str:
+    """Build an atempo filter for any factor from steps of at most max_step."""
+    steps: List[float] = []
+    while factor > max_step:
+        steps.append(max_step)
+        factor /= max_step
+    steps.append(factor)
+    return ",".join(f"atempo={step:.6g}" for step in steps)
@@ -0,0 +1,246 @@
+"""
+Tracing
+Structured trace spans for each record (record -> stage -> chunk -> API
+call) with attributes such as bytes, audio seconds and backend, so a
+record's wall time can be broken down afterwards.
+
+Logging and span export are both non-blocking: log records and finished
+spans go onto an in-memory queue, and a background listener thread does
+all file and console I/O. Spans are written to logs/traces.jsonl, one
+OTLP/JSON ExportTraceServiceRequest per line (the OpenTelemetry
+Collector's file exporter format), which OTLP-aware trace viewers such as
+Jaeger can open. Set TRACING_ENABLED=false to turn span export off.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import secrets
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+SERVICE_NAME = "poker-video-processor"
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation in a record's trace."""
+
+    def __init__(self, name: str, parent: Optional["Span"], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.kind = kind
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        """Add or overwrite attributes (None values are skipped)."""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def fail(self, message: str):
+        """Mark the span as failed without raising (e.g. an error result)."""
+        self.error = message
+
+    def to_otlp(self) -> Dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoSpan:
+    """Stand-in yielded when a span isn't recorded, so callers needn't check."""
+
+    def set(self, **attributes):
+        pass
+
+    def fail(self, message: str):
+        pass
+
+
+class Tracer:
+    """Creates nested spans and hands finished ones to the logging queue."""
+
+    def __init__(self):
+        self.enabled = False
+        self._logger = logging.getLogger("trace")
+        self._observers: List[Callable[[Span], None]] = []
+        self._thread_hooks: List[Callable[[], ContextManager]] = []
+
+    @contextmanager
+    def span(self, name: str, kind: int = KIND_INTERNAL, root: bool = False,
+             **attributes) -> Iterator[Span]:
+        """
+        Time a block as a span, nested under the current span.
+
+        Args:
+            name: Span name, e.g. 'download' or 'openai.chat'
+            kind: KIND_INTERNAL, or KIND_CLIENT for outgoing API calls
+            root: May start a new trace (one per record). Other spans are
+                  only recorded inside an active trace, so work outside any
+                  record (e.g. polling Airtable) doesn't litter the file.
+            **attributes: Span attributes (str, int, float or bool)
+
+        Yields:
+            The span, for adding attributes discovered along the way
+        """
+        parent = _current.get()
+        if not (self.enabled or self._observers) or (parent is None and not root):
+            yield _NoSpan()
+            return
+
+        span = Span(name, parent, kind, attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            for observer in self._observers:
+                try:
+                    observer(span)
+                except Exception as e:
+                    self._logger.debug(f"Span observer failed: {e}")
+            if self.enabled:
+                self._logger.info(name, extra={"span": span.to_otlp()})
+
+    def add_observer(self, callback: Callable[[Span], None]):
+        """Also hand every finished span to callback, in the thread that ends it (even with export off)."""
+        self._observers.append(callback)
+
+    def add_thread_hook(self, hook: Callable[[], ContextManager]):
+        """Enter hook() around every wrapped function, in the worker thread and the submitter's context."""
+        self._thread_hooks.append(hook)
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def wrap(self, fn: Callable) -> Callable:
+        """
+        Carry the current span into a worker thread.
+
+        Executors don't copy context variables, so wrap each submitted
+        function: pool.submit(tracer.wrap(fn), *args). Wrap once per submit -
+        a context can't be entered by two threads at once.
+        """
+        context = contextvars.copy_context()
+        hooks = list(self._thread_hooks)
+        if not hooks:
+            return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+        def run(*args, **kwargs):
+            with ExitStack() as stack:
+                for hook in hooks:
+                    stack.enter_context(hook())
+                return fn(*args, **kwargs)
+        return lambda *args, **kwargs: context.run(run, *args, **kwargs)
+
+
+class SpanFileHandler(logging.Handler):
+    """Writes span records as OTLP/JSON lines; ignores ordinary log records."""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._resource = {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]}
+
+    def emit(self, record: logging.LogRecord):
+        span = getattr(record, "span", None)
+        if span is None:
+            return
+        try:
+            self._file.write(json.dumps({
+                "resourceSpans": [{
+                    "resource": self._resource,
+                    "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span]}],
+                }]
+            }) + "\n")
+            self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def setup_logging(log_file: Optional[Path] = None, trace_file: Optional[Path] = None,
+                  level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Send all logging through a queue drained by a background thread.
+
+    Args:
+        log_file: Also write log lines here (console is always on)
+        trace_file: Write spans here, unless TRACING_ENABLED=false
+        level: Root log level
+
+    Returns:
+        The running listener (stopped automatically at exit)
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        handler.addFilter(lambda record: not hasattr(record, "span"))
+
+    if trace_file and os.getenv("TRACING_ENABLED", "true").lower() == "true":
+        handlers.append(SpanFileHandler(trace_file))
+        tracer.enabled = True
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)  # Drain what's queued before exiting
+    return listener
+
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# The one tracer for the whole process
+tracer = Tracer()
@@ -0,0 +1,294 @@
+"""
+Transcript Archive
+Keeps every full transcript (with chapters, speaker segments and the
+timestamped segment index) in a compressed local SQLite archive, indexed
+with FTS5 for fast search.
+
+Usage:
+    python transcript_archive.py search "river overbet" [--limit 20]
+    python transcript_archive.py show <record_id>
+    python transcript_archive.py locate <record_id> "quote text"
+    python transcript_archive.py slice <record_id> 12:30 15:00
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from segment_index import SegmentIndex
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    record_id   TEXT PRIMARY KEY,
+    title       TEXT,
+    source      TEXT,
+    archived_at REAL,
+    chars       INTEGER,
+    body        BLOB            -- zlib-compressed JSON: text, chapters, speakers, segments
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5(
+    text,
+    record_id UNINDEXED,
+    kind UNINDEXED,             -- 'speaker', 'chapter' or 'passage'
+    start UNINDEXED,            -- seconds, NULL when untimed
+    end UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+class TranscriptArchive:
+    """Compressed full-transcript store with an FTS5 search index."""
+
+    # Target size for untimed passages split out of plain text
+    PASSAGE_CHARS = 1000
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def store(self, record_id: str, text: str, title: str = "", source: str = "",
+              chapters: Optional[List[Dict]] = None, speakers: Optional[List[Dict]] = None,
+              segments: Optional[SegmentIndex] = None):
+        """
+        Archive a full transcript, replacing any earlier version.
+
+        Args:
+            record_id: Airtable record ID
+            text: Full transcript or document text
+            title: Content title
+            source: Source URL or path
+            chapters: AssemblyAI chapters (start/end in seconds)
+            speakers: AssemblyAI speaker utterances (start/end in seconds)
+            segments: Timestamped segments, with offsets into text
+        """
+        chapters = chapters or []
+        speakers = speakers or []
+        body = zlib.compress(json.dumps({
+            "text": text,
+            "chapters": chapters,
+            "speakers": speakers,
+            "segments": segments.to_json() if segments is not None and len(segments) else None
+        }).encode("utf-8"), 6)
+
+        rows = [(record_id, *segment) for segment in self._segments(text, chapters, speakers, segments)]
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM segments WHERE record_id = ?", (record_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?)",
+                (record_id, title, source, time.time(), len(text), body)
+            )
+            self._conn.executemany(
+                "INSERT INTO segments (record_id, kind, start, end, text) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+        logger.info(f"🗄️  Archived {record_id}: {len(text)} chars, {len(rows)} segments")
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        """Get the full archived transcript for a record."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, source, archived_at, body FROM transcripts WHERE record_id = ?",
+                (record_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        result = json.loads(zlib.decompress(row[3]))
+        result.update({"record_id": record_id, "title": row[0], "source": row[1], "archived_at": row[2]})
+        return result
+
+    def segment_index(self, record_id: str) -> Optional[SegmentIndex]:
+        """Timestamped segments of an archived transcript, None if it has none."""
+        record = self.get(record_id)
+        if record is None or not record.get("segments"):
+            return None
+        return SegmentIndex.from_json(record["text"], record["segments"])
+
+    def record_ids(self, since: float = 0) -> List[str]:
+        """IDs of all archived records, oldest first, optionally archived after since."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record_id FROM transcripts WHERE archived_at >= ? ORDER BY archived_at",
+                (since,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Full-text search across all archived transcripts.
+
+        Args:
+            query: FTS5 query (plain words, "quoted phrases", OR, NEAR, prefix*)
+            limit: Max number of hits
+
+        Returns:
+            Hits, best first, with record_id, title, start/end seconds and snippet
+        """
+        sql = """
+            SELECT s.record_id, t.title, s.kind, s.start, s.end,
+                   snippet(segments, 0, '[', ']', '…', 16), bm25(segments)
+            FROM segments s JOIN transcripts t ON t.record_id = s.record_id
+            WHERE segments MATCH ?
+            ORDER BY bm25(segments)
+            LIMIT ?
+        """
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # Punctuation in free text breaks FTS5 syntax - search it as a phrase
+                phrase = '"' + query.replace('"', '""') + '"'
+                rows = self._conn.execute(sql, (phrase, limit)).fetchall()
+
+        return [
+            {
+                "record_id": r[0],
+                "title": r[1],
+                "kind": r[2],
+                "start": r[3],
+                "end": r[4],
+                "snippet": r[5],
+                "score": -r[6]
+            }
+            for r in rows
+        ]
+
+    def _segments(self, text: str, chapters: List[Dict], speakers: List[Dict],
+                  timed: Optional[SegmentIndex] = None) -> List[tuple]:
+        """Split a transcript into (kind, start, end, text) rows for the index."""
+        segments = []
+
+        if speakers:
+            # Utterances cover the whole text and carry timestamps
+            segments.extend(('speaker', s['start'], s['end'], s['text']) for s in speakers)
+        elif timed is not None and len(timed):
+            segments.extend(('passage', *p) for p in self._timed_passages(timed))
+        else:
+            segments.extend(('passage', None, None, p) for p in self._passages(text))
+
+        for ch in chapters:
+            summary = f"{ch.get('headline', '')}\n{ch.get('summary') or ch.get('gist') or ''}"
+            segments.append(('chapter', ch['start'], ch['end'], summary))
+
+        return segments
+
+    def _passages(self, text: str) -> List[str]:
+        """Split plain text into ~PASSAGE_CHARS passages on sentence boundaries."""
+        passages, current = [], ""
+        for sentence in re.split(r'(?<=[.!?])\s+', text):
+            if current and len(current) + len(sentence) > self.PASSAGE_CHARS:
+                passages.append(current)
+                current = ""
+            current = f"{current} {sentence}" if current else sentence
+        if current.strip():
+            passages.append(current)
+        return passages
+
+    def _timed_passages(self, index: SegmentIndex) -> List[tuple]:
+        """Group timestamped segments into ~PASSAGE_CHARS (start, end, text) passages."""
+        passages = []
+        first = 0
+        for i in range(len(index)):
+            last = i == len(index) - 1
+            if last or index.char_end[i] - index.char_start[first] >= self.PASSAGE_CHARS:
+                passages.append((
+                    index.start_ms[first] / 1000,
+                    index.end_ms[i] / 1000,
+                    index.text[index.char_start[first]:index.char_end[i]]
+                ))
+                first = i + 1
+        return passages
+
+    def close(self):
+        self._conn.close()
+
+
+def _format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    return f"{int(seconds // 3600):d}:{int(seconds % 3600 // 60):02d}:{int(seconds % 60):02d}"
+
+
+def _parse_time(value: str) -> float:
+    """Seconds from h:mm:ss, mm:ss or plain seconds."""
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def main():
+    """Command-line search over the local archive."""
+    import argparse
+
+    default_db = Path(__file__).parent.parent / "state" / "transcripts.db"
+
+    parser = argparse.ArgumentParser(description="Search archived transcripts")
+    parser.add_argument("--db", default=str(default_db))
+    sub = parser.add_subparsers(dest="command", required=True)
+    search_cmd = sub.add_parser("search", help="Full-text search")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--limit", type=int, default=20)
+    show_cmd = sub.add_parser("show", help="Print a full archived transcript")
+    show_cmd.add_argument("record_id")
+    locate_cmd = sub.add_parser("locate", help="Find when a quote was said")
+    locate_cmd.add_argument("record_id")
+    locate_cmd.add_argument("quote")
+    slice_cmd = sub.add_parser("slice", help="Print what was said between two times")
+    slice_cmd.add_argument("record_id")
+    slice_cmd.add_argument("start", type=_parse_time)
+    slice_cmd.add_argument("end", type=_parse_time)
+    args = parser.parse_args()
+
+    archive = TranscriptArchive(args.db)
+
+    if args.command == "search":
+        start = time.perf_counter()
+        hits = archive.search(args.query, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        for hit in hits:
+            print(f"{hit['record_id']}  [{_format_time(hit['start'])}]  {hit['title']}")
+            print(f"    {hit['snippet']}")
+        print(f"\n{len(hits)} hits in {elapsed:.1f}ms")
+    elif args.command in ("locate", "slice"):
+        index = archive.segment_index(args.record_id)
+        if index is None:
+            print(f"No timestamped transcript for {args.record_id}")
+            raise SystemExit(1)
+        if args.command == "slice":
+            print(index.slice(args.start, args.end))
+            return
+        found = index.locate(args.quote)
+        if found is None:
+            print("Quote not found in the transcript")
+            raise SystemExit(1)
+        print(f"[{_format_time(found[0])} - {_format_time(found[1])}]")
+    else:
+        record = archive.get(args.record_id)
+        if record is None:
+            print(f"No archived transcript for {args.record_id}")
+            raise SystemExit(1)
+        print(record["text"])
+
+
+if __name__ == "__main__":
+    main()
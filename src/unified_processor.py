@@ -3,61 +3,156 @@ Unified Content Processor
 Routes content to appropriate processor based on type and size.
 """
 
+import contextvars
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
 from pathlib import Path
-from typing import Dict
-from openai import OpenAI
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
+from circuit_breaker import CircuitOpen, breakers, is_outage
+from collection_expander import CollectionExpander, CollectionStore
 from content_router import ContentRouter
 from document_processor import DocumentProcessor
 from video_processor import VideoProcessor
+from openai_calls import OpenAICalls
 from audio_chunker import AudioChunker
+from progressive_transcriber import ProgressiveTranscriber
 from assemblyai_service import AssemblyAIService
+from assemblyai_jobs import AssemblyAIJobStore, TranscriptPoller
+from scratch_space import ScratchSpace
+from stage_deadlines import StageTimeout, deadlines
+from tempo_compressor import TempoCompressor
+from tracing import tracer
+from transcript_archive import TranscriptArchive
+from dedup_index import DedupIndex
+from record_profiler import RecordProfiler
+from salient_selector import SalientSelector
+from segment_index import SegmentIndex
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
+# Progress callback of the record being processed in this context
+_on_transcript: contextvars.ContextVar = contextvars.ContextVar("on_transcript", default=None)
+
 
 class UnifiedProcessor:
     """Unified processor that handles all content types."""
     
-    def __init__(self, download_dir: str = "./downloads"):
+    # Breaker guarding each transcription backend (Whisper, whole or chunked,
+    # is one OpenAI endpoint - failover is between OpenAI and AssemblyAI)
+    BACKEND_BREAKERS = {
+        "whisper": "openai.transcription",
+        "whisper-chunked": "openai.transcription",
+        "assemblyai": "assemblyai",
+    }
+    
+    def __init__(self, download_dir: str = "./downloads", state_dir: str = None):
         self.download_dir = Path(download_dir)
+        self.state_dir = Path(state_dir) if state_dir else self.download_dir.parent / "state"
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.scratch = ScratchSpace(root=str(self.download_dir), parked_dir=str(self.state_dir / "parked"))
         
         # Initialize all processors
         self.router = ContentRouter()
         self.doc_processor = DocumentProcessor()
         self.video_processor = VideoProcessor(download_dir=str(self.download_dir))
-        self.audio_chunker = AudioChunker(chunk_duration=1200)  # 20 min chunks
+        self.audio_chunker = AudioChunker(max_chunk_bytes=self.router.SMALL_FILE_LIMIT)
         self.assemblyai = AssemblyAIService()
-        self.openai_client = OpenAI()
+        
+        # Optional speed-up before transcription (TRANSCRIBE_TEMPO, off by default)
+        self.tempo = TempoCompressor(self.audio_chunker)
+        
+        # Transcribe early segments of long downloads while the rest arrives
+        self.progressive = os.getenv("PROGRESSIVE_TRANSCRIPTION", "false").lower() == "true"
+        self.progressive_transcriber = ProgressiveTranscriber(
+            self.video_processor.transcribe_segments, self.audio_chunker
+        )
+        
+        # Submitted AssemblyAI jobs survive restarts so we never pay twice
+        self.assemblyai_jobs = AssemblyAIJobStore(str(self.state_dir / "assemblyai_jobs.json"))
+        self.transcript_poller = TranscriptPoller(self.assemblyai)
+        self.url_passthrough = os.getenv("ASSEMBLYAI_URL_PASSTHROUGH", "false").lower() == "true"
+        
+        # Full transcripts are kept locally - Airtable only gets the first 10k chars
+        self.archive = TranscriptArchive(str(self.state_dir / "transcripts.db"))
+        
+        # Same episode from another URL reuses earlier results
+        self.dedup = DedupIndex(str(self.state_dir / "dedup.db"))
+        
+        # Opt-in via PROFILE_RECORD_IDS / PROFILE_SAMPLE_RATE
+        self.profiler = RecordProfiler(str(self.download_dir.parent / "logs" / "profiles"))
+        
+        # Only the most salient passages of long transcripts go into the insight prompt
+        self.selector = SalientSelector()
+        
+        # Playlists, channels and folders become child jobs, processed in parallel
+        self.expander = CollectionExpander()
+        self.collections = CollectionStore(str(self.state_dir / "collections.json"))
+        self.collection_workers = int(os.getenv("COLLECTION_WORKERS", "3"))
+        
+        # Status shown while insights are still being extracted. Off by
+        # default: writing a Status option the base doesn't have fails with a 422
+        self.transcribed_status = os.getenv("TRANSCRIBED_STATUS", "")
     
-    def process_content(self, url: str, record_id: str) -> Dict[str, str]:
+    @property
+    def openai_client(self) -> "OpenAI":
+        """Shared with VideoProcessor so the worker builds a single client."""
+        return self.video_processor.client
+    
+    @property
+    def openai_calls(self) -> OpenAICalls:
+        """Deadline/retry/hedge policy and latency stats for OpenAI requests."""
+        return self.video_processor.calls
+    
+    def process_content(self, url: str, record_id: str, title: str = "",
+                        on_transcript: Optional[Callable[[Dict], None]] = None) -> Dict[str, str]:
         """
         Process any type of content and extract insights.
         
         Args:
             url: URL or file path to content
             record_id: Airtable record ID
+            title: Content title (for the transcript archive)
+            on_transcript: Called with the transcription (and intermediate
+                           status) as soon as it exists, before insights
             
         Returns:
             Dict with transcription/text, quotes, philosophy, status
         """
+        token = _on_transcript.set(on_transcript)
+        try:
+            with self.profiler.profile(record_id):
+                return self._process_content(url, record_id, title)
+        finally:
+            _on_transcript.reset(token)
+    
+    def _process_content(self, url: str, record_id: str, title: str) -> Dict[str, str]:
+        """Detect, route and process content (see process_content)."""
         try:
             # Detect content type
-            content_type, metadata = self.router.detect_content_type(url)
+            with tracer.span("route") as span:
+                content_type, metadata = self.router.detect_content_type(url)
+                span.set(content_type=content_type, method=metadata.get('processing_method'))
             logger.info(f"Content type: {content_type}, Method: {metadata.get('processing_method')}")
             
             # Route to appropriate processor
             if content_type == 'document':
-                return self._process_document(url, metadata)
+                results = self._process_document(url, metadata)
             elif content_type == 'url':
-                return self._process_url(url, metadata)
+                results = self._process_url(url, metadata)
             elif content_type == 'video':
-                return self._process_media(url, record_id, metadata)
+                results = self._process_media(url, record_id, metadata)
+            elif content_type == 'collection':
+                raise ValueError("Playlists, channels and folders must go through process_collection")
             else:
                 raise ValueError(f"Unknown content type: {content_type}")
+            
+            self._archive_results(record_id, url, title, results)
+            return results
                 
         except Exception as e:
             logger.error(f"Error processing content: {e}")
@@ -66,23 +161,142 @@ class UnifiedProcessor:
                 "status": "Raw"
             }
     
+    def process_collection(self, url: str, record_id: str,
+                           create_children: Callable[[List[Dict]], List[Optional[str]]],
+                           on_child_done: Callable[[str, Dict], None],
+                           on_child_transcript: Optional[Callable[[str, Dict], None]] = None,
+                           table: Optional[str] = None) -> Dict[str, str]:
+        """
+        Expand a playlist, channel or folder into child jobs and process them in parallel.
+        
+        Entries expanded by an earlier run are skipped, so re-running a
+        channel only processes its new videos.
+        
+        Args:
+            url: Collection URL or local directory
+            record_id: Parent record ID
+            create_children: Creates child records from dicts with title,
+                             source and status, returning their IDs in order
+                             (None where creation failed)
+            on_child_done: Called with (child_id, results) as each child finishes
+            on_child_transcript: Called with (child_id, transcription fields) as
+                                 soon as a child's transcript exists
+            table: Name of the table the children are created in (so children
+                   left unfinished by a crash can be reset there)
+            
+        Returns:
+            Results for the parent record: a summary of the expansion
+        """
+        with tracer.span("expand", source=url) as span:
+            entries = self.expander.expand(url)
+            new = [e for e in entries if not self.collections.get(e['key'])]
+            span.set(entries=len(entries), new=len(new))
+        logger.info(f"📚 {len(new)} new entries ({len(entries) - len(new)} already processed)")
+        
+        child_ids = create_children([
+            {"title": e['title'], "source": e['url'], "status": "Processing"} for e in new
+        ]) if new else []
+        
+        jobs = []
+        for entry, child_id in zip(new, child_ids):
+            if child_id:
+                self.collections.put(entry['key'], record_id, child_id, entry['url'], table=table)
+                jobs.append((entry, child_id))
+        
+        succeeded = 0
+        with ThreadPoolExecutor(max_workers=self.collection_workers, thread_name_prefix="child") as pool:
+            futures = {pool.submit(tracer.wrap(self._process_child), entry, child_id, on_child_transcript): child_id
+                       for entry, child_id in jobs}
+            for future in as_completed(futures):
+                results = future.result()
+                succeeded += results.get("status") == "Extracted"
+                on_child_done(futures[future], results)
+                self.collections.mark_done([futures[future]])
+        
+        summary = (
+            f"Collection with {len(entries)} entries: {len(jobs)} new child records "
+            f"({succeeded} processed, {len(jobs) - succeeded} failed), "
+            f"{len(entries) - len(new)} already processed"
+        )
+        logger.info(f"✅ {summary}")
+        return {"transcription": summary, "status": "Extracted"}
+    
+    def _process_child(self, entry: Dict, child_id: str,
+                       on_transcript: Optional[Callable[[str, Dict], None]]) -> Dict[str, str]:
+        callback = (lambda fields: on_transcript(child_id, fields)) if on_transcript else None
+        with tracer.span("child", record_id=child_id, source=entry['url']):
+            return self.process_content(entry['url'], child_id, title=entry['title'], on_transcript=callback)
+    
+    def submit_transcription_jobs(self, records: List[Tuple[str, str]]) -> int:
+        """
+        Submit AssemblyAI jobs for all passthrough-eligible records up front,
+        so they transcribe concurrently while the worker handles other records.
+        
+        Args:
+            records: List of (record_id, url) pairs
+            
+        Returns:
+            Number of jobs submitted
+        """
+        submitted = 0
+        for record_id, url in records:
+            try:
+                if self.assemblyai_jobs.get(record_id) or not self._use_url_passthrough(url):
+                    continue
+                transcript_id = self.assemblyai.submit(url, detect_chapters=True)
+                self.assemblyai_jobs.put(record_id, transcript_id, url)
+                submitted += 1
+            except Exception as e:
+                # Record falls back to the normal path when processed
+                logger.warning(f"Could not submit {record_id} to AssemblyAI: {e}")
+        
+        if submitted:
+            logger.info(f"📤 Submitted {submitted} AssemblyAI jobs")
+        return submitted
+    
+    def _use_url_passthrough(self, url: str) -> bool:
+        """Direct media URLs too big for Whisper go straight to AssemblyAI."""
+        if not (self.url_passthrough and self.assemblyai.enabled and self.assemblyai.breaker.available):
+            return False
+        if not self.router.is_direct_media_url(url):
+            return False
+        return self.router.probe_url_size(url) > self.router.SMALL_FILE_LIMIT
+    
+    def _archive_results(self, record_id: str, url: str, title: str, results: Dict):
+        """Save the full transcript locally; never fails the record."""
+        try:
+            self.archive.store(
+                record_id,
+                results["transcription"],
+                title=title,
+                source=url,
+                chapters=results.get("chapters"),
+                speakers=results.get("speakers"),
+                segments=results.get("segments")
+            )
+        except Exception as e:
+            logger.warning(f"Could not archive transcript for {record_id}: {e}")
+    
     def _process_document(self, url: str, metadata: Dict) -> Dict[str, str]:
         """Process document (PDF, Word, Markdown, etc.)."""
         logger.info(f"Processing document: {url}")
         
         # Extract text
-        text = self.doc_processor.extract_text(url)
+        with tracer.span("extract_text", backend="document") as span:
+            text = self.doc_processor.extract_text(url)
+            span.set(chars=len(text or ""))
         
         if not text:
             raise ValueError("Could not extract text from document")
         
         logger.info(f"✅ Extracted text: {len(text)} characters")
+        self._publish_transcript(text)
         
         # Extract insights
         insights = self._extract_insights(text)
         
         return {
-            "transcription": text[:10000],  # Limit to first 10k chars for Airtable
+            "transcription": text,
             "key_quotes": insights["key_quotes"],
             "core_philosophy": insights["core_philosophy"],
             "status": "Extracted"
@@ -93,18 +307,21 @@ class UnifiedProcessor:
         logger.info(f"Processing web article: {url}")
         
         # Extract text from URL
-        text = self.doc_processor.extract_text(url)
+        with tracer.span("extract_text", backend="web") as span:
+            text = self.doc_processor.extract_text(url)
+            span.set(chars=len(text or ""))
         
         if not text:
             raise ValueError("Could not extract text from URL")
         
         logger.info(f"✅ Extracted text: {len(text)} characters")
+        self._publish_transcript(text)
         
         # Extract insights
         insights = self._extract_insights(text)
         
         return {
-            "transcription": text[:10000],
+            "transcription": text,
             "key_quotes": insights["key_quotes"],
             "core_philosophy": insights["core_philosophy"],
             "status": "Extracted"
@@ -112,64 +329,346 @@ class UnifiedProcessor:
     
     def _process_media(self, url: str, record_id: str, metadata: Dict) -> Dict[str, str]:
         """Process audio/video content."""
+        # Already submitted (this run or before a restart), or eligible to be
+        if self.assemblyai_jobs.get(record_id) or self._use_url_passthrough(url):
+            return self._process_remote_media(url, record_id)
+        
         method = metadata.get('processing_method')
+        parked = self.scratch.parked(record_id)
+        needs_download = method in ['yt-dlp', 'download_first'] and parked is None
         
-        # Download video first if needed
-        if method in ['yt-dlp', 'download_first']:
-            logger.info(f"Downloading media: {url}")
-            video_path = self.video_processor._download_video(url, record_id)
-            
-            # Check if it's audio-only
-            if self.video_processor._is_audio_file(video_path):
-                audio_path = video_path.with_suffix('.mp3')
-                video_path.rename(audio_path)
+        # Don't download anything that no backend could finish right now
+        self._check_backends()
+        
+        if needs_download and self._use_progressive(url):
+            try:
+                return self._process_progressive(url, record_id)
+            except StageTimeout as e:
+                # The regular path can step down to a smaller format
+                logger.warning(f"⏱️  Progressive {e} - falling back to a regular download")
+            except CircuitOpen as e:
+                # The regular path can fail over to AssemblyAI
+                logger.warning(f"⚡ Progressive {e} - falling back to a regular download")
+        
+        # Only probe when a budget is configured - probing costs a round trip
+        expected_size = 0
+        if needs_download and self.scratch.budget_bytes:
+            expected_size = self.video_processor.probe_download_size(url)
+        
+        # Scratch dir is removed on success and on failure
+        with self.scratch.reserve(expected_size, record_id=record_id), self.scratch.record_dir(record_id) as work_dir:
+            if parked is not None:
+                # Downloaded by an earlier attempt that hit a backend outage
+                logger.info(f"♻️  Reusing parked audio: {parked}")
+                audio_path = parked
+            elif needs_download:
+                logger.info(f"Downloading media: {url}")
+                video_path = self.video_processor._download_video(url, record_id, output_dir=work_dir)
+                
+                # Check if it's audio-only
+                if self.video_processor._is_audio_file(video_path):
+                    audio_path = video_path.with_suffix('.mp3')
+                    video_path.rename(audio_path)
+                else:
+                    audio_path = self.video_processor._extract_audio(video_path)
+                    video_path.unlink()  # Delete video after extracting audio
+                
+                logger.info(f"✅ Audio ready: {audio_path}")
             else:
-                audio_path = self.video_processor._extract_audio(video_path)
-                video_path.unlink()  # Delete video after extracting audio
+                # Local source file - never deleted, only read
+                audio_path = Path(metadata['path'])
             
-            logger.info(f"✅ Audio ready: {audio_path}")
-        else:
-            audio_path = Path(metadata['path'])
+            # Check for a re-upload of something already processed
+            fingerprint = None
+            if self.dedup.enabled:
+                fingerprint = self.dedup.audio_fingerprint(audio_path)
+                duplicate = self._reuse_duplicate(self.dedup.find_audio_match(fingerprint), record_id)
+                if duplicate:
+                    # Parked audio isn't needed any more either
+                    self.scratch.unpark(record_id)
+                    return duplicate
+            
+            # Speed up speech to cut upload size and billed minutes (after
+            # fingerprinting, which must see the original audio). The
+            # original is kept in case it has to be parked.
+            source_audio = audio_path
+            if self.tempo.enabled:
+                audio_path = self.tempo.compress(audio_path, work_dir)
+            
+            # Determine transcription method based on file size
+            file_size = audio_path.stat().st_size
+            duration = self.router.get_file_duration(audio_path)
+            
+            logger.info(f"File size: {file_size/(1024*1024):.1f}MB, Duration: {duration/60:.1f}min")
+            
+            # Routing (AssemblyAI for big or long content, chapters over 10
+            # minutes) follows the original recording, not the sped-up copy
+            source_size = source_audio.stat().st_size if self.tempo.enabled else file_size
+            source_duration = self.tempo.to_original(duration)
+            
+            try:
+                with tracer.span("transcribe", bytes=file_size, audio_seconds=duration,
+                                 tempo=self.tempo.factor) as span:
+                    transcription, timing = self._transcribe_with_failover(
+                        audio_path, work_dir, file_size, source_duration, span, source_size=source_size
+                    )
+            except Exception as e:
+                # Every backend is down: keep the audio so the retry skips the download
+                if (isinstance(e, CircuitOpen) or is_outage(e)) and (needs_download or parked):
+                    self.scratch.park(record_id, source_audio)
+                raise
+        
+        self.scratch.unpark(record_id)
+        return self._finish_media(record_id, transcription, fingerprint, timing)
+    
+    def _check_backends(self):
+        """
+        Fail fast while the insights endpoint or every transcription backend is down.
+        
+        Raises:
+            CircuitOpen: Naming the backend that blocks the record
+        """
+        chat = breakers.get("openai.chat")
+        if not chat.available:
+            raise CircuitOpen(chat.name, chat.retry_in())
+        
+        names = ["openai.transcription"] + (["assemblyai"] if self.assemblyai.enabled else [])
+        candidates = [breakers.get(name) for name in names]
+        if not any(b.available for b in candidates):
+            raise CircuitOpen("transcription", min(b.retry_in() for b in candidates))
+    
+    def _transcription_plan(self, file_size: int, duration: float,
+                            source_size: Optional[int] = None) -> List[str]:
+        """
+        Transcription backends in order of preference for this file.
         
-        # Determine transcription method based on file size
-        file_size = audio_path.stat().st_size
-        duration = self.router.get_file_duration(audio_path)
+        Args:
+            file_size: Bytes to upload (decides whether Whisper needs chunks)
+            duration: Length of the original recording in seconds
+            source_size: Bytes of the original recording, if the upload is a sped-up copy
+        """
+        whisper = "whisper-chunked" if file_size > self.router.SMALL_FILE_LIMIT else "whisper"
+        if not self.assemblyai.enabled:
+            return [whisper]
+        if self.router.should_use_assemblyai(source_size or file_size, duration):
+            return ["assemblyai", whisper]
+        return [whisper, "assemblyai"]
+    
+    def _transcribe_with_failover(self, audio_path: Path, work_dir: Path, file_size: int,
+                                  duration: float, span, source_size: Optional[int] = None) -> Tuple[str, Dict]:
+        """
+        Transcribe on the preferred backend, failing over to the next one
+        when a backend's breaker is open or it fails with an outage error.
         
-        logger.info(f"File size: {file_size/(1024*1024):.1f}MB, Duration: {duration/60:.1f}min")
+        Args:
+            file_size, duration, source_size: As for _transcription_plan
         
-        # Choose transcription method
-        if self.assemblyai.enabled and self.router.should_use_assemblyai(file_size, duration):
-            transcription = self._transcribe_with_assemblyai(audio_path, duration)
-        elif file_size > self.router.SMALL_FILE_LIMIT:
-            transcription = self._transcribe_with_chunking(audio_path)
+        Returns:
+            Tuple of (transcription, timing fields: segments, and chapters/speakers
+            from AssemblyAI)
+            
+        Raises:
+            CircuitOpen or the last outage error, when every backend is down
+        """
+        last_error = None
+        for backend in self._transcription_plan(file_size, duration, source_size):
+            breaker = breakers.get(self.BACKEND_BREAKERS[backend])
+            if not breaker.available:
+                logger.warning(f"⚡ Skipping {backend}: {breaker.name} circuit is open")
+                last_error = CircuitOpen(breaker.name, breaker.retry_in())
+                continue
+            
+            span.set(backend=backend)
+            try:
+                return self._transcribe_on(backend, audio_path, work_dir, duration)
+            except Exception as e:
+                if not (isinstance(e, CircuitOpen) or is_outage(e)):
+                    raise
+                logger.warning(f"⚡ {backend} unavailable ({e}) - failing over")
+                last_error = e
+        
+        raise last_error
+    
+    def _transcribe_on(self, backend: str, audio_path: Path, work_dir: Path,
+                       duration: float) -> Tuple[str, Dict]:
+        """Transcribe with one backend from the plan (duration of the original recording)."""
+        if backend == "assemblyai":
+            result = self._transcribe_with_assemblyai(audio_path, duration)
+            if self.tempo.enabled:
+                result = self.tempo.restore_timestamps(result)
+            return self._format_assemblyai_result(result), self._assemblyai_timing(result)
+        if backend == "whisper-chunked":
+            segments = self._transcribe_with_chunking(audio_path, work_dir)
         else:
-            transcription = self.video_processor._transcribe_audio(audio_path)
+            segments = self.video_processor.transcribe_segments(audio_path)
+        if self.tempo.enabled:
+            segments = segments.scaled(self.tempo.factor)
+        return segments.text, {"segments": segments}
+    
+    def _use_progressive(self, url: str) -> bool:
+        """Progressive mode covers the Whisper path; AssemblyAI takes whole files."""
+        if not self.progressive or not breakers.get("openai.transcription").available:
+            return False
+        if not self.assemblyai.enabled:
+            return True
+        info = self.video_processor.probe_media(url)
+        return not self.router.should_use_assemblyai(info['filesize'], info['duration'])
+    
+    def _process_progressive(self, url: str, record_id: str) -> Dict[str, str]:
+        """Download and transcribe concurrently, segment by segment."""
+        found = {"fingerprint": None, "duplicate": None}
+        
+        def check_duplicate(first_segment: Path) -> bool:
+            # The first segment covers the fingerprint window, so a re-upload
+            # is caught before the rest is downloaded
+            if not self.dedup.enabled:
+                return False
+            found["fingerprint"] = self.dedup.audio_fingerprint(first_segment)
+            found["duplicate"] = self._reuse_duplicate(self.dedup.find_audio_match(found["fingerprint"]), record_id)
+            return found["duplicate"] is not None
+        
+        expected_size = self.progressive_transcriber.scratch_bytes() if self.scratch.budget_bytes else 0
+        with self.scratch.reserve(expected_size, record_id=record_id), self.scratch.record_dir(record_id) as work_dir, \
+                tracer.span("transcribe", backend="whisper-progressive"):
+            segments = self.progressive_transcriber.run(url, work_dir, on_first_segment=check_duplicate)
+        
+        if segments is None:
+            return found["duplicate"]
         
+        return self._finish_media(record_id, segments.text, found["fingerprint"], {"segments": segments})
+    
+    def _finish_media(self, record_id: str, transcription: str, fingerprint,
+                      timing: Optional[Dict] = None) -> Dict[str, str]:
+        """Transcript dedup, insights and indexing shared by the local media paths."""
         logger.info(f"✅ Transcribed: {len(transcription)} characters")
         
+        signature = None
+        if self.dedup.enabled:
+            signature = self.dedup.minhash(transcription)
+            duplicate = self._reuse_duplicate(self.dedup.find_text_match(signature), record_id)
+            if duplicate:
+                return duplicate
+        
+        self._publish_transcript(transcription)
+        
         # Extract insights
         insights = self._extract_insights(transcription)
+        self._register_source(record_id, insights, fingerprint, signature)
+        
+        return {
+            "transcription": transcription,
+            "key_quotes": insights["key_quotes"],
+            "core_philosophy": insights["core_philosophy"],
+            "status": "Extracted",
+            **(timing or {})
+        }
+    
+    def _process_remote_media(self, url: str, record_id: str) -> Dict[str, str]:
+        """Transcribe a public media URL on AssemblyAI without downloading it."""
+        job = self.assemblyai_jobs.get(record_id)
+        if job is None:
+            transcript_id = self.assemblyai.submit(url, detect_chapters=True)
+            self.assemblyai_jobs.put(record_id, transcript_id, url)
+        else:
+            transcript_id = job['transcript_id']
+            logger.info(f"Resuming AssemblyAI job {transcript_id}")
+        
+        budget = deadlines.budget("transcribe")
+        try:
+            with tracer.span("transcribe", backend="assemblyai-url", transcript_id=transcript_id):
+                result = self.transcript_poller.track(transcript_id).result(timeout=budget)
+        except FutureTimeout:
+            # Stuck job - submit afresh on the next attempt
+            self.transcript_poller.untrack(transcript_id)
+            self.assemblyai_jobs.remove(record_id)
+            raise StageTimeout("transcribe", budget)
+        except Exception:
+            # Failed job - resubmit on the next attempt
+            self.assemblyai_jobs.remove(record_id)
+            raise
         
-        # Cleanup
-        if audio_path.exists():
-            audio_path.unlink()
+        transcription = self._format_assemblyai_result(result)
+        logger.info(f"✅ Transcribed: {len(transcription)} characters")
+        
+        signature = None
+        if self.dedup.enabled:
+            signature = self.dedup.minhash(transcription)
+            duplicate = self._reuse_duplicate(self.dedup.find_text_match(signature), record_id)
+            if duplicate:
+                self.assemblyai_jobs.remove(record_id)
+                return duplicate
+        
+        self._publish_transcript(transcription)
+        insights = self._extract_insights(transcription)
+        self._register_source(record_id, insights, None, signature)
+        
+        # Only forget the job once everything that needs it has succeeded
+        self.assemblyai_jobs.remove(record_id)
         
         return {
-            "transcription": transcription[:10000],
+            "transcription": transcription,
             "key_quotes": insights["key_quotes"],
             "core_philosophy": insights["core_philosophy"],
-            "status": "Extracted"
+            "status": "Extracted",
+            **self._assemblyai_timing(result)
+        }
+    
+    def _publish_transcript(self, transcription: str):
+        """Hand the transcript to the record's progress callback; never fails the record."""
+        callback = _on_transcript.get()
+        if callback is None:
+            return
+        fields = {"transcription": transcription}
+        if self.transcribed_status:
+            fields["status"] = self.transcribed_status
+        try:
+            callback(fields)
+        except Exception as e:
+            logger.warning(f"Could not publish transcript early: {e}")
+    
+    def _reuse_duplicate(self, match_id: Optional[str], record_id: str) -> Optional[Dict[str, str]]:
+        """Build results from an earlier record's archived transcript and insights."""
+        # A record reset to Raw matching itself is being deliberately re-run
+        if not match_id or match_id == record_id:
+            return None
+        
+        archived = self.archive.get(match_id)
+        insights = self.dedup.get_insights(match_id)
+        if archived is None or insights is None:
+            return None
+        
+        logger.info(f"♻️  Duplicate of {match_id} - reusing its results")
+        return {
+            "transcription": archived["text"],
+            "key_quotes": insights["key_quotes"],
+            "core_philosophy": insights["core_philosophy"],
+            "status": "Extracted",
+            "chapters": archived["chapters"],
+            "speakers": archived["speakers"],
+            "segments": self.archive.segment_index(match_id),
+            "duplicate_of": match_id
         }
     
-    def _transcribe_with_assemblyai(self, audio_path: Path, duration: float) -> str:
+    def _register_source(self, record_id: str, insights: Dict, fingerprint, signature):
+        """Add a newly processed source to the dedup index; never fails the record."""
+        if not self.dedup.enabled:
+            return
+        try:
+            self.dedup.register(record_id, insights, fingerprint=fingerprint, signature=signature)
+        except Exception as e:
+            logger.warning(f"Could not index {record_id} for dedup: {e}")
+    
+    def _transcribe_with_assemblyai(self, audio_path: Path, duration: float) -> Dict:
         """Transcribe using AssemblyAI (premium, with chapters)."""
         logger.info(f"Using AssemblyAI for {duration/60:.1f} minute audio")
         
         # Enable chapters for content over 10 minutes
         detect_chapters = duration > 600
         
-        result = self.assemblyai.transcribe(audio_path, detect_chapters=detect_chapters)
-        
+        return self.assemblyai.transcribe(audio_path, detect_chapters=detect_chapters)
+    
+    def _format_assemblyai_result(self, result: Dict) -> str:
+        """Flatten an AssemblyAI result into transcription text."""
         # If chapters detected, include them in transcription
         if result.get('chapters'):
             chapters_text = self.assemblyai.format_chapters_for_airtable(result['chapters'])
@@ -177,13 +676,22 @@ class UnifiedProcessor:
         
         return result['text']
     
-    def _transcribe_with_chunking(self, audio_path: Path) -> str:
-        """Transcribe large file by chunking."""
+    def _assemblyai_timing(self, result: Dict) -> Dict:
+        """Chapters, speakers and the segment index of an AssemblyAI result."""
+        return {
+            "chapters": result['chapters'],
+            "speakers": result['speakers'],
+            "segments": SegmentIndex.from_segments(result['text'], result.get('segments') or [], result['duration'] or 0.0)
+        }
+    
+    def _transcribe_with_chunking(self, audio_path: Path, work_dir: Path) -> SegmentIndex:
+        """Transcribe large file by chunking, keeping timestamps on the whole file's timeline."""
         logger.info("Using chunk & stitch method")
         
-        # Create chunks directory
-        chunks_dir = audio_path.parent / f"{audio_path.stem}_chunks"
+        # Chunks live in the record's scratch dir, which is removed afterwards
+        chunks_dir = work_dir / "chunks"
         chunks_dir.mkdir(exist_ok=True)
+        chunks = []
         
         try:
             # Split audio
@@ -193,29 +701,39 @@ class UnifiedProcessor:
             transcriptions = []
             for i, chunk in enumerate(chunks, 1):
                 logger.info(f"Transcribing chunk {i}/{len(chunks)}")
-                text = self.video_processor._transcribe_audio(chunk)
-                transcriptions.append(text)
+                with tracer.span("chunk", index=i, bytes=chunk.stat().st_size):
+                    segments = self.video_processor.transcribe_segments(chunk)
+                transcriptions.append(segments)
             
-            # Stitch together
-            full_transcription = self.audio_chunker.stitch_transcriptions(transcriptions)
-            
-            return full_transcription
+            # Stitch together, shifting each chunk's timestamps by its offset
+            return self.audio_chunker.stitch_segments(transcriptions)
             
         finally:
-            # Cleanup chunks
+            # Free chunk space early - the scratch dir itself goes on exit
             self.audio_chunker.cleanup_chunks(chunks)
-            if chunks_dir.exists():
-                chunks_dir.rmdir()
     
     def _extract_insights(self, text: str) -> Dict[str, str]:
         """Extract insights using AI (same as video_processor)."""
+        request = self.build_insight_request(text)
+        with tracer.span("insights", chars=len(text), prompt_chars=len(request["messages"][1]["content"])):
+            response = self.openai_calls.call("chat", lambda client: client.chat.completions.create(**request))
+        
+        return self.parse_insights(response.choices[0].message.content)
+    
+    def build_insight_request(self, text: str) -> Dict:
+        """
+        Chat completion arguments for insight extraction.
+        
+        Shared with the Batch API backfill so both always use the same prompt.
+        Long text is cut down to its most salient spans first.
+        """
         prompt = f"""Analyze this poker content and extract:
 
 1. KEY QUOTES: 5-7 memorable, tweetable quotes (each under 280 chars)
 2. CORE PHILOSOPHY: The main poker philosophy or strategy being taught (3-4 sentences)
 
 Content:
-{text[:15000]}  
+{self.selector.select(text)}
 
 Format your response as:
 
@@ -228,19 +746,18 @@ CORE PHILOSOPHY:
 [3-4 sentence summary]
 """
         
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
+        return {
+            "model": "gpt-4.1-mini",
+            "messages": [
                 {"role": "system", "content": "You are a poker strategy expert who extracts key insights from poker content."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7,
-            max_tokens=800
-        )
-        
-        content = response.choices[0].message.content
-        
-        # Parse response
+            "temperature": 0.7,
+            "max_tokens": 800
+        }
+    
+    def parse_insights(self, content: str) -> Dict[str, str]:
+        """Split a model response into key quotes and core philosophy."""
         parts = content.split("CORE PHILOSOPHY:")
         quotes_section = parts[0].replace("KEY QUOTES:", "").strip()
         philosophy_section = parts[1].strip() if len(parts) > 1 else ""
@@ -4,24 +4,92 @@ Downloads videos, extracts audio, transcribes, and extracts poker insights.
 """
 
 import os
-import subprocess
 import tempfile
+import time
 import logging
 from pathlib import Path
-from typing import Dict, Optional
-import yt_dlp
-from openai import OpenAI
+from typing import TYPE_CHECKING, Dict, Optional
+
+from circuit_breaker import breakers, is_outage
+from stage_deadlines import StageTimeout, deadlines, remove_partial
+from openai_calls import OpenAICalls
+from salient_selector import SalientSelector
+from segment_index import SegmentIndex
+from credential_pool import Credential, CredentialPool
+from http_clients import registry
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
+# yt-dlp errors that mean the site is throttling or blocking us, or the
+# network is down - not that one video is private, removed or region-locked
+YTDLP_OUTAGE_MARKERS = (
+    "HTTP Error 429", "HTTP Error 5", "timed out", "Connection reset",
+    "Temporary failure in name resolution", "confirm you're not a bot",
+)
+
+
+def _is_download_outage(error: Exception) -> bool:
+    # Our own time limit is handled by stepping down a format
+    if isinstance(error, StageTimeout):
+        return False
+    return is_outage(error) or any(marker in str(error) for marker in YTDLP_OUTAGE_MARKERS)
+
 
 class VideoProcessor:
     """Handles video download, transcription, and insight extraction."""
     
+    # Tried in order when a download runs out of time - audio is all we need,
+    # so each step down is a smaller download
+    DOWNLOAD_FORMATS = ['best[ext=mp4]/best', 'bestaudio[ext=m4a]/bestaudio/best', 'worstaudio/worst']
+    
+    # A stalled connection errors out (and is retried by yt-dlp) after this
+    SOCKET_TIMEOUT = 30
+    
     def __init__(self, download_dir: str = "./downloads"):
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
-        self.client = OpenAI()  # Uses OPENAI_API_KEY from environment
+        
+        # One client per key (OPENAI_API_KEYS, or OPENAI_API_KEY)
+        self.keys = CredentialPool.from_env("OPENAI")
+        self._clients: Dict[Optional[str], "OpenAI"] = {}
+        
+        # Deadlines, retries, hedging and latency stats for every OpenAI request
+        self.calls = OpenAICalls(self.keys, self.client_for)
+        
+        # Long transcripts are cut down to their most salient spans for insights
+        self.selector = SalientSelector()
+        
+        # Opens while downloads are being throttled or blocked
+        self.download_breaker = breakers.get("yt-dlp", is_failure=_is_download_outage)
+    
+    @property
+    def client(self) -> "OpenAI":
+        """OpenAI client for the first key, for callers that don't go through the pool."""
+        return self.client_for(self.keys.primary)
+    
+    def client_for(self, credential: Optional[Credential]) -> "OpenAI":
+        """OpenAI client for a pooled key, built on first use (openai is slow to import)."""
+        key_id = credential.id if credential else None
+        if key_id not in self._clients:
+            from openai import OpenAI, DefaultHttpxClient
+            
+            if credential is None:
+                self._clients[key_id] = OpenAI()  # Raises the usual missing-key error
+            else:
+                # All keys share one connection pool; each key's responses
+                # report rate-limit headers back to the credential pool
+                self._clients[key_id] = OpenAI(
+                    api_key=credential.key,
+                    http_client=DefaultHttpxClient(
+                        transport=registry.httpx_transport("openai"),
+                        event_hooks={"response": [self.keys.httpx_hook(credential)]}
+                    )
+                )
+        return self._clients[key_id]
         
     def process_video(self, video_url: str, record_id: str) -> Dict[str, str]:
         """
@@ -77,21 +145,102 @@ class VideoProcessor:
                 "status": "Raw"
             }
     
-    def _download_video(self, url: str, record_id: str) -> Path:
-        """Download video using yt-dlp."""
-        output_path = self.download_dir / f"{record_id}.mp4"
+    def probe_download_size(self, url: str) -> int:
+        """
+        Estimate download size in bytes without downloading.
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Size in bytes, or 0 if it cannot be determined
+        """
+        return self.probe_media(url)['filesize']
+    
+    def probe_media(self, url: str) -> Dict[str, float]:
+        """
+        Look up download size and duration without downloading.
+        
+        Args:
+            url: Video URL
+            
+        Returns:
+            Dict with filesize (bytes) and duration (seconds), 0 when unknown
+        """
+        import yt_dlp
+        
+        try:
+            ydl_opts = {
+                'format': 'best[ext=mp4]/best',
+                'quiet': True,
+                'no_warnings': True,
+                'socket_timeout': self.SOCKET_TIMEOUT,
+                'noplaylist': True,  # A watch URL with &list= is still one video
+            }
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+            return {
+                'filesize': int(info.get('filesize') or info.get('filesize_approx') or 0),
+                'duration': float(info.get('duration') or 0)
+            }
+        except Exception as e:
+            logger.warning(f"Could not probe media: {e}")
+            return {'filesize': 0, 'duration': 0}
+    
+    def _download_video(self, url: str, record_id: str, output_dir: Optional[Path] = None) -> Path:
+        """Download video using yt-dlp, stepping down in quality if it runs out of time."""
+        output_path = (output_dir or self.download_dir) / f"{record_id}.mp4"
+        
+        for i, fmt in enumerate(self.DOWNLOAD_FORMATS):
+            try:
+                with tracer.span("download", format=fmt) as span:
+                    self.download_breaker.call(self._download_format, url, output_path, fmt)
+                    span.set(bytes=output_path.stat().st_size)
+                return output_path
+            except StageTimeout as e:
+                remove_partial([output_path])
+                if i == len(self.DOWNLOAD_FORMATS) - 1:
+                    raise
+                logger.warning(f"⏱️  {e} - retrying with format '{self.DOWNLOAD_FORMATS[i + 1]}'")
+    
+    def _download_format(self, url: str, output_path: Path, fmt: str):
+        """Download one format, giving up once the download budget for its duration runs out."""
+        import yt_dlp
+        
+        start = time.monotonic()
+        timed_out = []
+        
+        def check_deadline(progress):
+            # Runs on every progress update, so a slow trickle is caught too
+            duration = (progress.get('info_dict') or {}).get('duration') or 0
+            if not duration:
+                # Direct links and Drive files report no duration - estimate it
+                # from the size, as for files ffprobe can't read
+                size = progress.get('total_bytes') or progress.get('total_bytes_estimate') or 0
+                duration = size / deadlines.FALLBACK_BYTES_PER_SECOND
+            budget = deadlines.budget("download", duration)
+            if time.monotonic() - start > budget:
+                timed_out.append(budget)
+                raise StageTimeout("download", budget)
         
         ydl_opts = {
-            'format': 'best[ext=mp4]/best',
+            'format': fmt,
             'outtmpl': str(output_path),
             'quiet': True,
             'no_warnings': True,
+            'socket_timeout': self.SOCKET_TIMEOUT,
+            'noplaylist': True,  # Playlists are expanded into child jobs instead
+            'progress_hooks': [check_deadline],
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        return output_path
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+        except Exception:
+            # yt-dlp may wrap the hook's exception in a DownloadError
+            if timed_out:
+                raise StageTimeout("download", timed_out[0])
+            raise
     
     def _is_audio_file(self, file_path: Path) -> bool:
         """Check if file is audio-only (no video stream)."""
@@ -104,7 +253,7 @@ class VideoProcessor:
             str(file_path)
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = deadlines.run("probe", cmd, capture_output=True, text=True)
         return result.stdout.strip() == ''  # No video stream = audio only
     
     def _extract_audio(self, video_path: Path) -> Path:
@@ -121,18 +270,40 @@ class VideoProcessor:
             str(audio_path)
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
+        deadlines.run("extract_audio", cmd, media_seconds=deadlines.media_seconds(video_path),
+                      outputs=[audio_path], check=True, capture_output=True)
         return audio_path
     
     def _transcribe_audio(self, audio_path: Path) -> str:
         """Transcribe audio using OpenAI Whisper."""
-        with open(audio_path, 'rb') as audio_file:
-            transcript = self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
-        return transcript
+        return self.transcribe_segments(audio_path).text
+    
+    def transcribe_segments(self, audio_path: Path) -> SegmentIndex:
+        """
+        Transcribe audio using OpenAI Whisper, keeping segment timestamps.
+        
+        Args:
+            audio_path: Audio file under the upload limit
+            
+        Returns:
+            SegmentIndex over the transcription (times relative to the file)
+        """
+        def request(client):
+            # Opened per attempt - a hedged duplicate needs its own file handle
+            with open(audio_path, 'rb') as audio_file:
+                return client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=audio_file,
+                    response_format="verbose_json"
+                )
+        
+        size_mb = audio_path.stat().st_size / (1024 * 1024)
+        response = self.calls.call("transcription", request, units=size_mb)
+        segments = [
+            {"start": s.start, "end": s.end, "text": s.text}
+            for s in response.segments or []
+        ]
+        return SegmentIndex.from_segments(response.text, segments, duration=float(response.duration or 0))
     
     def _extract_insights(self, transcription: str) -> Dict[str, str]:
         """Extract poker insights using AI."""
@@ -143,7 +314,7 @@ class VideoProcessor:
 2. CORE PHILOSOPHY: The main poker philosophy or strategy being taught (2-3 sentences)
 
 Transcription:
-{transcription}
+{self.selector.select(transcription)}
 
 Format your response as:
 
@@ -156,7 +327,7 @@ CORE PHILOSOPHY:
 [2-3 sentence summary]
 """
         
-        response = self.client.chat.completions.create(
+        response = self.calls.call("chat", lambda client: client.chat.completions.create(
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are a poker strategy expert who extracts key insights from poker content."},
@@ -164,7 +335,7 @@ CORE PHILOSOPHY:
             ],
             temperature=0.7,
             max_tokens=500
-        )
+        ))
         
         content = response.choices[0].message.content
         
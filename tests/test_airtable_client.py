@@ -0,0 +1,38 @@
+from airtable_client import AirtableClient
+
+
+def make_client(**kwargs):
+    return AirtableClient(api_key="key", base_id="app123", table_id="tbl123", **kwargs)
+
+
+def test_philosophy_wins_shared_column_whatever_the_key_order():
+    # Same key order as IngestResults.unsynced() rows
+    row = {
+        "record_id": "ingest-1",
+        "source": "/videos/a.mp4",
+        "title": "A",
+        "key_quotes": "Q",
+        "core_philosophy": "PHILOSOPHY",
+        "transcription": "TRANSCRIPT",
+        "status": "Extracted",
+    }
+
+    assert make_client()._map_fields(row) == {
+        "Key Quotes": "Q",
+        "Core Philosophy": "PHILOSOPHY",
+        "Status": "Extracted",
+    }
+
+
+def test_transcription_written_when_alone():
+    fields = make_client()._map_fields({"transcription": "TRANSCRIPT", "status": "Transcribed"})
+
+    assert fields == {"Core Philosophy": "TRANSCRIPT", "Status": "Transcribed"}
+
+
+def test_separate_transcription_column_keeps_both():
+    client = make_client(fields={"transcription": "Transcript"})
+
+    fields = client._map_fields({"core_philosophy": "PHILOSOPHY", "transcription": "TRANSCRIPT"})
+
+    assert fields == {"Core Philosophy": "PHILOSOPHY", "Transcript": "TRANSCRIPT"}
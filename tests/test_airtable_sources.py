@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from airtable_sources import load_sources
+
+
+def test_empty_source_list_is_rejected(tmp_path):
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps({"workers": 2, "sources": []}))
+
+    with pytest.raises(ValueError, match="no sources"):
+        load_sources(str(path))
+
+
+def test_sources_file_builds_a_client_per_table(tmp_path, monkeypatch):
+    monkeypatch.setenv("AIRTABLE_API_KEY", "key")
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps({"sources": [
+        {"name": "cash", "base_id": "app1", "table_id": "tbl1", "weight": 2},
+        {"base_id": "app2", "table_id": "tbl2"},
+    ]}))
+
+    sources, workers = load_sources(str(path))
+
+    assert [(s["name"], s["weight"]) for s in sources] == [("cash", 2.0), ("source2", 1.0)]
+    assert workers == 2
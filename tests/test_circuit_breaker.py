@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, is_outage
+
+
+class Outage(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def fail(error):
+    def fn():
+        raise error
+    return fn
+
+
+def breaker(**kwargs):
+    options = dict(failure_rate=0.5, min_calls=4, window=10, cooldown=0.05)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_outage_classification():
+    assert is_outage(Outage())
+    assert is_outage(TimeoutError())
+    assert not is_outage(BadRequest())
+    assert not is_outage(ValueError())
+    assert not is_outage(CircuitOpen("x", 1))
+
+
+def test_stays_closed_below_min_calls():
+    b = breaker()
+    for _ in range(3):
+        with pytest.raises(Outage):
+            b.call(fail(Outage()))
+    assert b.state == CLOSED
+
+
+def test_opens_at_failure_rate_and_fails_fast():
+    b = breaker()
+    b.call(lambda: "ok")
+    b.call(lambda: "ok")
+    for _ in range(2):
+        with pytest.raises(Outage):
+            b.call(fail(Outage()))
+
+    assert b.state == OPEN
+    calls = []
+    with pytest.raises(CircuitOpen):
+        b.call(lambda: calls.append(1))
+    assert calls == []
+
+
+def test_bad_requests_count_as_success():
+    b = breaker()
+    for _ in range(6):
+        with pytest.raises(BadRequest):
+            b.call(fail(BadRequest()))
+    assert b.state == CLOSED
+
+
+def open_breaker(b):
+    for _ in range(b.min_calls):
+        with pytest.raises(Outage):
+            b.call(fail(Outage()))
+    assert b.state == OPEN
+
+
+def test_one_probe_after_cooldown_closes_on_success():
+    b = breaker()
+    open_breaker(b)
+    time.sleep(0.06)
+
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    # Only one probe at a time
+    assert not b.allow()
+    b.record_success()
+    assert b.state == CLOSED
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    b = breaker()
+    open_breaker(b)
+    time.sleep(0.06)
+
+    with pytest.raises(Outage):
+        b.call(fail(Outage()))
+    assert b.state == OPEN
+    assert b.times_opened == 2
+    assert b.retry_in() > 0.05
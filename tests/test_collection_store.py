@@ -0,0 +1,31 @@
+import json
+
+from collection_expander import CollectionStore
+
+
+def test_children_unfinished_until_marked_done(tmp_path):
+    store = CollectionStore(str(tmp_path / "collections.json"))
+    store.put("yt:a", "recParent", "recA", "https://youtu.be/a", table="cash")
+    store.put("yt:b", "recParent", "recB", "https://youtu.be/b", table="cash")
+
+    store.mark_done(["recA"])
+
+    assert [e["child_id"] for e in store.unfinished()] == ["recB"]
+    assert store.unfinished()[0]["table"] == "cash"
+    # Still known, so a re-run of the collection doesn't create another child
+    assert store.get("yt:a")["child_id"] == "recA"
+
+
+def test_state_survives_restart(tmp_path):
+    path = tmp_path / "collections.json"
+    store = CollectionStore(str(path))
+    store.put("yt:a", "recParent", "recA", "https://youtu.be/a")
+
+    assert [e["child_id"] for e in CollectionStore(str(path)).unfinished()] == ["recA"]
+
+
+def test_entries_without_done_flag_count_as_finished(tmp_path):
+    path = tmp_path / "collections.json"
+    path.write_text(json.dumps({"yt:a": {"parent_id": "p", "child_id": "recA", "source": "u", "expanded_at": 0}}))
+
+    assert CollectionStore(str(path)).unfinished() == []
@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+from dedup_index import DedupIndex
+
+WORDS = ("river turn fold bluff raise call check pot equity range villain hero stack "
+         "blind button flop board draw nuts value thin bet size sizing").split()
+
+
+def transcript(seed, length=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def edit(text, share, seed=0):
+    """Replace roughly `share` of the words."""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) if rng.random() < share else w for w in text.split())
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DedupIndex(str(tmp_path / "dedup.sqlite"))
+
+
+def test_short_text_has_no_signature(index):
+    assert index.minhash("too short to compare") is None
+
+
+def test_signature_is_stable_across_instances(index, tmp_path):
+    other = DedupIndex(str(tmp_path / "other.sqlite"))
+    text = transcript(1)
+    assert np.array_equal(index.minhash(text), other.minhash(text))
+
+
+def test_near_identical_transcript_matches(index):
+    original = transcript(1)
+    index.register("recA", {"key_quotes": "q"}, signature=index.minhash(original))
+
+    assert index.find_text_match(index.minhash(edit(original, 0.01))) == "recA"
+
+
+def test_different_transcript_does_not_match(index):
+    index.register("recA", {}, signature=index.minhash(transcript(1)))
+
+    assert index.find_text_match(index.minhash(transcript(2))) is None
+
+
+def test_threshold_rejects_loosely_similar_transcripts(index):
+    original = transcript(1)
+    index.register("recA", {}, signature=index.minhash(original))
+    signature = index.minhash(edit(original, 0.02))
+
+    # Still an LSH candidate at the default threshold, but not at a strict one
+    assert index.find_text_match(signature) == "recA"
+    index.text_threshold = 0.95
+    assert index.find_text_match(signature) is None
+
+
+def fingerprint(seed, length=2000):
+    return np.random.default_rng(seed).integers(1, 2 ** 32 - 1, size=length, dtype=np.uint64).astype(np.uint32)
+
+
+def flip_bits(fp, rate, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.random((len(fp), 32)) < rate
+    mask = (noise.astype(np.uint64) @ (1 << np.arange(32, dtype=np.uint64))).astype(np.uint32)
+    return fp ^ mask
+
+
+def test_audio_matches_at_an_offset(index):
+    stored = fingerprint(1)
+    index.register("recA", {}, fingerprint=stored)
+
+    # A re-upload with 100 extra frames of intro, and a few noisy sub-fingerprints
+    query = np.concatenate([fingerprint(2, 100), stored[:1500]])
+    query[200:260] = flip_bits(query[200:260], 0.2)
+
+    assert index.find_audio_match(query) == "recA"
+
+
+def test_bit_error_rate_aligns_on_offset(index):
+    stored = fingerprint(1)
+    query = stored[50:450]
+
+    assert index._bit_error_rate(query, stored, 50) == 0.0
+    assert index._bit_error_rate(query, stored, 51) == pytest.approx(0.5, abs=0.05)
+    assert index._bit_error_rate(query, stored, 5000) == 1.0
+
+
+def test_unrelated_audio_does_not_match(index):
+    index.register("recA", {}, fingerprint=fingerprint(1))
+
+    assert index.find_audio_match(fingerprint(2)) is None
+
+
+def test_silence_is_never_indexed(index):
+    silence = np.zeros(800, dtype=np.uint32)
+    index.register("recA", {}, fingerprint=silence)
+
+    assert index.find_audio_match(silence) is None
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from ffmpeg_executor import BACKGROUND, INTERACTIVE, NORMAL, FfmpegExecutor
+
+
+def test_threads_split_cpus_between_jobs():
+    executor = FfmpegExecutor(cpus=8, max_jobs=2)
+
+    assert executor.threads == 4
+    assert executor.with_threads(["ffmpeg", "-i", "in.wav", "out.mp3"]) == [
+        "ffmpeg", "-filter_threads", "4", "-i", "in.wav", "-threads", "4", "out.mp3"
+    ]
+    # Other tools and commands that set their own threads are left alone
+    assert executor.with_threads(["ffprobe", "in.wav"]) == ["ffprobe", "in.wav"]
+    assert executor.with_threads(["ffmpeg", "-threads", "1", "out"]) == ["ffmpeg", "-threads", "1", "out"]
+
+
+def test_fractional_quota_still_gets_one_job():
+    executor = FfmpegExecutor(cpus=0.5)
+
+    assert (executor.max_jobs, executor.threads) == (1, 1)
+
+
+def test_waiters_run_by_priority_then_arrival():
+    executor = FfmpegExecutor(cpus=1, max_jobs=1)
+    order = []
+    waiting = []
+
+    def job(name, priority):
+        with executor.slot(priority):
+            order.append(name)
+
+    with executor.slot(NORMAL):
+        for name, priority in [("split", BACKGROUND), ("tempo", NORMAL),
+                               ("fingerprint", INTERACTIVE), ("extract", NORMAL)]:
+            thread = threading.Thread(target=job, args=(name, priority))
+            thread.start()
+            waiting.append(thread)
+            # Wait until the job is queued so arrival order is fixed
+            while len(executor._waiting) < len(waiting):
+                time.sleep(0.001)
+
+    for thread in waiting:
+        thread.join(5)
+    assert order == ["fingerprint", "tempo", "extract", "split"]
+
+
+def test_slots_limit_concurrent_jobs():
+    executor = FfmpegExecutor(cpus=2, max_jobs=2)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job():
+        with executor.slot():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=job) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak[0] == 2
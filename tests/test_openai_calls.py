@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+import openai_calls
+from circuit_breaker import CircuitBreakers
+from credential_pool import CredentialPool
+from openai_calls import DeadlineExceeded, OpenAICalls
+
+
+class APIError(Exception):
+    def __init__(self, status_code=None, code=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.code = code
+
+
+class FakeClient:
+    def __init__(self, credential):
+        self.credential = credential
+
+    def with_options(self, **options):
+        return self
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(openai_calls, "breakers", CircuitBreakers())
+
+
+def make_calls(monkeypatch, keys=("k1",), hedge=False):
+    if hedge:
+        monkeypatch.setenv("OPENAI_HEDGE_ENDPOINTS", "chat")
+    calls = OpenAICalls(CredentialPool("openai", list(keys)), FakeClient)
+    calls.BACKOFF_BASE = 0.0
+    return calls
+
+
+def test_transient_errors_are_retried(monkeypatch):
+    calls = make_calls(monkeypatch)
+    outcomes = [APIError(500), APIError(429), "ok"]
+
+    def request(client):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert calls.call("chat", request) == "ok"
+    assert outcomes == []
+
+
+def test_bad_requests_are_not_retried(monkeypatch):
+    calls = make_calls(monkeypatch)
+    attempts = []
+
+    def request(client):
+        attempts.append(client)
+        raise APIError(400)
+
+    with pytest.raises(APIError):
+        calls.call("chat", request)
+    assert len(attempts) == 1
+
+
+def test_quota_error_moves_to_another_key(monkeypatch):
+    calls = make_calls(monkeypatch, keys=("k1", "k2"))
+    used = []
+
+    def request(client):
+        used.append(client.credential.label)
+        if len(used) == 1:
+            raise APIError(429, code="insufficient_quota")
+        return "ok"
+
+    assert calls.call("chat", request) == "ok"
+    assert used[0] != used[1]
+    assert calls.pool.available() == 1
+
+
+def test_quota_error_without_spare_key_fails(monkeypatch):
+    calls = make_calls(monkeypatch)
+
+    def request(client):
+        raise APIError(429, code="insufficient_quota")
+
+    with pytest.raises(APIError):
+        calls.call("chat", request)
+
+
+def test_no_hedge_before_enough_samples(monkeypatch):
+    calls = make_calls(monkeypatch, hedge=True)
+    for _ in range(calls.MIN_HEDGE_SAMPLES - 1):
+        calls.latency.record("chat", 0.01)
+
+    assert calls._hedge_delay("chat", 1.0) is None
+    calls.latency.record("chat", 0.01)
+    assert calls._hedge_delay("chat", 2.0) == pytest.approx(0.02)
+
+
+def test_slow_request_is_hedged_and_hedge_wins(monkeypatch):
+    calls = make_calls(monkeypatch, hedge=True)
+    for _ in range(calls.MIN_HEDGE_SAMPLES):
+        calls.latency.record("chat", 0.01)
+    release = threading.Event()
+    sent = []
+
+    def request(client):
+        sent.append(client)
+        if len(sent) == 1:
+            release.wait(5)
+            return "primary"
+        return "hedge"
+
+    try:
+        assert calls.call("chat", request) == "hedge"
+    finally:
+        release.set()
+    assert (calls.hedges_sent, calls.hedges_won) == (1, 1)
+
+
+def test_waiting_for_a_key_is_bounded_by_the_deadline(monkeypatch):
+    monkeypatch.setenv("OPENAI_CHAT_DEADLINE_SECONDS", "0.2")
+    calls = make_calls(monkeypatch)
+    calls.pool.mark_limited(calls.pool.primary, 60)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        calls.call("chat", lambda client: "never sent")
+    assert time.monotonic() - start < 1
@@ -0,0 +1,43 @@
+import json
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+
+from record_profiler import RecordProfiler
+from tracing import tracer
+
+
+def pool_work():
+    return sum(i * i for i in range(10000))
+
+
+def unrelated_work():
+    return sum(range(10000))
+
+
+def test_pool_threads_are_merged_into_the_bundle(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_RECORD_IDS", "recA")
+    profiler = RecordProfiler(str(tmp_path))
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with profiler.profile("recA"):
+            futures = [pool.submit(tracer.wrap(pool_work)) for _ in range(2)]
+            # Another record's work, submitted without this record's context
+            pool.submit(unrelated_work).result()
+            assert [f.result() for f in futures]
+
+    bundle = next(tmp_path.iterdir())
+    functions = {name for _, _, name in pstats.Stats(str(bundle / "cpu.pstats")).stats}
+    assert "pool_work" in functions
+    assert "unrelated_work" not in functions
+    assert json.loads((bundle / "summary.json").read_text())["profiled_threads"] >= 2
+
+
+def test_unselected_record_is_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.delenv("PROFILE_RECORD_IDS", raising=False)
+    monkeypatch.delenv("PROFILE_SAMPLE_RATE", raising=False)
+    profiler = RecordProfiler(str(tmp_path))
+
+    with profiler.profile("recB"):
+        tracer.wrap(pool_work)()
+
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,76 @@
+import numpy as np
+
+from salient_selector import CHAPTERS_MARKER, CHARS_PER_TOKEN, SalientSelector
+
+BANTER = "Thanks everyone for tuning in today and say hi in the chat while we get going."
+STRATEGY = "On the river we bluff with blockers because villain's range is capped and folds to an overbet."
+
+
+def transcript(parts=40, strategy_every=5):
+    sentences = []
+    for i in range(parts):
+        sentences.append(f"{STRATEGY} Spot {i}." if i % strategy_every == 0 else f"{BANTER} Part {i}.")
+    return " ".join(sentences)
+
+
+def test_text_within_budget_is_unchanged():
+    selector = SalientSelector(budget_tokens=1000)
+    text = transcript(parts=3)
+
+    assert selector.select(text) == text
+
+
+def test_zero_budget_keeps_everything():
+    text = transcript(parts=200)
+
+    assert SalientSelector(budget_tokens=0).select(text) == text
+
+
+def test_selection_fits_budget():
+    selector = SalientSelector(budget_tokens=150)
+
+    selected = selector.select(transcript())
+
+    assert len(selected) <= 150 * CHARS_PER_TOKEN + len("\n...") * selector.SECTIONS
+
+
+def test_spans_keep_original_order_and_mark_gaps():
+    selector = SalientSelector(budget_tokens=150)
+    text = transcript()
+
+    selected = selector.select(text)
+
+    pieces = [p for p in selected.split("\n") if p != "..."]
+    positions = [text.index(p) for p in pieces]
+    assert positions == sorted(positions)
+    assert "..." in selected.split("\n")
+
+
+def test_poker_talk_outranks_banter():
+    selector = SalientSelector()
+    spans = [BANTER, STRATEGY, BANTER + " Part two.", STRATEGY + " Again."]
+
+    scores = selector.score(spans)
+
+    assert min(scores[1], scores[3]) > max(scores[0], scores[2])
+
+
+def test_every_section_contributes_before_the_best_of_the_rest():
+    selector = SalientSelector()
+    spans = [f"span {i:02d}" for i in range(16)]
+    scores = [float(i) for i in range(16)]
+
+    # Room for exactly SECTIONS spans: one per section, not the 8 best
+    chosen = selector._choose(spans, np.array(scores), budget=selector.SECTIONS * (len(spans[0]) + 1))
+
+    assert chosen == [1, 3, 5, 7, 9, 11, 13, 15]
+
+
+def test_chapter_summaries_are_kept():
+    selector = SalientSelector(budget_tokens=150)
+    chapters = "0:00 Intro\n5:00 River bluffs"
+
+    selected = selector.select(transcript() + CHAPTERS_MARKER + chapters)
+
+    assert selected.endswith(CHAPTERS_MARKER + chapters)
+
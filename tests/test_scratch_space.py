@@ -0,0 +1,49 @@
+import json
+import os
+import time
+
+from scratch_space import ScratchSpace, _process_start_ticks
+
+
+def write_owner(path, **owner):
+    path.mkdir(parents=True)
+    (path / ScratchSpace.OWNER_FILE).write_text(json.dumps(owner))
+    (path / "audio.mp3").write_bytes(b"x" * 100)
+
+
+def test_live_record_dir_is_kept(tmp_path):
+    scratch = ScratchSpace(root=str(tmp_path / "downloads"))
+
+    with scratch.record_dir("recLive") as work_dir:
+        assert scratch.sweep_orphans() == 0
+        assert work_dir.exists()
+
+
+def test_same_pid_from_earlier_process_is_swept(tmp_path):
+    # A restarted container's worker gets the crashed worker's PID
+    scratch = ScratchSpace(root=str(tmp_path / "downloads"))
+    ticks = _process_start_ticks(os.getpid())
+    write_owner(scratch.root / "recOld", pid=os.getpid(), started=time.time() - 3600,
+                start_ticks=ticks - 1 if ticks else None)
+
+    assert scratch.sweep_orphans() > 0
+    assert not (scratch.root / "recOld").exists()
+
+
+def test_same_pid_without_start_ticks_uses_start_time(tmp_path):
+    scratch = ScratchSpace(root=str(tmp_path / "downloads"))
+    write_owner(scratch.root / "recOld", pid=os.getpid(), started=0)
+
+    assert scratch.sweep_orphans() > 0
+
+
+
+def test_reservation_not_counted_twice(tmp_path):
+    scratch = ScratchSpace(root=str(tmp_path / "downloads"), budget_bytes=1000)
+
+    with scratch.reserve(200, record_id="recA"), scratch.record_dir("recA") as work_dir:
+        # recA's download (2 x 200 reserved) is half on disk already
+        (work_dir / "part").write_bytes(b"x" * 200)
+        # 600 more fit: 200 on disk + 200 still to come for recA
+        with scratch.reserve(300, timeout=0, record_id="recB"):
+            pass
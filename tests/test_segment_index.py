@@ -0,0 +1,71 @@
+from segment_index import SegmentIndex
+
+
+def chunk(*segments, duration):
+    """Index over segments given as (start, end, text)."""
+    text = " ".join(s[2] for s in segments)
+    return SegmentIndex.from_segments(text, [{"start": s, "end": e, "text": t} for s, e, t in segments], duration)
+
+
+def test_from_segments_maps_characters():
+    index = chunk((0, 2, "Hello there."), (2, 5, "Fold the river."), duration=6)
+
+    assert list(index.segments()) == [(0.0, 2.0, "Hello there."), (2.0, 5.0, "Fold the river.")]
+    assert index.time_at(index.text.index("river")) == 2.0
+    assert index.duration == 6
+
+
+def test_concat_shifts_times_and_characters():
+    first = chunk((0, 10, "one"), (10, 20, "two"), duration=20)
+    silent = SegmentIndex(duration=5)
+    last = chunk((1, 4, "three"), duration=8)
+
+    index = SegmentIndex.concat([first, silent, last], separator="\n\n")
+
+    assert index.text == "one two\n\nthree"
+    # The silent chunk still advances the clock
+    assert list(index.segments())[-1] == (26.0, 29.0, "three")
+    assert index.duration == 33
+    assert index.text[index.char_start[2]:index.char_end[2]] == "three"
+
+
+def test_slice_returns_overlapping_segments():
+    index = chunk((0, 2, "a1"), (2, 4, "b2"), (4, 6, "c3"), duration=6)
+
+    assert index.slice(2.5, 4.5) == "b2 c3"
+    assert index.slice(0, 2) == "a1"
+    # Past the end of the recording
+    assert index.slice(7, 9) == ""
+
+
+def test_slice_skips_segment_that_ended_before_a_pause():
+    index = chunk((0, 2, "before"), (10, 12, "after"), duration=12)
+
+    assert index.slice(5, 11) == "after"
+    assert index.slice(5, 8) == ""
+
+
+def test_scaled_restores_original_timeline():
+    index = chunk((0, 10, "a"), (10, 20, "b"), duration=20).scaled(1.5)
+
+    assert list(index.segments()) == [(0.0, 15.0, "a"), (15.0, 30.0, "b")]
+    assert index.duration == 30
+
+
+def test_locate_exact_and_reworded_quotes():
+    index = chunk((0, 3, "You have to bet thin for value here."),
+                  (3, 7, "Villains call too wide on the river."), duration=7)
+
+    assert index.locate("bet thin for value") == (0.0, 3.0)
+    assert index.locate('"villains CALL too wide"') == (3.0, 7.0)
+    assert index.locate("for value here villains call") == (0.0, 7.0)
+    assert index.locate("never said this") is None
+
+
+def test_json_round_trip():
+    index = chunk((0, 1, "a"), (1, 2, "b"), duration=2)
+
+    restored = SegmentIndex.from_json(index.text, index.to_json())
+
+    assert list(restored.segments()) == list(index.segments())
+    assert restored.duration == 2
@@ -0,0 +1,170 @@
+"""
+Fake OpenAI Batch Server
+Local stand-in for the Files and Batches endpoints, for exercising the
+insight backfill without spending money. Every chat request in an uploaded
+batch gets a canned KEY QUOTES / CORE PHILOSOPHY answer.
+
+Usage:
+    python tools/fake_openai_batch_server.py [--port 8089] [--delay 2]
+    OPENAI_API_KEY=test python src/insight_backfill.py --job test \
+        --base-url http://127.0.0.1:8089/v1 --no-airtable --poll-interval 1
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILES = {}
+BATCHES = {}
+LOCK = threading.Lock()
+DELAY = 2.0
+
+
+def _file_object(file_id: str) -> dict:
+    f = FILES[file_id]
+    return {
+        "id": file_id, "object": "file", "bytes": len(f["content"]),
+        "created_at": f["created_at"], "filename": f["filename"],
+        "purpose": f["purpose"], "status": "processed"
+    }
+
+
+def _run_batch(batch: dict) -> dict:
+    """Answer every request in the batch's input file."""
+    lines = []
+    for line in FILES[batch["input_file_id"]]["content"].decode().splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        content = (
+            "KEY QUOTES:\n"
+            f"- Stub quote for {request['custom_id']}\n\n"
+            "CORE PHILOSOPHY:\n"
+            "Stub philosophy from the local batch server."
+        )
+        lines.append(json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "model": request["body"].get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}]
+                }
+            },
+            "error": None
+        }))
+
+    output_id = f"file-{uuid.uuid4().hex[:24]}"
+    FILES[output_id] = {
+        "content": "\n".join(lines).encode(), "filename": "output.jsonl",
+        "purpose": "batch_output", "created_at": int(time.time())
+    }
+    batch.update({
+        "status": "completed", "output_file_id": output_id,
+        "completed_at": int(time.time()),
+        "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0}
+    })
+    return batch
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def _send(self, status: int, body, content_type: str = "application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        if self.path == "/v1/files":
+            # Parse multipart/form-data with the stdlib email parser
+            raw = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + self._body()
+            message = BytesParser(policy=HTTP).parsebytes(raw)
+            fields = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+            upload = fields["file"]
+
+            file_id = f"file-{uuid.uuid4().hex[:24]}"
+            with LOCK:
+                FILES[file_id] = {
+                    "content": upload.get_payload(decode=True),
+                    "filename": upload.get_filename() or "input.jsonl",
+                    "purpose": fields["purpose"].get_content().strip(),
+                    "created_at": int(time.time())
+                }
+                return self._send(200, _file_object(file_id))
+
+        if self.path == "/v1/batches":
+            request = json.loads(self._body())
+            batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+            with LOCK:
+                if request["input_file_id"] not in FILES:
+                    return self._send(404, {"error": {"message": "No such file"}})
+                BATCHES[batch_id] = {
+                    "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                    "input_file_id": request["input_file_id"],
+                    "completion_window": request["completion_window"],
+                    "created_at": int(time.time()), "status": "validating",
+                    "metadata": request.get("metadata")
+                }
+                return self._send(200, BATCHES[batch_id])
+
+        self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+
+        with LOCK:
+            if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+                batch = BATCHES.get(parts[2])
+                if batch is None:
+                    return self._send(404, {"error": {"message": "No such batch"}})
+                if batch["status"] != "completed":
+                    if time.time() - batch["created_at"] >= DELAY:
+                        _run_batch(batch)
+                    else:
+                        batch["status"] = "in_progress"
+                return self._send(200, batch)
+
+            if parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+                f = FILES.get(parts[2])
+                if f is None:
+                    return self._send(404, {"error": {"message": "No such file"}})
+                return self._send(200, f["content"], "application/octet-stream")
+
+        self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    global DELAY
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI Batch API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds before a batch completes")
+    args = parser.parse_args()
+    DELAY = args.delay
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    print(f"Fake OpenAI batch server on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()